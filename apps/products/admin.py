@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Store, Product, ProductListing, PriceHistory, SearchQuery
+from .models import Store, Product, ProductListing, PriceHistory, SearchQuery, ScrapeJob, SearchResultSet
 
 
 @admin.register(Store)
@@ -11,15 +11,15 @@ class StoreAdmin(admin.ModelAdmin):
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
-    list_display = ['name', 'brand', 'model', 'category', 'created_at']
+    list_display = ['name', 'brand', 'model', 'best_price', 'best_store', 'offer_count', 'created_at']
     list_filter = ['brand', 'category', 'created_at']
     search_fields = ['name', 'normalized_name', 'brand', 'model']
-    readonly_fields = ['normalized_name']
+    readonly_fields = ['normalized_name', 'best_price', 'best_store', 'offer_count', 'price_changed_at']
 
 
 @admin.register(ProductListing)
 class ProductListingAdmin(admin.ModelAdmin):
-    list_display = ['product', 'store', 'current_price', 'is_available', 'last_updated']
+    list_display = ['product', 'store', 'current_price', 'is_available', 'last_updated', 'next_refresh_at']
     list_filter = ['store', 'is_available', 'last_updated']
     search_fields = ['product__name', 'title', 'store__name']
     readonly_fields = ['last_updated', 'created_at']
@@ -39,3 +39,19 @@ class SearchQueryAdmin(admin.ModelAdmin):
     list_filter = ['searched_at']
     search_fields = ['query']
     readonly_fields = ['searched_at']
+
+
+@admin.register(ScrapeJob)
+class ScrapeJobAdmin(admin.ModelAdmin):
+    list_display = ['query', 'status', 'attempts', 'worker_id', 'run_after', 'updated_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['query', 'worker_id']
+    readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(SearchResultSet)
+class SearchResultSetAdmin(admin.ModelAdmin):
+    list_display = ['query', 'result_count', 'created_at']
+    list_filter = ['created_at']
+    search_fields = ['query']
+    readonly_fields = ['created_at']
@@ -3,4 +3,7 @@ from . import views
 
 urlpatterns = [
     path('search/', views.api_search, name='api_search'),
+    path('search/async/', views.api_search_async, name='api_search_async'),
+    path('search/stream/', views.api_search_stream, name='api_search_stream'),
+    path('jobs/<int:job_id>/', views.api_job_status, name='api_job_status'),
 ]
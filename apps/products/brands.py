@@ -0,0 +1,141 @@
+import re
+from typing import List, Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+
+
+DEFAULT_BRANDS = [
+    # Phones, tablets and computers
+    'Apple', 'Samsung', 'Huawei', 'Xiaomi', 'Oppo', 'Vivo', 'Realme', 'OnePlus', 'Honor', 'Nokia',
+    'Motorola', 'Google', 'Hisense', 'Tecno', 'Infinix', 'Itel', 'ZTE', 'Alcatel', 'Mobicel',
+    'Dell', 'HP', 'Lenovo', 'Asus', 'Acer', 'MSI', 'Microsoft', 'Razer', 'Gigabyte', 'Toshiba',
+    'Huion', 'Wacom',
+    # Components and peripherals
+    'NVIDIA', 'AMD', 'Intel', 'Corsair', 'Kingston', 'Seagate', 'Western Digital', 'WD', 'SanDisk',
+    'Crucial', 'Logitech', 'SteelSeries', 'HyperX', 'Redragon', 'Cooler Master', 'NZXT', 'Thermaltake',
+    'TP-Link', 'D-Link', 'Netgear', 'Ubiquiti', 'Mikrotik', 'Tenda', 'Epson', 'Canon', 'Brother',
+    'Lexmark', 'Xerox', 'Verbatim', 'Transcend', 'Zotac', 'Palit', 'EVGA',
+    # TV, audio and cameras
+    'Sony', 'LG', 'Panasonic', 'Philips', 'Sharp', 'TCL', 'Sansui', 'JVC', 'Telefunken', 'Skyworth',
+    'Bose', 'JBL', 'Sennheiser', 'Beats', 'Marshall', 'Harman Kardon', 'Bang & Olufsen', 'Yamaha',
+    'Denon', 'Pioneer', 'Jabra', 'Skullcandy', 'Audio-Technica', 'Anker', 'Soundcore', 'Volkano',
+    'Nikon', 'Fujifilm', 'Olympus', 'GoPro', 'DJI', 'Insta360', 'Garmin', 'Fitbit', 'Amazfit',
+    # Gaming
+    'Nintendo', 'PlayStation', 'Xbox', 'Turtle Beach',
+    # Appliances
+    'Defy', 'Bosch', 'Siemens', 'Whirlpool', 'Smeg', 'Kenwood', 'Russell Hobbs', 'Morphy Richards',
+    'Tefal', 'De\'Longhi', 'DeLonghi', 'Nespresso', 'Breville', 'Dyson', 'Karcher', 'Electrolux',
+    'AEG', 'Miele', 'Beko', 'Haier', 'Midea', 'Kelvinator', 'Mellerware', 'Salton', 'Goldair',
+    'Black & Decker', 'Black+Decker', 'Makita', 'DeWalt', 'Ryobi', 'Stanley', 'Milwaukee', 'Ingco',
+    'Tork Craft', 'Bennett Read', 'Swan', 'Sunbeam', 'Hamilton Beach', 'KitchenAid', 'Ninja',
+    'Instant Pot', 'Braun', 'Oral-B', 'Remington', 'Wahl', 'Gillette', 'iRobot', 'Roborock', 'Eufy',
+    # Power and connectivity
+    'Duracell', 'Energizer', 'Eveready', 'Romoss', 'Belkin', 'Baseus', 'Ugreen', 'Mecer', 'RCT',
+    'Ellies', 'Astrum',
+]
+
+# Product lines that identify their maker when the brand itself is missing from the title
+DEFAULT_BRAND_ALIASES = {
+    'iPhone': 'Apple', 'iPad': 'Apple', 'MacBook': 'Apple', 'iMac': 'Apple', 'AirPods': 'Apple',
+    'Apple Watch': 'Apple', 'Galaxy': 'Samsung', 'ThinkPad': 'Lenovo', 'IdeaPad': 'Lenovo',
+    'XPS': 'Dell', 'Inspiron': 'Dell', 'Alienware': 'Dell', 'EliteBook': 'HP', 'ProBook': 'HP',
+    'ZenBook': 'Asus', 'VivoBook': 'Asus', 'GeForce': 'NVIDIA', 'Radeon': 'AMD', 'Ryzen': 'AMD',
+    'Redmi': 'Xiaomi', 'Bravia': 'Sony',
+}
+
+# Brands and product lines that start a model name, with what follows them in it
+MODEL_WORDS = r'[ \t]+[A-Za-z0-9 \t]+'
+DEFAULT_MODEL_LINES = {
+    'iPhone': r'[ \t]+\d+[A-Za-z \t]*',
+    'Galaxy': MODEL_WORDS,
+    'MacBook': MODEL_WORDS,
+    'Dell': MODEL_WORDS,
+    'HP': MODEL_WORDS,
+}
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """Regex alternation for a set of words, factored into a trie.
+
+    Common prefixes are matched once ("sam(?:sung|sui)" instead of
+    "samsung|sansui"), so the regex engine never backtracks across thousands
+    of alternatives that share a start.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node) -> str:
+        ends = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if ends:
+            return f'(?:{body})?'
+        return body
+
+    return build(trie)
+
+
+class BrandExtractor:
+    """Finds brands and models in titles with one compiled regex.
+
+    Brands and product-line aliases are merged into a single trie-shaped
+    alternation, so a title is scanned once no matter how many brands are
+    configured. Model lines are entries of the same dictionary: where one is
+    found, its model is read on from there rather than by a second scan.
+    """
+
+    def __init__(self, brands: Iterable[str], aliases: Optional[Dict[str, str]] = None,
+                 model_lines: Optional[Dict[str, str]] = None):
+        self.canonical = {brand.lower(): brand for brand in brands}
+        for alias, brand in (aliases or {}).items():
+            self.canonical.setdefault(alias.lower(), brand)
+        self.pattern = re.compile(
+            r'(?<!\w)(' + trie_pattern(self.canonical) + r')(?!\w)',
+            re.IGNORECASE,
+        )
+
+        unknown = [line for line in model_lines or {} if line.lower() not in self.canonical]
+        if unknown:
+            raise ValueError(f"Model lines must be brands or aliases: {', '.join(unknown)}")
+        self.model_rest = {
+            line.lower(): re.compile(rest, re.IGNORECASE) for line, rest in (model_lines or {}).items()
+        }
+
+    def scan(self, title: str) -> Tuple[str, str]:
+        """(brand, model) for a title: the first brand mentioned and the first model line with a model."""
+        brand = model = ''
+        for match in self.pattern.finditer(title):
+            word = match.group(1).lower()
+            brand = brand or self.canonical[word]
+            if not model and word in self.model_rest:
+                rest = self.model_rest[word].match(title, match.end())
+                if rest:
+                    model = (match.group(1) + rest.group()).strip()
+            if brand and model:
+                break
+        return brand, model
+
+    def extract(self, titles: List[str]) -> List[Tuple[str, str]]:
+        """(brand, model) pairs for a batch of titles, one scan per title."""
+        return [self.scan(title) for title in titles]
+
+
+_extractor = None
+
+
+def get_extractor() -> BrandExtractor:
+    """Process-wide extractor built from DEFAULT_BRANDS plus the brands configured in settings."""
+    global _extractor
+    if _extractor is None:
+        brands = DEFAULT_BRANDS + list(settings.EXTRA_PRODUCT_BRANDS)
+        if settings.PRODUCT_BRANDS_FILE:
+            with open(settings.PRODUCT_BRANDS_FILE, encoding='utf-8') as f:
+                brands += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+        _extractor = BrandExtractor(brands, DEFAULT_BRAND_ALIASES, DEFAULT_MODEL_LINES)
+    return _extractor
@@ -0,0 +1,97 @@
+import time
+from typing import List, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache, caches
+
+# Backends that keep entries inside one process
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def tag_cache_alias() -> str:
+    return 'cache_tags' if 'cache_tags' in settings.CACHES else 'default'
+
+
+def tag_cache():
+    """Cache holding tag versions; every process that writes listings must share it."""
+    return caches[tag_cache_alias()]
+
+
+def tags_are_shared() -> bool:
+    """Whether invalidations made in one process reach the others."""
+    return settings.CACHES[tag_cache_alias()]['BACKEND'] not in LOCAL_CACHE_BACKENDS
+
+
+def listing_tag(listing_id: int) -> str:
+    return f"listing:{listing_id}"
+
+
+def product_tag(product_id: int) -> str:
+    return f"product:{product_id}"
+
+
+def tag_versions(tags: Iterable[str]) -> Dict[str, int]:
+    """Current version of each tag, starting untracked tags at a fresh version."""
+    keys = {f"cache_tag_{tag}": tag for tag in tags}
+    versions = {keys[key]: version for key, version in tag_cache().get_many(keys).items()}
+
+    missing = {key: time.time_ns() for key, tag in keys.items() if tag not in versions}
+    if missing:
+        # Tags outlive the entries that carry them; a lost tag just invalidates those entries
+        tag_cache().set_many(missing, timeout=None)
+        versions.update({keys[key]: version for key, version in missing.items()})
+    return versions
+
+
+def invalidate_tags(tags: Iterable[str]) -> None:
+    """Invalidate every cached entry carrying one of the tags."""
+    version = time.time_ns()
+    versions = {f"cache_tag_{tag}": version for tag in tags}
+    if versions:
+        tag_cache().set_many(versions, timeout=None)
+
+
+def set_tagged(key: str, value, tags: Iterable[str], timeout: int, add: bool = False) -> None:
+    """Cache a value along with the versions of the tags it depends on.
+
+    With add=True an existing entry is kept, as with cache.add().
+    """
+    entry = {'value': value, 'tags': tag_versions(set(tags))}
+    if add:
+        cache.add(key, entry, timeout)
+    else:
+        cache.set(key, entry, timeout)
+
+
+def get_tagged(key: str):
+    """A cached value, or None if it is missing or one of its tags was invalidated."""
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    if entry['tags'] and tag_versions(entry['tags']) != entry['tags']:
+        cache.delete(key)
+        return None
+    return entry['value']
+
+
+def search_cache_key(query: str) -> str:
+    return f"search_results_{query.strip().lower()}"
+
+
+def cache_search_results(query: str, results: List[Dict], add: bool = False) -> None:
+    """Cache a search's results, tagged with the listings they show."""
+    set_tagged(
+        search_cache_key(query),
+        results,
+        [listing_tag(result['id']) for result in results if result.get('id')],
+        settings.SEARCH_CACHE_SECONDS,
+        add=add,
+    )
+
+
+def cached_search_results(query: str) -> Optional[List[Dict]]:
+    """A search's cached results, unless a listing in them has changed since."""
+    return get_tagged(search_cache_key(query))
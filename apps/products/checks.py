@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+from .cache_tags import tag_cache_alias, tags_are_shared
+
+
+@register(Tags.caches)
+def check_tag_cache(app_configs, **kwargs):
+    """Scrape workers invalidate cached pages from their own process, which a local tag cache can't carry."""
+    if settings.SCRAPE_QUEUE_ENABLED and not tags_are_shared():
+        return [Error(
+            f"The '{tag_cache_alias()}' cache is local to each process, so scrape workers can't invalidate "
+            "the web processes' cached searches and product pages.",
+            hint="Point CACHE_TAGS_BACKEND at a shared cache (Redis, memcached or the database cache).",
+            id='products.E001',
+        )]
+    return []
@@ -0,0 +1,73 @@
+import hashlib
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Callable
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.middleware.gzip import re_accepts_gzip
+from django.template import engines
+from django.utils.cache import (
+    add_never_cache_headers, get_conditional_response, patch_cache_control, patch_vary_headers, quote_etag,
+)
+from django.utils.http import http_date
+from django.utils.text import compress_string
+
+
+@lru_cache(maxsize=None)
+def templates_version(engine: str) -> str:
+    """Hash of an engine's project templates, so a deploy that changes them changes every ETag."""
+    digest = hashlib.md5(usedforsecurity=False)
+    for directory in engines[engine].dirs:
+        for path in sorted(Path(directory).rglob('*.html')):
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def make_etag(*parts) -> str:
+    """Strong validator for a page built from these values and the page templates."""
+    source = repr((templates_version(settings.PAGE_TEMPLATE_ENGINE),) + parts)
+    return hashlib.md5(source.encode(), usedforsecurity=False).hexdigest()
+
+
+def latest_update(rows: Iterable[Dict]) -> Optional[datetime]:
+    """Newest last_updated among listing dicts, for Last-Modified."""
+    return max((row['last_updated'] for row in rows if row.get('last_updated')), default=None)
+
+
+def conditional_page(request, etag: str, last_modified: Optional[datetime],
+                     render: Callable[[], HttpResponse]) -> HttpResponse:
+    """Answer 304 if the client's copy is current, otherwise render the page.
+
+    Works like @condition, but for views that only know their validators after
+    loading their data: what is skipped on a match is the template render.
+    Pages are gzipped here rather than by GZipMiddleware, which would weaken the
+    ETag and buffer streaming responses; the gzipped representation gets its own
+    strong ETag. Responses may be reused for PAGE_CACHE_MAX_AGE seconds and are
+    revalidated after that.
+    """
+    gzip = bool(re_accepts_gzip.search(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+    etag = quote_etag(f"{etag}-gzip" if gzip else etag)
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = render()
+        if gzip:
+            response.content = compress_string(response.content)
+            response.headers['Content-Length'] = str(len(response.content))
+            response.headers['Content-Encoding'] = 'gzip'
+    if request.method in ('GET', 'HEAD'):
+        response.headers.setdefault('ETag', etag)
+        if timestamp:
+            response.headers.setdefault('Last-Modified', http_date(timestamp))
+    patch_vary_headers(response, ('Accept-Encoding',))
+    patch_cache_control(response, public=True, max_age=settings.PAGE_CACHE_MAX_AGE)
+    return response
+
+
+def uncacheable_page(response: HttpResponse) -> HttpResponse:
+    """Mark a page built from transient state, e.g. a queued job's partial results."""
+    add_never_cache_headers(response)
+    return response
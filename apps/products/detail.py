@@ -0,0 +1,73 @@
+from typing import List, Dict, Tuple
+
+from django.conf import settings
+from django.http import Http404
+
+from .cache_tags import get_tagged, set_tagged, listing_tag, product_tag
+from .models import ProductListing
+
+
+def listing_payload(listing: ProductListing) -> Dict:
+    """A listing as nested dicts, so templates use the same lookups as on the model."""
+    return {
+        'id': listing.id,
+        'title': listing.title,
+        'url': listing.url,
+        'image_url': listing.image_url,
+        'current_price': listing.current_price,
+        'original_price': listing.original_price,
+        'is_available': listing.is_available,
+        'last_updated': listing.last_updated,
+        'store': {'name': listing.store.name},
+    }
+
+
+def build_detail_payload(listing_id: int) -> Tuple[Dict, List[str]]:
+    """Everything the detail page shows (the listing, its price history and similar
+    listings), with the cache tags it depends on."""
+    try:
+        listing = ProductListing.objects.select_related('product', 'store').get(id=listing_id)
+    except ProductListing.DoesNotExist:
+        raise Http404('No listing matches the given query.')
+
+    # Get price history, oldest first for the chart
+    price_history = [
+        {'price': float(price), 'recorded_at': recorded_at}
+        for price, recorded_at in listing.price_history.order_by('-recorded_at').values_list('price', 'recorded_at')[:30]
+    ][::-1]
+
+    # Get similar products
+    similar_products = ProductListing.objects.filter(
+        product__normalized_name=listing.product.normalized_name
+    ).exclude(id=listing_id).select_related('store').order_by('current_price')
+
+    payload = listing_payload(listing)
+    payload['product'] = {
+        'name': listing.product.name,
+        'brand': listing.product.brand,
+        'model': listing.product.model,
+        'category': listing.product.category,
+    }
+    similar_products = [listing_payload(similar) for similar in similar_products]
+    tags = [listing_tag(listing_id), product_tag(listing.product_id)]
+    tags += [listing_tag(similar['id']) for similar in similar_products]
+    return {
+        'listing': payload,
+        'price_history': price_history,
+        'similar_products': similar_products,
+    }, tags
+
+
+def get_detail_payload(listing_id: int) -> Dict:
+    """Detail page payload, read through the cache.
+
+    The entry is tagged with the listings it shows and the product, so it is
+    dropped as soon as a write changes any of them and PriceHistory is only
+    read when something did change.
+    """
+    cache_key = f"product_detail_{listing_id}"
+    payload = get_tagged(cache_key)
+    if payload is None:
+        payload, tags = build_detail_payload(listing_id)
+        set_tagged(cache_key, payload, tags, settings.PRODUCT_DETAIL_CACHE_SECONDS)
+    return payload
@@ -0,0 +1,194 @@
+from decimal import Decimal
+from typing import List, Dict, Optional
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, Count, F, IntegerField, Q, Value, When
+
+from .models import SearchResultSet, SearchResultItem
+
+
+# Price bands in rand: (lower bound, upper bound); None means open-ended
+PRICE_BANDS = [
+    (None, 1000),
+    (1000, 5000),
+    (5000, 10000),
+    (10000, 20000),
+    (20000, None),
+]
+
+FACET_NAMES = ['store', 'brand', 'price', 'available']
+
+
+def band_label(band: int) -> str:
+    """Human-readable label for a price band."""
+    low, high = PRICE_BANDS[band]
+    if low is None:
+        return f"Under R{high:,}"
+    if high is None:
+        return f"R{low:,} and up"
+    return f"R{low:,} - R{high:,}"
+
+
+def band_q(band: int) -> Q:
+    """Filter for result items priced in a band."""
+    low, high = PRICE_BANDS[band]
+    q = Q(price__isnull=False)
+    if low is not None:
+        q &= Q(price__gte=Decimal(low))
+    if high is not None:
+        q &= Q(price__lt=Decimal(high))
+    return q
+
+
+def band_case() -> Case:
+    """Expression numbering the price band of a result item; NULL for unpriced items."""
+    return Case(
+        *[When(band_q(band), then=Value(band)) for band in range(len(PRICE_BANDS))],
+        default=Value(None),
+        output_field=IntegerField(),
+    )
+
+
+class FacetFilters:
+    """Selected facet values: any value within a facet, every facet across them."""
+
+    def __init__(self, stores: Optional[List[str]] = None, brands: Optional[List[str]] = None,
+                 bands: Optional[List[int]] = None, available: Optional[bool] = None):
+        self.stores = stores or []
+        self.brands = brands or []
+        self.bands = bands or []
+        self.available = available
+
+    @classmethod
+    def from_request(cls, request) -> 'FacetFilters':
+        """Read filters from the query string, ignoring unknown values."""
+        bands = [int(band) for band in request.GET.getlist('price')
+                 if band.isdigit() and int(band) < len(PRICE_BANDS)]
+        available = {'1': True, '0': False}.get(request.GET.get('available', ''))
+        return cls(
+            stores=[store for store in request.GET.getlist('store') if store],
+            brands=[brand for brand in request.GET.getlist('brand') if brand],
+            bands=bands,
+            available=available,
+        )
+
+    @property
+    def active(self) -> bool:
+        return bool(self.stores or self.brands or self.bands or self.available is not None)
+
+    def values(self, facet: str) -> List[str]:
+        """Selected values of a facet, as they appear in the query string."""
+        if facet == 'store':
+            return self.stores
+        if facet == 'brand':
+            return self.brands
+        if facet == 'price':
+            return [str(band) for band in self.bands]
+        return [] if self.available is None else ['1' if self.available else '0']
+
+    def q(self) -> Q:
+        """Filter for SearchResultItem rows."""
+        q = Q()
+        if self.stores:
+            q &= Q(listing__store__name__in=self.stores)
+        if self.brands:
+            q &= Q(listing__product__brand__in=self.brands)
+        if self.bands:
+            bands = Q()
+            for band in self.bands:
+                bands |= band_q(band)
+            q &= bands
+        if self.available is not None:
+            q &= Q(is_available=self.available)
+        return q
+
+    def matches(self, row: Dict, skip: Optional[str] = None) -> bool:
+        """Whether a facet row passes the filters, optionally ignoring one facet."""
+        for facet in FACET_NAMES:
+            selected = self.values(facet)
+            if facet != skip and selected and row_value(row, facet) not in selected:
+                return False
+        return True
+
+    def querystring(self, query: str) -> str:
+        """Query string for the search with these filters, for pagination links."""
+        params = [('q', query)]
+        params += [(facet, value) for facet in FACET_NAMES for value in self.values(facet)]
+        return urlencode(params)
+
+
+def row_value(row: Dict, facet: str) -> str:
+    """A facet row's value for one facet, as it appears in the query string."""
+    if facet == 'price':
+        return '' if row['band'] is None else str(row['band'])
+    if facet == 'available':
+        return '1' if row['available'] else '0'
+    return row[facet] or ''
+
+
+def facet_rows(result_set: SearchResultSet) -> List[Dict]:
+    """Item counts per (store, brand, availability, price band) for a result set.
+
+    One grouped query over the items' snapshotted availability and price, the
+    same columns get_page filters on; result sets never change, so the rows are
+    cached for the set's lifetime and every filter combination is counted from them.
+    """
+    cache_key = f"search_facets_{result_set.id}"
+    rows = cache.get(cache_key)
+    if rows is None:
+        rows = list(
+            SearchResultItem.objects.filter(result_set=result_set)
+            .annotate(
+                store=F('listing__store__name'),
+                brand=F('listing__product__brand'),
+                available=F('is_available'),
+                band=band_case(),
+            )
+            .values('store', 'brand', 'available', 'band')
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+        cache.set(cache_key, rows, settings.SEARCH_RESULT_SET_TTL)
+    return rows
+
+
+def facet_counts(rows: List[Dict], filters: FacetFilters) -> Dict[str, List[Dict]]:
+    """Options for each facet, counted under the filters on the other facets."""
+    labels = {
+        'price': lambda value: band_label(int(value)),
+        'available': lambda value: 'In stock' if value == '1' else 'Out of stock',
+    }
+
+    facets = {}
+    for facet in FACET_NAMES:
+        counts = {}
+        for row in rows:
+            value = row_value(row, facet)
+            if value and filters.matches(row, skip=facet):
+                counts[value] = counts.get(value, 0) + row['count']
+        for value in filters.values(facet):
+            counts.setdefault(value, 0)
+
+        if facet == 'brand':
+            # Selected brands first, so they stay visible when only the top brands are shown
+            selected = filters.values(facet)
+            values = sorted(counts, key=lambda value: (value not in selected, -counts[value], value.lower()))
+        elif facet == 'available':
+            values = sorted(counts, reverse=True)
+        else:
+            values = sorted(counts, key=lambda value: int(value) if facet == 'price' else value.lower())
+
+        label = labels.get(facet, lambda value: value)
+        facets[facet] = [
+            {'value': value, 'label': label(value), 'count': counts[value],
+             'selected': value in filters.values(facet)}
+            for value in values
+        ]
+    return facets
+
+
+def filtered_count(rows: List[Dict], filters: FacetFilters) -> int:
+    """Number of items passing all filters, counted from the facet rows."""
+    return sum(row['count'] for row in rows if filters.matches(row))
@@ -0,0 +1,59 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from django import forms
+from django.core import exceptions
+from django.db import models
+
+
+CENT = Decimal('0.01')
+
+
+class CentsField(models.Field):
+    """Money stored as an integer number of cents and exposed as a two-place Decimal.
+
+    Sorting, range filters and MIN/MAX/SUM run on native integers at index speed,
+    while model instances, filters and aggregates keep using Decimal rand amounts
+    (``current_price__lte=Decimal('999.99')``). AVG comes back rounded to the cent.
+    """
+    description = "Amount in rand, stored as integer cents"
+    default_error_messages = {
+        'invalid': '"%(value)s" value must be a decimal number.',
+    }
+
+    def get_internal_type(self):
+        # Not 'BigIntegerField': expressions would truncate an AVG with int() before from_db_value rounds it
+        return 'CentsField'
+
+    def db_type(self, connection):
+        return models.BigIntegerField().db_type(connection)
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        # AVG and other float results are rounded to a whole number of cents
+        return Decimal(int(round(value))).scaleb(-2)
+
+    def to_python(self, value):
+        if value is None:
+            return value
+        try:
+            return Decimal(str(value)).quantize(CENT, rounding=ROUND_HALF_UP)
+        except (InvalidOperation, ValueError):
+            raise exceptions.ValidationError(
+                self.error_messages['invalid'], code='invalid', params={'value': value},
+            )
+
+    def get_prep_value(self, value):
+        value = super().get_prep_value(value)
+        if value is None:
+            return None
+        return int(self.to_python(value).scaleb(2))
+
+    def formfield(self, **kwargs):
+        return super().formfield(**{
+            'form_class': forms.DecimalField,
+            'max_digits': 12,
+            'decimal_places': 2,
+            **kwargs,
+        })
+
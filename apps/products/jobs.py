@@ -0,0 +1,210 @@
+import logging
+import threading
+from datetime import timedelta
+from typing import List, Dict, Optional
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import ScrapeJob
+
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_scrape_job(query: str) -> ScrapeJob:
+    """Queue a scrape for a query, reusing any outstanding job for the same query.
+
+    At most one pending or running job per query is allowed by a unique
+    constraint, so of two concurrent searches one inserts and the other
+    picks up its job.
+    """
+    query = query.strip().lower()
+    outstanding = ScrapeJob.objects.filter(
+        query=query,
+        status__in=[ScrapeJob.STATUS_PENDING, ScrapeJob.STATUS_RUNNING],
+    )
+
+    existing = outstanding.first()
+    if existing:
+        return existing
+
+    try:
+        with transaction.atomic():
+            return ScrapeJob.objects.create(
+                query=query,
+                max_attempts=settings.SCRAPE_QUEUE_MAX_ATTEMPTS,
+            )
+    except IntegrityError:
+        return outstanding.get()
+
+
+def get_recent_results(query: str, max_age: int = 1800) -> Optional[List[Dict]]:
+    """Return results of the newest finished job for a query, if it is recent enough."""
+    job = ScrapeJob.objects.filter(
+        query=query.strip().lower(),
+        status=ScrapeJob.STATUS_DONE,
+        updated_at__gte=timezone.now() - timedelta(seconds=max_age),
+    ).order_by('-updated_at').first()
+
+    return job.results if job else None
+
+
+def _claimable(now) -> Q:
+    """Jobs that are due, or whose lease (visibility timeout) has expired."""
+    return (
+        Q(status=ScrapeJob.STATUS_PENDING, run_after__lte=now) |
+        Q(status=ScrapeJob.STATUS_RUNNING, leased_until__lte=now)
+    ) & Q(attempts__lt=F('max_attempts'))
+
+
+def claim_next_job(worker_id: str, lease_seconds: Optional[int] = None) -> Optional[ScrapeJob]:
+    """Lease the next runnable job for a worker, honouring the global concurrency limit."""
+    now = timezone.now()
+    lease_seconds = lease_seconds or settings.SCRAPE_QUEUE_LEASE_SECONDS
+
+    expire_abandoned_jobs(now)
+
+    # Counted inside the UPDATE so that competing workers can't both take the last slot
+    running = ScrapeJob.objects.filter(
+        status=ScrapeJob.STATUS_RUNNING,
+        leased_until__gt=now,
+    ).order_by().values('status').annotate(n=Count('pk')).values('n')
+
+    candidate_ids = ScrapeJob.objects.filter(_claimable(now)).values_list('id', flat=True)[:5]
+    for job_id in candidate_ids:
+        claimed = ScrapeJob.objects.filter(_claimable(now), pk=job_id).alias(
+            running=Coalesce(Subquery(running), 0)
+        ).filter(
+            running__lt=settings.SCRAPE_QUEUE_MAX_CONCURRENCY
+        ).update(
+            status=ScrapeJob.STATUS_RUNNING,
+            leased_until=now + timedelta(seconds=lease_seconds),
+            worker_id=worker_id,
+            attempts=F('attempts') + 1,
+            updated_at=now,
+        )
+        if claimed:
+            return ScrapeJob.objects.get(pk=job_id)
+
+    return None
+
+
+def renew_lease(job: ScrapeJob, lease_seconds: Optional[int] = None) -> bool:
+    """Extend a running job's lease. Returns False if the lease was lost to another worker."""
+    now = timezone.now()
+    lease_seconds = lease_seconds or settings.SCRAPE_QUEUE_LEASE_SECONDS
+    updated = ScrapeJob.objects.filter(
+        pk=job.pk,
+        status=ScrapeJob.STATUS_RUNNING,
+        worker_id=job.worker_id,
+    ).update(leased_until=now + timedelta(seconds=lease_seconds), updated_at=now)
+    return bool(updated)
+
+
+class LeaseHeartbeat:
+    """Renews a job's lease from a background thread while the worker runs it.
+
+    Used as a context manager around the scrape, so a job that takes longer
+    than its lease isn't claimed and run again by another worker.
+    """
+
+    def __init__(self, job: ScrapeJob, lease_seconds: Optional[int] = None):
+        self.job = job
+        self.lease_seconds = lease_seconds or settings.SCRAPE_QUEUE_LEASE_SECONDS
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name=f'lease-heartbeat-{job.pk}', daemon=True)
+
+    def __enter__(self) -> 'LeaseHeartbeat':
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        """Renew at a third of the lease, so one missed beat doesn't lose it."""
+        try:
+            while not self.stopped.wait(self.lease_seconds / 3):
+                try:
+                    if not renew_lease(self.job, self.lease_seconds):
+                        logger.warning("Lease on job %s was lost", self.job.pk)
+                        return
+                except Exception:
+                    logger.exception("Renewing the lease on job %s failed", self.job.pk)
+        finally:
+            connection.close()
+
+
+def expire_abandoned_jobs(now=None) -> int:
+    """Fail jobs whose lease ran out after their last allowed attempt."""
+    now = now or timezone.now()
+    return ScrapeJob.objects.filter(
+        status=ScrapeJob.STATUS_RUNNING,
+        leased_until__lte=now,
+        attempts__gte=F('max_attempts'),
+    ).update(
+        status=ScrapeJob.STATUS_FAILED,
+        leased_until=None,
+        error='Lease expired on final attempt',
+        updated_at=now,
+    )
+
+
+def complete_job(job: ScrapeJob, results: List[Dict]) -> bool:
+    """Mark a leased job as done. Returns False if the lease was lost to another worker."""
+    updated = ScrapeJob.objects.filter(
+        pk=job.pk,
+        status=ScrapeJob.STATUS_RUNNING,
+        worker_id=job.worker_id,
+    ).update(
+        status=ScrapeJob.STATUS_DONE,
+        results=results,
+        leased_until=None,
+        error='',
+        updated_at=timezone.now(),
+    )
+    return bool(updated)
+
+
+def fail_job(job: ScrapeJob, error: str) -> bool:
+    """Release a leased job for a retry with backoff, or fail it after the last attempt."""
+    now = timezone.now()
+
+    if job.attempts < job.max_attempts:
+        delay = settings.SCRAPE_QUEUE_RETRY_DELAY * (2 ** (job.attempts - 1))
+        changes = {
+            'status': ScrapeJob.STATUS_PENDING,
+            'run_after': now + timedelta(seconds=delay),
+        }
+    else:
+        changes = {'status': ScrapeJob.STATUS_FAILED}
+
+    updated = ScrapeJob.objects.filter(
+        pk=job.pk,
+        status=ScrapeJob.STATUS_RUNNING,
+        worker_id=job.worker_id,
+    ).update(leased_until=None, error=error, updated_at=now, **changes)
+    return bool(updated)
+
+
+def job_status(job: ScrapeJob) -> Dict:
+    """Serializable summary of a job for the API."""
+    data = {
+        'job_id': job.id,
+        'query': job.query,
+        'status': job.status,
+        'attempts': job.attempts,
+        'created_at': job.created_at,
+        'updated_at': job.updated_at,
+    }
+    if job.status == ScrapeJob.STATUS_DONE:
+        data['results'] = job.results
+        data['total'] = len(job.results)
+    elif job.status == ScrapeJob.STATUS_FAILED:
+        data['error'] = job.error
+    return data
@@ -0,0 +1,74 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.template import engines
+from django.test import RequestFactory
+from apps.products.detail import build_detail_payload
+from apps.products.models import ProductListing
+from apps.products.persistence import listing_result
+from apps.products.result_sets import ResultPage
+from apps.products.views import comparison_columns
+
+
+class Command(BaseCommand):
+    help = 'Time rendering of the result pages per template engine, with cold and warm result card fragments'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--results',
+            type=int,
+            default=settings.SEARCH_PAGE_SIZE,
+            help='Number of listings on the search and compare pages (default: SEARCH_PAGE_SIZE)'
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=50,
+            help='Renders per measurement (default: 50)'
+        )
+
+    def handle(self, *args, **options):
+        listings = list(ProductListing.objects.select_related('product', 'store')[:options['results']])
+        if not listings:
+            self.stdout.write("❌ No listings to render; run populate_sample_data first")
+            return
+
+        results = [listing_result(listing) for listing in listings]
+        detail, _ = build_detail_payload(listings[0].id)
+        pages = [
+            ('products/search_results.html', {
+                'query': 'benchmark', 'results': ResultPage(results), 'total_results': len(results),
+            }),
+            ('products/compare.html', {'products': comparison_columns(listings)}),
+            ('products/product_detail.html', detail),
+        ]
+
+        request = RequestFactory().get('/search/', {'q': 'benchmark'})
+        fragments = caches['template_fragments' if 'template_fragments' in settings.CACHES else 'default']
+        iterations = options['iterations']
+
+        def render_page(template, context, cold: bool) -> float:
+            total = 0.0
+            for _ in range(iterations):
+                if cold:
+                    fragments.clear()
+                start = time.perf_counter()
+                template.render(context, request)
+                total += time.perf_counter() - start
+            return total / iterations * 1000
+
+        self.stdout.write(f"📄 {len(listings)} listings per page, {iterations} renders per measurement")
+        self.stdout.write(f"{'engine':<8} {'template':<30} {'cold ms':>9} {'warm ms':>9}")
+        for engine in engines.all():
+            for template_name, context in pages:
+                template = engine.get_template(template_name)
+                render_page(template, context, cold=True)  # warm up the engine's own caches
+                cold = render_page(template, context, cold=True)
+                warm = render_page(template, context, cold=False)
+                self.stdout.write(f"{engine.name:<8} {template_name:<30} {cold:>9.2f} {warm:>9.2f}")
+
+        if len(engines.all()) == 1:
+            self.stdout.write("ℹ️ Install Jinja2 to compare it with the Django engine")
+        self.stdout.write(self.style.SUCCESS(f'Rendering uses {settings.PAGE_TEMPLATE_ENGINE} (PAGE_TEMPLATE_ENGINE)'))
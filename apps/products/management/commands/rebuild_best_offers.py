@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from apps.products.offers import rebuild_best_offers
+
+
+class Command(BaseCommand):
+    help = "Recompute every product's best price, best store and offer count from its listings"
+
+    def handle(self, *args, **options):
+        count = rebuild_best_offers()
+        self.stdout.write(self.style.SUCCESS(f'Updated {count} products'))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from apps.products.matching import rebuild_match_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the similarity index used to match scraped titles to products'
+
+    def handle(self, *args, **options):
+        count = rebuild_match_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} products'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from apps.products.search_index import fts5_available, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text index of product listings'
+
+    def handle(self, *args, **options):
+        if not fts5_available():
+            self.stdout.write("⚠️ SQLite FTS5 is not available, searches use the Python fallback.")
+            return
+
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} listings'))
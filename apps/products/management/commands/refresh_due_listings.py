@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from apps.products.jobs import enqueue_scrape_job
+from apps.products.models import ProductListing
+from apps.products.refresh import due_listings
+
+
+class Command(BaseCommand):
+    help = 'Queue scrape jobs for listings whose adaptive refresh time has passed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=100,
+            help='Maximum number of due listings to refresh (default: 100)'
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        listings = list(due_listings(limit=options['limit'], now=now))
+
+        if not listings:
+            self.stdout.write("✅ No listings are due for a refresh")
+            return
+
+        # One job per product; the scrape refreshes that product at every store
+        queries = {listing.product.name.strip().lower() for listing in listings}
+        for query in sorted(queries):
+            enqueue_scrape_job(query)
+
+        # Push the listings back so they aren't queued again before the jobs run
+        ProductListing.objects.filter(id__in=[listing.id for listing in listings]).update(
+            next_refresh_at=now + timedelta(seconds=settings.REFRESH_MIN_INTERVAL)
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Queued {len(queries)} scrape jobs for {len(listings)} due listings'
+        ))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from apps.products.matching import rebuild_match_index
+from apps.products.models import Product
+from apps.products.search_index import rebuild_index
+from apps.scrapers.normalization import normalize_product_names
+
+
+class Command(BaseCommand):
+    help = 'Recompute normalized product names after the normalization rules change'
+
+    def handle(self, *args, **options):
+        products = list(Product.objects.only('id', 'name', 'normalized_name'))
+        changed = []
+        for product, name in zip(products, normalize_product_names(p.name for p in products)):
+            if product.normalized_name != name:
+                product.normalized_name = name
+                changed.append(product)
+
+        Product.objects.bulk_update(changed, ['normalized_name'], batch_size=500)
+        self.stdout.write(f"Updated {len(changed)} of {len(products)} product names")
+
+        # Both indexes are keyed on the normalized names
+        rebuild_match_index()
+        rebuild_index()
+        self.stdout.write(self.style.SUCCESS('Rebuilt the match and search indexes'))
@@ -0,0 +1,77 @@
+import os
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from apps.products.cache_tags import cache_search_results
+from apps.products.jobs import LeaseHeartbeat, claim_next_job, complete_job, fail_job
+from apps.products.result_sets import save_result_set
+from apps.products.writer import save_results
+from apps.scrapers.hybrid_scraper_manager import HybridScraperManager
+
+
+class Command(BaseCommand):
+    help = 'Run a worker process that executes queued scrape jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Seconds to wait when the queue is empty (default: 2)'
+        )
+        parser.add_argument(
+            '--lease',
+            type=int,
+            default=None,
+            help='Lease length in seconds (default: SCRAPE_QUEUE_LEASE_SECONDS)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit after the queue has been drained'
+        )
+
+    def handle(self, *args, **options):
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.stdout.write(f"👷 Scrape worker {worker_id} started")
+
+        # Browsers are started once per worker and reused across jobs
+        scraper_manager = HybridScraperManager()
+
+        try:
+            while True:
+                job = claim_next_job(worker_id, options['lease'])
+                if not job:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                self.stdout.write(f"🔍 Job {job.id}: '{job.query}' (attempt {job.attempts}/{job.max_attempts})")
+                try:
+                    # Keeps the job leased however long the scrape takes
+                    with LeaseHeartbeat(job, options['lease']):
+                        scraped_results = scraper_manager.search_all_stores_hybrid(job.query)
+                        results = save_results(scraped_results)
+                except Exception as e:
+                    fail_job(job, str(e))
+                    self.stdout.write(f"❌ Job {job.id} failed: {e}")
+                    continue
+
+                if complete_job(job, results):
+                    cache_search_results(job.query, results)
+                    # The page polling the job reloads into this result set
+                    save_result_set(job.query, results)
+                    self.stdout.write(f"✅ Job {job.id} done with {len(results)} results")
+                else:
+                    self.stdout.write(f"⚠️ Job {job.id} lease was lost, results discarded")
+
+        except KeyboardInterrupt:
+            pass
+
+        finally:
+            scraper_manager.close_all_scrapers()
+            self.stdout.write("\n🧹 Cleanup completed")
+
+        self.stdout.write(self.style.SUCCESS('Scrape worker stopped'))
@@ -0,0 +1,202 @@
+import random
+import re
+import zlib
+from typing import List, Dict, Iterable, Optional, Set, Tuple, Callable
+
+from django.conf import settings
+
+from .models import Product, ProductListing, ProductMatchKey
+
+
+# MinHash signature split into LSH bands: names sharing any band become candidates.
+# 16 bands of 3 rows catch ~98% of pairs at 0.6 trigram similarity.
+LSH_BANDS = 16
+LSH_ROWS = 3
+MERSENNE_PRIME = (1 << 61) - 1
+
+_rng = random.Random(1729)  # Fixed seed: stored keys must hash the same in every process
+HASH_PARAMS = [
+    (_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME))
+    for _ in range(LSH_BANDS * LSH_ROWS)
+]
+
+CAPACITY_PATTERN = re.compile(r'^\d+(?:gb|tb|mb)$')
+VARIANT_WORDS = frozenset(['pro', 'max', 'plus', 'ultra', 'mini', 'lite', 'air', 'se', 'fe'])
+COLOUR_WORDS = frozenset([
+    'black', 'white', 'blue', 'red', 'green', 'yellow', 'pink', 'purple', 'orange', 'brown',
+    'silver', 'gold', 'grey', 'gray', 'graphite', 'midnight', 'starlight', 'natural', 'desert',
+    'rose', 'bronze', 'cream', 'beige', 'navy', 'teal', 'violet', 'lavender', 'mint', 'coral',
+    'charcoal', 'onyx', 'cobalt', 'matte', 'glossy',
+])
+
+
+def clean_name(name: str) -> str:
+    """Lowercase a name and reduce punctuation to single spaces."""
+    return ' '.join(re.sub(r'[^\w\s]', ' ', name.lower()).split())
+
+
+def trigrams(name: str) -> Set[str]:
+    """Character trigrams of a cleaned name."""
+    name = clean_name(name)
+    return {name[i:i + 3] for i in range(max(len(name) - 2, 1))}
+
+
+def similarity(a: Set[str], b: Set[str]) -> float:
+    """Jaccard similarity of two trigram sets."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def features(name: str) -> Tuple[frozenset, frozenset, frozenset, frozenset]:
+    """Capacities, other numbered tokens, variant words and colours, which must agree between matches."""
+    tokens = clean_name(name).split()
+    capacities = frozenset(token for token in tokens if CAPACITY_PATTERN.match(token))
+    numbers = frozenset(
+        token for token in tokens if any(c.isdigit() for c in token) and token not in capacities
+    )
+    variants = frozenset(token for token in tokens if token in VARIANT_WORDS)
+    colours = frozenset(token for token in tokens if token in COLOUR_WORDS)
+    return capacities, numbers, variants, colours
+
+
+def compatible(a: Tuple, b: Tuple) -> bool:
+    """Whether two names can be the same product.
+
+    15 Pro never matches 15 Pro Max or 14 Pro, and Natural Titanium never
+    matches Blue Titanium; a name without a colour matches any colour.
+    """
+    capacities_a, numbers_a, variants_a, colours_a = a
+    capacities_b, numbers_b, variants_b, colours_b = b
+    if capacities_a and capacities_b and capacities_a != capacities_b:
+        return False
+    if not (numbers_a <= numbers_b or numbers_b <= numbers_a):
+        return False
+    if not (colours_a <= colours_b or colours_b <= colours_a):
+        return False
+    return variants_a == variants_b
+
+
+def match_keys(name: str) -> List[str]:
+    """LSH band keys of a name's MinHash signature."""
+    hashes = [zlib.crc32(gram.encode()) for gram in trigrams(name)]
+    signature = [min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in HASH_PARAMS]
+
+    keys = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+        digest = zlib.crc32(','.join(str(value) for value in rows).encode())
+        keys.append(f"{band}:{digest:08x}")
+    return keys
+
+
+class ProductMatcher:
+    """Resolves product names in a batch to existing products by similarity.
+
+    Candidate products are fetched for the whole batch up front, with one query
+    on the LSH keys and one for the products, so matching a name never scans the
+    Product table. Products added during the batch are matched in memory.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.keys = {name: match_keys(name) for name in set(names)}
+        self.buckets: Dict[str, List[Product]] = {}
+        self.threshold = settings.PRODUCT_MATCH_THRESHOLD
+
+        all_keys = {key for keys in self.keys.values() for key in keys}
+        if not all_keys:
+            return
+
+        pairs = list(ProductMatchKey.objects.filter(key__in=all_keys).values_list('key', 'product_id'))
+        products = Product.objects.in_bulk({product_id for _, product_id in pairs})
+        for key, product_id in pairs:
+            if product_id in products:
+                self.buckets.setdefault(key, []).append(products[product_id])
+
+    def candidates(self) -> List[Product]:
+        """Every stored product this batch's names could match."""
+        return list({id(product): product for products in self.buckets.values() for product in products}.values())
+
+    def match(self, name: str, allowed: Optional[Callable[[Product], bool]] = None) -> Optional[Product]:
+        """Best compatible product above the similarity threshold, if any.
+
+        allowed can veto candidates outright, e.g. products the row's store
+        already lists under a different SKU.
+        """
+        keys = self.keys.get(name) or match_keys(name)
+        name_grams = trigrams(name)
+        name_features = features(name)
+
+        best, best_score = None, self.threshold
+        seen = set()
+        for key in keys:
+            for product in self.buckets.get(key, ()):
+                if id(product) in seen:
+                    continue
+                seen.add(id(product))
+                if not compatible(name_features, features(product.normalized_name)):
+                    continue
+                if allowed and not allowed(product):
+                    continue
+                score = similarity(name_grams, trigrams(product.normalized_name))
+                if score >= best_score:
+                    best, best_score = product, score
+        return best
+
+    def add(self, product: Product, name: Optional[str] = None):
+        """Make a product created in this batch matchable by the rest of the batch."""
+        name = name or product.normalized_name
+        for key in self.keys.get(name) or match_keys(name):
+            self.buckets.setdefault(key, []).append(product)
+
+
+class SkuClaims:
+    """The store product id each product is listed under, per store.
+
+    A store lists each SKU once, so two of its SKUs (say the white and black
+    iPhone 16 Pro) can never be one product: their prices would overwrite each
+    other in a single listing. Products created in the current batch have no id
+    yet and are tracked by object identity.
+    """
+
+    def __init__(self, products: Iterable[Product], store_ids: Iterable[int]):
+        self.claims: Dict[int, Dict[int, str]] = {}
+        product_ids = {product.id for product in products if product.id}
+        if product_ids:
+            for product_id, store_id, sku in ProductListing.objects.filter(
+                product_id__in=product_ids, store_id__in=set(store_ids),
+            ).exclude(store_product_id='').values_list('product_id', 'store_id', 'store_product_id'):
+                self.claims.setdefault(product_id, {})[store_id] = sku
+
+    @staticmethod
+    def key(product: Product) -> int:
+        return product.id or id(product)
+
+    def conflicts(self, product: Product, store_id: int, sku: str) -> bool:
+        """Whether the store already lists the product under another SKU."""
+        claimed = self.claims.get(self.key(product), {}).get(store_id)
+        return bool(sku and claimed and claimed != sku)
+
+    def claim(self, product: Product, store_id: int, sku: str):
+        """Record that a row of this batch lists the product under a SKU."""
+        if sku:
+            self.claims.setdefault(self.key(product), {}).setdefault(store_id, sku)
+
+
+def index_product_names(pairs: Iterable[Tuple[Product, str]]):
+    """Store LSH keys for (product, name) pairs; names may be aliases matched to the product."""
+    ProductMatchKey.objects.bulk_create(
+        [ProductMatchKey(product=product, key=key) for product, name in pairs for key in match_keys(name)],
+        ignore_conflicts=True,
+    )
+
+
+def rebuild_match_index() -> int:
+    """Re-key every product from its normalized name. Returns the number of products indexed."""
+    ProductMatchKey.objects.all().delete()
+    count = 0
+    for start in range(0, Product.objects.count(), 500):
+        products = list(Product.objects.order_by('id')[start:start + 500])
+        index_product_names((product, product.normalized_name) for product in products)
+        count += len(products)
+    return count
@@ -0,0 +1,41 @@
+from django.db import migrations, OperationalError
+
+
+FTS_TABLE = 'products_listing_fts'
+
+
+def create_fts_index(apps, schema_editor):
+    """Create and fill the FTS5 index; databases without FTS5 use the Python fallback."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    try:
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "title, name, normalized_name, brand, model, "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+    except OperationalError:
+        return
+
+    schema_editor.execute(
+        f"INSERT INTO {FTS_TABLE} (rowid, title, name, normalized_name, brand, model) "
+        "SELECT l.id, l.title, p.name, p.normalized_name, p.brand, p.model "
+        "FROM products_productlisting l JOIN products_product p ON p.id = l.product_id"
+    )
+
+
+def drop_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_scrapejob'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
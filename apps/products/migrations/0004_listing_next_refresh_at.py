@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_listing_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productlisting',
+            name='next_refresh_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
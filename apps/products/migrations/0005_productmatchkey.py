@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def index_products(apps, schema_editor):
+    """Key existing products so new titles can be matched against them."""
+    from apps.products.matching import match_keys
+
+    Product = apps.get_model('products', 'Product')
+    ProductMatchKey = apps.get_model('products', 'ProductMatchKey')
+    for product in Product.objects.only('id', 'normalized_name').iterator():
+        ProductMatchKey.objects.bulk_create(
+            [ProductMatchKey(product_id=product.id, key=key) for key in match_keys(product.normalized_name)],
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_listing_next_refresh_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductMatchKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(db_index=True, max_length=64)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='match_keys', to='products.product')),
+            ],
+            options={
+                'unique_together': {('product', 'key')},
+            },
+        ),
+        migrations.RunPython(index_products, migrations.RunPython.noop),
+    ]
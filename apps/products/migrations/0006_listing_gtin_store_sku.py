@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_productmatchkey'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productlisting',
+            name='gtin',
+            field=models.CharField(blank=True, db_index=True, max_length=14),
+        ),
+        migrations.AddConstraint(
+            model_name='productlisting',
+            constraint=models.UniqueConstraint(condition=models.Q(('store_product_id', ''), _negated=True), fields=('store', 'store_product_id'), name='unique_store_product_id'),
+        ),
+    ]
@@ -0,0 +1,126 @@
+# Moves prices from DecimalField columns to integer-cents columns.
+# Each amount is copied into a new *_cents column with one UPDATE per column,
+# then the decimal column is dropped and the new field takes over its name, so
+# code keeps reading listing.current_price as a Decimal.
+
+import apps.products.fields
+from django.db import migrations, models
+from django.db.models import F
+from django.db.models.functions import Cast, Round
+
+
+PRICE_COLUMNS = {
+    'ProductListing': ['current_price', 'original_price'],
+    'PriceHistory': ['price', 'original_price'],
+}
+
+
+def decimal_to_cents(apps, schema_editor):
+    for model_name, fields in PRICE_COLUMNS.items():
+        model = apps.get_model('products', model_name)
+        model.objects.update(**{
+            f'{field}_cents': Cast(Round(F(field) * 100), models.BigIntegerField())
+            for field in fields
+        })
+
+
+def cents_to_decimal(apps, schema_editor):
+    for model_name, fields in PRICE_COLUMNS.items():
+        model = apps.get_model('products', model_name)
+        model.objects.update(**{f'{field}': F(f'{field}_cents') / 100.0 for field in fields})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_listing_gtin_store_sku'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='productlisting',
+            name='products_pr_current_8504dc_idx',
+        ),
+        migrations.AddField(
+            model_name='productlisting',
+            name='current_price_cents',
+            field=apps.products.fields.CentsField(db_column='current_price_cents', default=0),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='productlisting',
+            name='original_price_cents',
+            field=apps.products.fields.CentsField(blank=True, db_column='original_price_cents', null=True),
+        ),
+        migrations.AddField(
+            model_name='pricehistory',
+            name='price_cents',
+            field=apps.products.fields.CentsField(db_column='price_cents', default=0),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='pricehistory',
+            name='original_price_cents',
+            field=apps.products.fields.CentsField(blank=True, db_column='original_price_cents', null=True),
+        ),
+        # Nullable while both columns exist, so unapplying can re-add them before the copy back
+        migrations.AlterField(
+            model_name='productlisting',
+            name='current_price',
+            field=models.DecimalField(decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AlterField(
+            model_name='pricehistory',
+            name='price',
+            field=models.DecimalField(decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.RunPython(decimal_to_cents, cents_to_decimal),
+        migrations.RemoveField(
+            model_name='productlisting',
+            name='current_price',
+        ),
+        migrations.RemoveField(
+            model_name='productlisting',
+            name='original_price',
+        ),
+        migrations.RemoveField(
+            model_name='pricehistory',
+            name='price',
+        ),
+        migrations.RemoveField(
+            model_name='pricehistory',
+            name='original_price',
+        ),
+        migrations.RenameField(
+            model_name='productlisting',
+            old_name='current_price_cents',
+            new_name='current_price',
+        ),
+        migrations.RenameField(
+            model_name='productlisting',
+            old_name='original_price_cents',
+            new_name='original_price',
+        ),
+        migrations.RenameField(
+            model_name='pricehistory',
+            old_name='price_cents',
+            new_name='price',
+        ),
+        migrations.RenameField(
+            model_name='pricehistory',
+            old_name='original_price_cents',
+            new_name='original_price',
+        ),
+        migrations.AddIndex(
+            model_name='productlisting',
+            index=models.Index(fields=['current_price'], name='products_pr_current_af0c33_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productlisting',
+            index=models.Index(fields=['product', 'current_price'], name='products_pr_product_b8eb1f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pricehistory',
+            index=models.Index(fields=['listing', 'price'], name='products_pr_listing_1fed9a_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:46
+
+import apps.products.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_integer_cents_prices'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchResultSet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(max_length=500)),
+                ('result_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['query', 'created_at'], name='products_se_query_643f59_idx'), models.Index(fields=['created_at'], name='products_se_created_e95a71_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchResultItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('price', apps.products.fields.CentsField(blank=True, db_column='price_cents', null=True)),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.productlisting')),
+                ('result_set', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='products.searchresultset')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['result_set', 'price', 'listing'], name='products_se_result__b0c161_idx')],
+                'unique_together': {('result_set', 'listing')},
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:49
+
+import apps.products.fields
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_best_offers(apps, schema_editor):
+    """Point existing products at their cheapest available listing."""
+    Product = apps.get_model('products', 'Product')
+    ProductListing = apps.get_model('products', 'ProductListing')
+    offers = ProductListing.objects.filter(product=OuterRef('pk'), is_available=True, current_price__gt=0)
+    cheapest = offers.order_by('current_price', 'id')
+    Product.objects.update(
+        best_price=Subquery(cheapest.values('current_price')[:1]),
+        best_store=Subquery(cheapest.values('store')[:1]),
+        offer_count=Coalesce(
+            Subquery(offers.order_by().values('product').annotate(count=Count('id')).values('count')), 0
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_search_result_sets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='best_price',
+            field=apps.products.fields.CentsField(blank=True, db_column='best_price_cents', null=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='best_store',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='products.store'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='offer_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='price_changed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['best_price'], name='products_pr_best_pr_bf6a1d_idx'),
+        ),
+        migrations.RunPython(fill_best_offers, migrations.RunPython.noop),
+    ]
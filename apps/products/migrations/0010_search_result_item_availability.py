@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:16
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_availability(apps, schema_editor):
+    """Snapshot the current availability of the listings in existing result sets."""
+    SearchResultItem = apps.get_model('products', 'SearchResultItem')
+    ProductListing = apps.get_model('products', 'ProductListing')
+    SearchResultItem.objects.update(
+        is_available=Subquery(ProductListing.objects.filter(pk=OuterRef('listing')).values('is_available')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_product_best_offer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='searchresultitem',
+            name='is_available',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.RunPython(fill_availability, migrations.RunPython.noop),
+    ]
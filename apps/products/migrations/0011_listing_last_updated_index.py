@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0010_search_result_item_availability'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productlisting',
+            index=models.Index(fields=['last_updated', 'id'], name='products_pr_last_up_79bd29_idx'),
+        ),
+    ]
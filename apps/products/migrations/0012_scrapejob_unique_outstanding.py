@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:30
+
+from django.db import migrations, models
+
+
+def fail_duplicate_jobs(apps, schema_editor):
+    """Keep the oldest outstanding job per query and fail the others."""
+    ScrapeJob = apps.get_model('products', 'ScrapeJob')
+    kept = set()
+    for job in ScrapeJob.objects.filter(status__in=['pending', 'running']).order_by('created_at', 'id'):
+        if job.query in kept:
+            ScrapeJob.objects.filter(pk=job.pk).update(
+                status='failed', leased_until=None, error='Duplicate of an outstanding job',
+            )
+        kept.add(job.query)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0011_listing_last_updated_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_duplicate_jobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='scrapejob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'running'])), fields=('query',), name='unique_outstanding_scrape_job'),
+        ),
+    ]
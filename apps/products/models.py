@@ -1,6 +1,9 @@
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 
+from .fields import CentsField
+
 
 class Store(models.Model):
     """Model representing different online stores."""
@@ -23,6 +26,11 @@ class Product(models.Model):
     category = models.CharField(max_length=200, blank=True)
     brand = models.CharField(max_length=100, blank=True)
     model = models.CharField(max_length=200, blank=True)
+    # Cheapest available offer across stores, kept up to date by the batch writes (see offers.py)
+    best_price = CentsField(db_column='best_price_cents', null=True, blank=True)
+    best_store = models.ForeignKey('Store', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    offer_count = models.PositiveIntegerField(default=0)
+    price_changed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -31,6 +39,7 @@ class Product(models.Model):
         indexes = [
             models.Index(fields=['normalized_name']),
             models.Index(fields=['brand', 'model']),
+            models.Index(fields=['best_price']),
         ]
     
     def __str__(self):
@@ -42,13 +51,15 @@ class ProductListing(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='listings')
     store = models.ForeignKey(Store, on_delete=models.CASCADE, related_name='listings')
     store_product_id = models.CharField(max_length=200, blank=True)
+    gtin = models.CharField(max_length=14, blank=True, db_index=True)
     title = models.CharField(max_length=500)
     url = models.URLField()
     image_url = models.URLField(blank=True)
-    current_price = models.DecimalField(max_digits=10, decimal_places=2)
-    original_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    current_price = CentsField(db_column='current_price_cents')
+    original_price = CentsField(db_column='original_price_cents', null=True, blank=True)
     is_available = models.BooleanField(default=True)
     last_updated = models.DateTimeField(auto_now=True)
+    next_refresh_at = models.DateTimeField(null=True, blank=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -57,17 +68,39 @@ class ProductListing(models.Model):
         indexes = [
             models.Index(fields=['store', 'is_available']),
             models.Index(fields=['current_price']),
+            models.Index(fields=['product', 'current_price']),
+            # The price relay pages through recent writes by (last_updated, id)
+            models.Index(fields=['last_updated', 'id']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['store', 'store_product_id'],
+                condition=~models.Q(store_product_id=''),
+                name='unique_store_product_id',
+            ),
         ]
     
     def __str__(self):
         return f"{self.product.name} - {self.store.name}"
 
 
+class ProductMatchKey(models.Model):
+    """Model for a similarity bucket of a product name, used to find match candidates."""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='match_keys')
+    key = models.CharField(max_length=64, db_index=True)
+    
+    class Meta:
+        unique_together = ['product', 'key']
+    
+    def __str__(self):
+        return f"{self.key} -> {self.product_id}"
+
+
 class PriceHistory(models.Model):
     """Model for storing historical price data."""
     listing = models.ForeignKey(ProductListing, on_delete=models.CASCADE, related_name='price_history')
-    price = models.DecimalField(max_digits=10, decimal_places=2)
-    original_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    price = CentsField(db_column='price_cents')
+    original_price = CentsField(db_column='original_price_cents', null=True, blank=True)
     is_available = models.BooleanField(default=True)
     recorded_at = models.DateTimeField(auto_now_add=True)
     
@@ -75,6 +108,7 @@ class PriceHistory(models.Model):
         ordering = ['-recorded_at']
         indexes = [
             models.Index(fields=['listing', 'recorded_at']),
+            models.Index(fields=['listing', 'price']),
         ]
     
     def __str__(self):
@@ -97,3 +131,82 @@ class SearchQuery(models.Model):
     
     def __str__(self):
         return f"{self.query} ({self.searched_at})"
+
+
+class ScrapeJob(models.Model):
+    """Model for a queued scrape of all stores, claimed by worker processes."""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    query = models.CharField(max_length=500)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    leased_until = models.DateTimeField(null=True, blank=True)
+    worker_id = models.CharField(max_length=100, blank=True)
+    results = models.JSONField(default=list, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['run_after']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+            models.Index(fields=['query', 'status']),
+        ]
+        constraints = [
+            # Concurrent searches for one query share a single outstanding job
+            models.UniqueConstraint(
+                fields=['query'],
+                condition=models.Q(status__in=['pending', 'running']),
+                name='unique_outstanding_scrape_job',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.query} ({self.status})"
+
+
+class SearchResultSet(models.Model):
+    """Model for the listings a search found, so result pages are read from the database."""
+    query = models.CharField(max_length=500)
+    result_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['query', 'created_at']),
+            models.Index(fields=['created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.query} ({self.result_count} results)"
+
+
+class SearchResultItem(models.Model):
+    """Model for one listing in a result set, with the price and availability it was ranked by."""
+    result_set = models.ForeignKey(SearchResultSet, on_delete=models.CASCADE, related_name='items')
+    listing = models.ForeignKey(ProductListing, on_delete=models.CASCADE, related_name='+')
+    price = CentsField(db_column='price_cents', null=True, blank=True)
+    is_available = models.BooleanField(default=True)
+    
+    class Meta:
+        unique_together = ['result_set', 'listing']
+        indexes = [
+            # Keyset pagination walks (price, listing) within one result set
+            models.Index(fields=['result_set', 'price', 'listing']),
+        ]
+    
+    def __str__(self):
+        return f"{self.result_set_id}: {self.listing_id}"
@@ -0,0 +1,107 @@
+from decimal import Decimal
+from typing import List, Dict, Iterable, Optional, Tuple
+
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Product, ProductListing
+
+
+BEST_OFFER_FIELDS = ['best_price', 'best_store', 'offer_count', 'price_changed_at']
+
+
+def offer_price(listing: ProductListing) -> Optional[Decimal]:
+    """The price a listing offers, or None when it is unavailable or unpriced."""
+    if not listing.is_available or not listing.current_price:
+        return None
+    return listing.current_price
+
+
+def set_best_offer(product: Product, price: Optional[Decimal], store_id: Optional[int], now) -> None:
+    """Point a product at its cheapest offer, stamping the time if the best price moved."""
+    if price != product.best_price:
+        product.price_changed_at = now
+    product.best_price = price
+    product.best_store_id = store_id
+
+
+def best_offers(product_ids: Iterable[int]) -> Dict[int, Tuple[Optional[Decimal], Optional[int], int]]:
+    """(best price, best store id, offer count) per product, from one query over their listings."""
+    offers = {product_id: (None, None, 0) for product_id in product_ids}
+    listings = ProductListing.objects.filter(
+        product_id__in=offers, is_available=True, current_price__gt=0,
+    ).order_by('product_id', 'current_price', 'id').values_list('product_id', 'current_price', 'store_id')
+
+    for product_id, price, store_id in listings:
+        best_price, best_store_id, count = offers[product_id]
+        if best_price is None:
+            offers[product_id] = (price, store_id, count + 1)
+        else:
+            offers[product_id] = (best_price, best_store_id, count + 1)
+    return offers
+
+
+def update_best_offers(changes: List[Tuple[Product, ProductListing, Optional[Decimal]]], now=None) -> List[Product]:
+    """Fold listing changes from a batch write into their products' best offer.
+
+    Each change is (product, listing, offer price before the write). A cheaper
+    or new offer is applied in memory; only products whose best offer got
+    dearer or was withdrawn are recomputed, with one query for all of them.
+    Call after the listings are written; returns the products that were saved.
+    """
+    now = now or timezone.now()
+    products = {}
+    recompute = set()
+
+    for product, listing, old_price in changes:
+        new_price = offer_price(listing)
+        if new_price == old_price:
+            continue
+        product = products.setdefault(product.id, product)
+        if product.id in recompute:
+            continue
+
+        if old_price is None:
+            product.offer_count += 1
+        elif new_price is None:
+            product.offer_count -= 1
+
+        if new_price is not None and (product.best_price is None or new_price < product.best_price):
+            set_best_offer(product, new_price, listing.store_id, now)
+        elif listing.store_id == product.best_store_id:
+            # The best offer got dearer or was withdrawn; another store may now be cheapest
+            recompute.add(product.id)
+
+    for product_id, (price, store_id, count) in best_offers(recompute).items():
+        set_best_offer(products[product_id], price, store_id, now)
+        products[product_id].offer_count = count
+
+    if products:
+        Product.objects.bulk_update(products.values(), BEST_OFFER_FIELDS)
+    return list(products.values())
+
+
+def refresh_best_offers(product_ids: Iterable[int]) -> None:
+    """Recompute the best offer of a few products, e.g. after a single listing is saved."""
+    now = timezone.now()
+    offers = best_offers(product_ids)
+    products = list(Product.objects.filter(id__in=offers))
+    for product in products:
+        price, store_id, count = offers[product.id]
+        set_best_offer(product, price, store_id, now)
+        product.offer_count = count
+    Product.objects.bulk_update(products, BEST_OFFER_FIELDS)
+
+
+def rebuild_best_offers() -> int:
+    """Recompute every product's best offer with one UPDATE. Returns the number of products."""
+    offers = ProductListing.objects.filter(product=OuterRef('pk'), is_available=True, current_price__gt=0)
+    cheapest = offers.order_by('current_price', 'id')
+    return Product.objects.update(
+        best_price=Subquery(cheapest.values('current_price')[:1]),
+        best_store=Subquery(cheapest.values('store')[:1]),
+        offer_count=Coalesce(
+            Subquery(offers.order_by().values('product').annotate(count=Count('id')).values('count')), 0
+        ),
+    )
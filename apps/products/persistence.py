@@ -0,0 +1,384 @@
+import logging
+from decimal import Decimal, InvalidOperation
+from typing import List, Dict, Optional, Iterable
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Product, ProductListing, Store, PriceHistory
+from .search_index import index_listings
+from .matching import ProductMatcher, SkuClaims, index_product_names
+from .brands import get_extractor
+from apps.scrapers.identifiers import normalize_gtin
+from apps.scrapers.normalization import normalize_product_names
+from .refresh import schedule_refresh
+from .offers import offer_price, update_best_offers
+from .cache_tags import invalidate_tags, listing_tag, product_tag
+
+
+logger = logging.getLogger(__name__)
+
+# Process-wide cache of Store rows by name; cleared by the Store signals
+_store_registry: Dict[str, Store] = {}
+
+
+def clear_store_registry():
+    """Forget cached stores so the next batch reloads them."""
+    _store_registry.clear()
+
+
+def resolve_stores(names: Iterable[str]) -> Dict[str, Store]:
+    """Return stores by name from the registry, loading or creating missing ones in bulk."""
+    names = set(names)
+    missing = names - _store_registry.keys()
+
+    if missing:
+        found = {store.name: store for store in Store.objects.filter(name__in=missing)}
+        new_names = missing - found.keys()
+        if new_names:
+            Store.objects.bulk_create(
+                [Store(name=name, base_url=get_store_url(name)) for name in new_names],
+                ignore_conflicts=True,
+            )
+            found.update({store.name: store for store in Store.objects.filter(name__in=new_names)})
+        _store_registry.update(found)
+
+    return {name: _store_registry[name] for name in names}
+
+
+def resolve_products(rows: List[Dict], stores: Dict[str, Store]):
+    """Attach a product to each row, creating missing products in bulk.
+
+    Candidates are tried in order: the product of the row's GTIN, products with
+    exactly the row's normalized name (one IN query), then similar names from
+    the product match index and earlier rows of the batch, so variant titles
+    from different stores share one product. A candidate the row's store
+    already lists under another store product id is skipped, so a store's
+    distinct SKUs always end up on products of their own.
+    """
+    names = {row['normalized_name'] for row in rows}
+
+    by_name = {}
+    for product in Product.objects.filter(normalized_name__in=names).order_by('id'):
+        by_name.setdefault(product.normalized_name, []).append(product)
+
+    matcher = ProductMatcher(names - by_name.keys())
+    claims = SkuClaims(
+        [product for products in by_name.values() for product in products]
+        + matcher.candidates()
+        + [row['gtin_product'] for row in rows if 'gtin_product' in row],
+        [store.id for store in stores.values()],
+    )
+    new_products = []
+    aliases = []
+    for row in rows:
+        name = row['normalized_name']
+        store_id = stores[row['store']].id
+        sku = row['store_product_id']
+
+        def allowed(product: Product) -> bool:
+            return not claims.conflicts(product, store_id, sku)
+
+        candidates = [row['gtin_product']] if 'gtin_product' in row else []
+        product = next((product for product in candidates + by_name.get(name, []) if allowed(product)), None)
+        if product is None:
+            product = matcher.match(name, allowed)
+            if product is not None:
+                aliases.append((product, name))
+        if product is None:
+            product = Product(normalized_name=name, name=row['title'])
+            new_products.append(product)
+            matcher.add(product, name)
+        # Later rows with this name try it first
+        same_name = by_name.setdefault(name, [])
+        if not any(product is other for other in same_name):
+            same_name.append(product)
+        claims.claim(product, store_id, sku)
+        row['product'] = product
+
+    if new_products:
+        # Brands and models for all new products in one pass
+        extracted = get_extractor().extract([product.name for product in new_products])
+        for product, (brand, model) in zip(new_products, extracted):
+            product.brand = brand
+            product.model = model
+        Product.objects.bulk_create(new_products)
+    if new_products or aliases:
+        index_product_names(
+            [(product, product.normalized_name) for product in new_products] + aliases
+        )
+
+
+def link_identified_products(rows: List[Dict], stores: Dict[str, Store]):
+    """Attach products to rows whose store product id is already known.
+
+    This is the exact-match path: a re-scraped listing is found by (store,
+    store_product_id), one indexed query, with no name matching. Another
+    store's copy found by GTIN is left in 'gtin_product' as the first candidate
+    for resolve_products. Rows repeating an unknown identifier from earlier in
+    the batch get 'same_as' pointing at that row so they share its product,
+    unless both come from one store under different store product ids.
+    """
+    skus = {row['store_product_id'] for row in rows if row['store_product_id']}
+    gtins = {row['gtin'] for row in rows if row['gtin']}
+
+    by_sku = {}
+    if skus:
+        for listing in ProductListing.objects.filter(
+            store_id__in={store.id for store in stores.values()},
+            store_product_id__in=skus,
+        ).select_related('product'):
+            by_sku[(listing.store_id, listing.store_product_id)] = listing.product
+
+    by_gtin = {}
+    if gtins:
+        for listing in ProductListing.objects.filter(gtin__in=gtins).select_related('product').order_by('id'):
+            by_gtin.setdefault(listing.gtin, listing.product)
+
+    def same_store_conflict(first: Dict, row: Dict) -> bool:
+        return bool(first['store'] == row['store'] and first['store_product_id'] and row['store_product_id']
+                    and first['store_product_id'] != row['store_product_id'])
+
+    seen = {}
+    for row in rows:
+        store_id = stores[row['store']].id
+        if (store_id, row['store_product_id']) in by_sku:
+            row['product'] = by_sku[(store_id, row['store_product_id'])]
+            continue
+        if row['gtin'] in by_gtin:
+            row['gtin_product'] = by_gtin[row['gtin']]
+            continue
+
+        identifiers = []
+        if row['store_product_id']:
+            identifiers.append(('sku', store_id, row['store_product_id']))
+        if row['gtin']:
+            identifiers.append(('gtin', row['gtin']))
+
+        first = next(
+            (seen[identifier] for identifier in identifiers
+             if identifier in seen and not same_store_conflict(seen[identifier], row)),
+            None,
+        )
+        if first:
+            row['same_as'] = first
+        for identifier in identifiers:
+            seen.setdefault(identifier, first or row)
+
+
+def to_price(value) -> Optional[Decimal]:
+    """Convert a scraped price to a two-place Decimal, or None."""
+    if value is None or value == '':
+        return None
+    try:
+        return Decimal(str(value)).quantize(Decimal('0.01'))
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def persist_scraped_results(scraped_results: List[Dict]) -> List[Dict]:
+    """Save a batch of scraped results in one transaction and return them as listing dicts."""
+    return persist_batches([scraped_results])[0]
+
+
+def persist_batches(batches: List[List[Dict]]) -> List[List[Dict]]:
+    """Save several batches of scraped results in one transaction.
+
+    Stores come from the registry, products and listings are looked up with one
+    IN query each, and all writes are bulk inserts/updates, so the number of
+    queries does not grow with the number of results. Returns the listing dicts
+    for each batch, in the order given.
+    """
+    rows = []
+    for batch_index, scraped_results in enumerate(batches):
+        for result in scraped_results:
+            if not result.get('title') or not result.get('store') or not result.get('url'):
+                logger.warning("Skipping scraped result without a title, store or url: %s", result)
+                continue
+            rows.append({
+                'batch': batch_index,
+                'title': result['title'],
+                'url': result['url'],
+                'image_url': result.get('image_url') or '',
+                'store': result['store'],
+                'price': to_price(result.get('price')),
+                'original_price': to_price(result.get('original_price')),
+                'store_product_id': str(result.get('product_id') or '')[:200],
+                'gtin': normalize_gtin(result.get('gtin')) or '',
+            })
+
+    for row, name in zip(rows, normalize_product_names(row['title'] for row in rows)):
+        row['normalized_name'] = name
+
+    persisted = [[] for _ in batches]
+    if not rows:
+        return persisted
+
+    now = timezone.now()
+
+    with transaction.atomic():
+        stores = resolve_stores(row['store'] for row in rows)
+        link_identified_products(rows, stores)
+        resolve_products([row for row in rows if 'product' not in row and 'same_as' not in row], stores)
+        for row in rows:
+            if 'same_as' in row:
+                row['product'] = row['same_as']['product']
+
+        listings = {
+            (listing.product_id, listing.store_id): listing
+            for listing in ProductListing.objects.filter(
+                product_id__in={row['product'].id for row in rows},
+                store_id__in={store.id for store in stores.values()},
+            ).select_related('product')
+        }
+
+        new_listings = {}
+        updated_listings = {}
+        changed_ids = set()
+        # Listings whose cached pages are stale: repriced, or only their "was" price changed
+        stale_ids = set()
+        history = []
+        offer_changes = []
+
+        for row in rows:
+            product = row['product']
+            store = stores[row['store']]
+            key = (product.id, store.id)
+            price = row['price']
+
+            listing = listings.get(key)
+            old_offer = offer_price(listing) if listing is not None else None
+            if listing is None:
+                listing = ProductListing(
+                    product=product,
+                    store=store,
+                    title=row['title'],
+                    url=row['url'],
+                    image_url=row['image_url'],
+                    store_product_id=row['store_product_id'],
+                    gtin=row['gtin'],
+                    current_price=price or 0,
+                    original_price=row['original_price'],
+                    is_available=price is not None,
+                    last_updated=now,
+                )
+                listings[key] = new_listings[key] = listing
+
+            elif price and listing.current_price != price:
+                # Record the price being replaced, as the per-row version did
+                history.append(PriceHistory(
+                    listing=listing,
+                    price=listing.current_price,
+                    original_price=listing.original_price,
+                    is_available=listing.is_available,
+                ))
+                listing.current_price = price
+                listing.original_price = row['original_price']
+                listing.is_available = True
+                listing.last_updated = now
+                if key not in new_listings:
+                    updated_listings[key] = listing
+                    changed_ids.add(listing.id)
+
+            elif key not in new_listings:
+                # Unchanged, but confirmed by this scrape; freshness checks rely on it
+                listing.last_updated = now
+                updated_listings[key] = listing
+
+            if key not in new_listings:
+                # Keep identifiers current so later scrapes take the exact-match path; a known
+                # store product id is never replaced, since another SKU is another listing
+                listing.store_product_id = listing.store_product_id or row['store_product_id']
+                listing.gtin = row['gtin'] or listing.gtin
+                if price:
+                    # A sale can end without the price changing back, so the "was" price follows every scrape
+                    if listing.original_price != row['original_price']:
+                        stale_ids.add(listing.id)
+                    listing.original_price = row['original_price']
+
+            row['listing'] = listing
+            offer_changes.append((product, listing, old_offer))
+
+        # Volatile listings come due sooner; see apps.products.refresh
+        schedule_refresh(list(new_listings.values()) + list(updated_listings.values()), changed_ids, now)
+
+        if new_listings:
+            # A concurrent writer may have inserted the same listing since we looked
+            ProductListing.objects.bulk_create(
+                new_listings.values(),
+                update_conflicts=True,
+                unique_fields=['product', 'store'],
+                update_fields=['current_price', 'original_price', 'is_available', 'last_updated',
+                               'next_refresh_at', 'store_product_id', 'gtin'],
+            )
+            index_listings(listing.id for listing in new_listings.values())
+        if updated_listings:
+            ProductListing.objects.bulk_update(
+                updated_listings.values(),
+                ['current_price', 'original_price', 'is_available', 'last_updated', 'next_refresh_at',
+                 'store_product_id', 'gtin'],
+            )
+        if history:
+            PriceHistory.objects.bulk_create(history)
+        # Products carry their cheapest offer; fold this batch's changes into it
+        update_best_offers(offer_changes, now)
+
+        # Cached searches and detail pages showing a changed listing, or the product of a new one
+        stale_tags = [listing_tag(listing_id) for listing_id in changed_ids | stale_ids]
+        stale_tags += [product_tag(listing.product_id) for listing in new_listings.values()]
+        # After commit, so a concurrent reader can't re-cache the old rows under the new versions
+        transaction.on_commit(lambda: invalidate_tags(stale_tags))
+
+    for row in rows:
+        persisted[row['batch']].append(listing_result(row['listing']))
+    return persisted
+
+
+def listing_result(listing: ProductListing) -> Dict:
+    """Listing as the result dict used by the search views, API and cache."""
+    return {
+        'id': listing.id,
+        'title': listing.title,
+        'url': listing.url,
+        'price': float(listing.current_price) if listing.current_price else None,
+        'image_url': listing.image_url,
+        'store': listing.store.name,
+        'store_url': listing.store.base_url,
+        'is_available': listing.is_available,
+        'last_updated': listing.last_updated,
+    }
+
+
+def preview_results(scraped_results: List[Dict]) -> List[Dict]:
+    """Shape scraped results like persisted ones without touching the database.
+
+    Used when writes are deferred; 'id' is None until the listing is saved.
+    """
+    now = timezone.now()
+    previews = []
+    for result in scraped_results:
+        if not result.get('title') or not result.get('store') or not result.get('url'):
+            continue
+        price = to_price(result.get('price'))
+        previews.append({
+            'id': None,
+            'title': result['title'],
+            'url': result['url'],
+            'price': float(price) if price else None,
+            'image_url': result.get('image_url') or '',
+            'store': result['store'],
+            'store_url': get_store_url(result['store']),
+            'is_available': price is not None,
+            'last_updated': now,
+        })
+    return previews
+
+
+def get_store_url(store_name: str) -> str:
+    """Get base URL for store."""
+    store_urls = {
+        'Takealot': 'https://www.takealot.com',
+        'Game': 'https://www.game.co.za',
+        'Makro': 'https://www.makro.co.za',
+    }
+    return store_urls.get(store_name, '')
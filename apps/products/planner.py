@@ -0,0 +1,66 @@
+from typing import List, Dict, Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import ProductListing
+from .persistence import listing_result
+from .refresh import is_due
+from .search_index import search_listings
+from apps.scrapers.hybrid_scraper_manager import HybridScraperManager
+
+
+class SearchPlan:
+    """Which stores can answer a query from the database and which must be scraped."""
+
+    def __init__(self, query: str, stores: List[str], fresh: Dict[str, List[Dict]], stale: List[str]):
+        self.query = query
+        self.stores = stores
+        self.fresh = fresh
+        self.stale = stale
+
+    @property
+    def results(self) -> List[Dict]:
+        """Stored results for the fresh stores."""
+        return [result for store_name in self.stores for result in self.fresh.get(store_name, [])]
+
+    @property
+    def complete(self) -> bool:
+        """True when no store needs scraping."""
+        return not self.stale
+
+    @property
+    def scrape_all(self) -> bool:
+        """True when nothing could be served from the database."""
+        return len(self.stale) == len(self.stores)
+
+    def merge(self, scraped_results: List[Dict]) -> List[Dict]:
+        """Combine stored results with freshly scraped ones."""
+        return self.results + scraped_results
+
+
+def is_fresh(listings: List[ProductListing], now=None) -> bool:
+    """Whether no listing has reached its refresh time."""
+    now = now or timezone.now()
+    return not any(is_due(listing, now) for listing in listings)
+
+
+def plan_search(query: str, stores: Optional[List[str]] = None) -> SearchPlan:
+    """Split the stores for a query into fresh (served from the DB) and stale or missing (scraped)."""
+    stores = stores or list(HybridScraperManager.STORES)
+
+    by_store = {}
+    for listing in search_listings(query, limit=settings.SEARCH_PLAN_MAX_LISTINGS):
+        by_store.setdefault(listing.store.name.lower(), []).append(listing)
+
+    now = timezone.now()
+    fresh = {}
+    stale = []
+    for store_name in stores:
+        listings = by_store.get(store_name)
+        if listings and is_fresh(listings, now):
+            fresh[store_name] = [listing_result(listing) for listing in listings]
+        else:
+            stale.append(store_name)
+
+    return SearchPlan(query, stores, fresh, stale)
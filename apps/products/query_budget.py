@@ -0,0 +1,51 @@
+import logging
+from functools import wraps
+
+from django.conf import settings
+from django.db import connection
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when a view runs more queries than its budget allows."""
+
+
+class QueryCounter:
+    """Database execute wrapper that counts the queries run through it."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def query_budget(limit: int):
+    """Cap the number of queries a view (including template rendering) may run.
+
+    Views should cost the same however many rows they show; going over the
+    budget means a lazy relation is being loaded per row. With
+    QUERY_BUDGET_STRICT (defaults to DEBUG; set it in CI, since the test
+    runner turns DEBUG off) the request fails with QueryBudgetExceeded;
+    otherwise a warning is logged.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            # Connection setup (e.g. the SQLite pragmas) doesn't count against the view
+            connection.ensure_connection()
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                response = view(request, *args, **kwargs)
+
+            if counter.count > limit:
+                message = f"{view.__name__} ran {counter.count} queries, budget is {limit}"
+                if settings.QUERY_BUDGET_STRICT:
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,203 @@
+import asyncio
+import json
+import logging
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .models import ProductListing, PriceHistory
+
+logger = logging.getLogger(__name__)
+
+CHANGES_PAGE_SIZE = 500
+
+CHANNEL_PATH = re.compile(r'^/ws/prices/(?:(?P<kind>product|listing)/(?P<id>\d+)|(?P<search>search))/?$')
+
+
+def parse_channel(path: str, query_string: bytes = b'') -> Optional[str]:
+    """Map a WebSocket path to a channel name such as 'product:12' or 'query:iphone 15'."""
+    match = CHANNEL_PATH.match(path)
+    if not match:
+        return None
+
+    if match.group('search'):
+        query = parse_qs(query_string.decode()).get('q', [''])[0]
+        query = ' '.join(query.lower().split())
+        return f"query:{query}" if query else None
+
+    return f"{match.group('kind')}:{match.group('id')}"
+
+
+def fetch_listing_changes(since, after_id: int = 0, limit: int = CHANGES_PAGE_SIZE) -> List[Dict]:
+    """Listings written after a (last_updated, id) position, in that order, as push payloads.
+
+    'repriced' is set for new listings and for writes that recorded a price
+    change; unchanged re-scrapes move last_updated as well and leave it unset.
+    """
+    listings = ProductListing.objects.filter(
+        Q(last_updated__gt=since) | Q(last_updated=since, id__gt=after_id)
+    ).annotate(
+        # The replaced price is recorded with the write, so its history row is no older than the listing
+        repriced=Exists(PriceHistory.objects.filter(listing=OuterRef('pk'), recorded_at__gte=OuterRef('last_updated'))),
+    ).select_related('store', 'product').order_by('last_updated', 'id')[:limit]
+
+    return [{
+        'type': 'price_update',
+        'listing_id': listing.id,
+        'product_id': listing.product_id,
+        'title': listing.title,
+        'store': listing.store.name,
+        'price': float(listing.current_price) if listing.current_price else None,
+        'original_price': float(listing.original_price) if listing.original_price else None,
+        'is_available': listing.is_available,
+        'last_updated': listing.last_updated,
+        # created_at is stamped after last_updated when a listing is inserted
+        'repriced': listing.repriced or listing.created_at >= listing.last_updated,
+        'search_text': f"{listing.title} {listing.product.normalized_name}".lower(),
+    } for listing in listings]
+
+
+class PriceBroadcaster:
+    """Fans listing changes out to WebSocket subscribers in this process.
+
+    Scrapes are written by other processes (web workers, scrape workers) and by
+    bulk queries that never fire model signals, so a single relay task polls
+    ProductListing.last_updated on behalf of every subscriber instead.
+    """
+
+    def __init__(self, interval: float = 2.0, queue_size: int = 100, max_tracked: int = 10000):
+        self.interval = interval
+        self.queue_size = queue_size
+        self.max_tracked = max_tracked
+        self.subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self.relay_task = None
+        # Keyset position of the last listing read; (last_updated, id) never skips a row
+        self.position = (timezone.now(), 0)
+        # (price, original price, availability) last seen per listing, least recently written first
+        self.sent: Dict[int, Tuple] = OrderedDict()
+
+    def subscribe(self, channel: str) -> asyncio.Queue:
+        """Register a queue that receives updates for a channel."""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.setdefault(channel, set()).add(queue)
+
+        if self.relay_task is None or self.relay_task.done():
+            self.relay_task = asyncio.ensure_future(self.relay())
+        return queue
+
+    def unsubscribe(self, channel: str, queue: asyncio.Queue):
+        """Remove a subscriber queue."""
+        queues = self.subscribers.get(channel)
+        if queues:
+            queues.discard(queue)
+            if not queues:
+                del self.subscribers[channel]
+
+    def channels_for(self, update: Dict) -> List[str]:
+        """Channels interested in a listing update."""
+        channels = [f"listing:{update['listing_id']}", f"product:{update['product_id']}"]
+        for channel in self.subscribers:
+            if channel.startswith('query:'):
+                terms = channel[len('query:'):].split()
+                if all(term in update['search_text'] for term in terms):
+                    channels.append(channel)
+        return channels
+
+    def publish(self, update: Dict):
+        """Deliver an update to every subscriber of the matching channels."""
+        message = {key: value for key, value in update.items() if key not in ('search_text', 'repriced')}
+        for channel in self.channels_for(update):
+            for queue in self.subscribers.get(channel, ()):
+                if queue.full():
+                    # Slow client: drop its oldest update rather than stall the relay
+                    queue.get_nowait()
+                queue.put_nowait(message)
+
+    def collect_changes(self) -> List[Dict]:
+        """Updates to publish since the last call, reading every page of written listings.
+
+        A listing is published when its values differ from the ones last seen;
+        the first time one is seen, only if the write repriced or created it.
+        """
+        changes = []
+        while True:
+            updates = fetch_listing_changes(*self.position)
+            for update in updates:
+                values = (update['price'], update['original_price'], update['is_available'])
+                previous = self.sent.pop(update['listing_id'], None)
+                self.sent[update['listing_id']] = values
+                if values != previous and (previous is not None or update['repriced']):
+                    changes.append(update)
+
+            # Forgotten listings are published again only when a write reprices them
+            while len(self.sent) > self.max_tracked:
+                self.sent.popitem(last=False)
+
+            if updates:
+                self.position = (updates[-1]['last_updated'], updates[-1]['listing_id'])
+            if len(updates) < CHANGES_PAGE_SIZE:
+                return changes
+
+    async def relay(self):
+        """Poll for listing changes while anyone is subscribed."""
+        self.position = (timezone.now(), 0)
+        self.sent = OrderedDict()
+
+        while self.subscribers:
+            await asyncio.sleep(self.interval)
+            try:
+                updates = await sync_to_async(self.collect_changes)()
+            except Exception:
+                logger.exception("Price relay failed")
+                continue
+
+            for update in updates:
+                self.publish(update)
+
+
+broadcaster = PriceBroadcaster(interval=settings.PRICE_PUSH_INTERVAL)
+
+
+async def websocket_application(scope, receive, send):
+    """ASGI handler for /ws/prices/... that pushes price updates to the client."""
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+
+    channel = parse_channel(scope['path'], scope.get('query_string', b''))
+    if not channel:
+        await send({'type': 'websocket.close', 'code': 4404})
+        return
+
+    await send({'type': 'websocket.accept'})
+    queue = broadcaster.subscribe(channel)
+    receiver = asyncio.ensure_future(receive())
+    getter = asyncio.ensure_future(queue.get())
+
+    try:
+        while True:
+            done, _ = await asyncio.wait({receiver, getter}, return_when=asyncio.FIRST_COMPLETED)
+
+            if getter in done:
+                await send({
+                    'type': 'websocket.send',
+                    'text': json.dumps(getter.result(), cls=DjangoJSONEncoder),
+                })
+                getter = asyncio.ensure_future(queue.get())
+
+            if receiver in done:
+                # Clients only listen; anything other than a disconnect is ignored
+                if receiver.result()['type'] == 'websocket.disconnect':
+                    break
+                receiver = asyncio.ensure_future(receive())
+    finally:
+        receiver.cancel()
+        getter.cancel()
+        broadcaster.unsubscribe(channel, queue)
@@ -0,0 +1,143 @@
+from datetime import timedelta
+from typing import List, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import ProductListing, PriceHistory
+
+
+REFRESH_RATES_CACHE_KEY = 'refresh_group_intervals'
+
+
+def history_since(now):
+    """Start of the window of price history used to estimate change rates."""
+    return now - timedelta(days=settings.REFRESH_HISTORY_DAYS)
+
+
+def observed_seconds(listing: ProductListing, now) -> float:
+    """How long a listing has been watched within the history window."""
+    start = max(listing.created_at or now, history_since(now))
+    return max((now - start).total_seconds(), 0.0)
+
+
+def clamp_interval(seconds: float) -> float:
+    """Scale an expected time between price changes into a refresh interval within the limits."""
+    seconds *= settings.REFRESH_INTERVAL_FACTOR
+    return min(max(seconds, settings.REFRESH_MIN_INTERVAL), settings.REFRESH_MAX_INTERVAL)
+
+
+def group_intervals(now=None) -> Dict[str, Dict]:
+    """Expected seconds between price changes per category and per store.
+
+    Pools changes and watched time over every listing in the group, so a new
+    listing inherits the behaviour of its siblings. Cached because it reads
+    the whole listing table.
+    """
+    intervals = cache.get(REFRESH_RATES_CACHE_KEY)
+    if intervals is not None:
+        return intervals
+
+    now = now or timezone.now()
+    listings = ProductListing.objects.annotate(
+        changes=Count('price_history', filter=Q(price_history__recorded_at__gte=history_since(now)))
+    ).values_list('store_id', 'product__category', 'created_at', 'changes')
+
+    totals = {'category': {}, 'store': {}}
+    for store_id, category, created_at, changes in listings:
+        start = max(created_at, history_since(now))
+        seconds = max((now - start).total_seconds(), 0.0)
+        for level, key in (('category', category), ('store', store_id)):
+            if level == 'category' and not key:
+                continue
+            group = totals[level].setdefault(key, [0, 0.0])
+            group[0] += changes
+            group[1] += seconds
+
+    intervals = {
+        level: {
+            key: seconds / changes
+            for key, (changes, seconds) in groups.items()
+            if changes >= settings.REFRESH_MIN_CHANGES
+        }
+        for level, groups in totals.items()
+    }
+    cache.set(REFRESH_RATES_CACHE_KEY, intervals, settings.REFRESH_RATES_CACHE_SECONDS)
+    return intervals
+
+
+def listing_change_counts(listing_ids: Iterable[int], now) -> Dict[int, int]:
+    """Price changes per listing within the history window, in one grouped query."""
+    listing_ids = [listing_id for listing_id in listing_ids if listing_id]
+    if not listing_ids:
+        return {}
+
+    return dict(
+        PriceHistory.objects.filter(
+            listing_id__in=listing_ids,
+            recorded_at__gte=history_since(now),
+        ).order_by().values('listing_id').annotate(n=Count('id')).values_list('listing_id', 'n')
+    )
+
+
+def refresh_interval(listing: ProductListing, changes: int, intervals: Dict[str, Dict], now) -> float:
+    """Seconds until a listing should be re-scraped, from the most specific history available.
+
+    Falls back from the listing itself to its category, then its store, then
+    the fixed SEARCH_FRESHNESS_TTL.
+    """
+    seconds = observed_seconds(listing, now)
+    if changes >= settings.REFRESH_MIN_CHANGES or seconds >= settings.REFRESH_MIN_OBSERVATION:
+        # Smoothed so a listing that never changed still gets a finite interval
+        return clamp_interval(seconds / (changes + 1))
+
+    category = listing.product.category if listing.product_id else ''
+    if category in intervals['category']:
+        return clamp_interval(intervals['category'][category])
+    if listing.store_id in intervals['store']:
+        return clamp_interval(intervals['store'][listing.store_id])
+    return settings.SEARCH_FRESHNESS_TTL
+
+
+def schedule_refresh(listings: List[ProductListing], changed_ids: Iterable[int] = (), now=None):
+    """Set next_refresh_at on listings from their price volatility.
+
+    changed_ids are listings whose price changed in the batch being saved; their
+    history rows aren't written yet, so the change is counted here.
+    """
+    if not listings:
+        return
+
+    now = now or timezone.now()
+    intervals = group_intervals(now)
+    counts = listing_change_counts((listing.id for listing in listings), now)
+    changed_ids = set(changed_ids)
+
+    for listing in listings:
+        changes = counts.get(listing.id, 0) + (1 if listing.id in changed_ids else 0)
+        interval = refresh_interval(listing, changes, intervals, now)
+        listing.next_refresh_at = now + timedelta(seconds=interval)
+
+
+def refresh_due_at(next_refresh_at, last_updated):
+    """When a listing comes due; unscheduled listings fall back to SEARCH_FRESHNESS_TTL."""
+    if next_refresh_at is None:
+        return last_updated + timedelta(seconds=settings.SEARCH_FRESHNESS_TTL)
+    return next_refresh_at
+
+
+def is_due(listing: ProductListing, now=None) -> bool:
+    """Whether a listing should be re-scraped before it is served again."""
+    now = now or timezone.now()
+    return refresh_due_at(listing.next_refresh_at, listing.last_updated) <= now
+
+
+def due_listings(limit: Optional[int] = None, now=None):
+    """Listings whose refresh time has passed, most overdue first."""
+    now = now or timezone.now()
+    listings = ProductListing.objects.filter(
+        next_refresh_at__lte=now
+    ).select_related('product', 'store').order_by('next_refresh_at')
+    return listings[:limit] if limit else listings
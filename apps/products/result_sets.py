@@ -0,0 +1,194 @@
+from datetime import timedelta
+from decimal import Decimal
+from typing import List, Dict, Iterator, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .cache_tags import get_tagged, listing_tag, set_tagged
+from .models import ProductListing, SearchResultSet, SearchResultItem
+from .persistence import listing_result
+from .refresh import refresh_due_at
+
+
+class ResultPage:
+    """One page of search results with keyset cursors for the pages either side.
+
+    Cursors are the (price, listing id) of the boundary rows, so a page is found
+    with an index seek no matter how deep it is, and rows never shift between
+    pages while the user is paging.
+    """
+
+    def __init__(self, results: List[Dict], next_cursor: Optional[str] = None,
+                 previous_cursor: Optional[str] = None):
+        self.results = results
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self) -> bool:
+        return self.has_next or self.has_previous
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.results)
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+
+def encode_cursor(price: Optional[Decimal], listing_id: int) -> str:
+    """Cursor for a row: price in cents (empty when unpriced) and listing id."""
+    cents = '' if price is None else int(price.scaleb(2))
+    return f"{cents}_{listing_id}"
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[Optional[Decimal], int]]:
+    """(price, listing id) from a cursor, or None if it is missing or malformed."""
+    try:
+        cents, listing_id = (cursor or '').split('_')
+        return (Decimal(int(cents)).scaleb(-2) if cents else None), int(listing_id)
+    except ValueError:
+        return None
+
+
+def result_set_cache_key(result_set_id: int) -> str:
+    return f"search_result_set_{result_set_id}"
+
+
+def latest_result_set(query: str, max_age: Optional[int] = None, now=None) -> Optional[SearchResultSet]:
+    """The newest result set for a query, if it is recent enough to serve.
+
+    A set is also dropped as soon as one of its listings changes (its tags are
+    invalidated) or comes due for a refresh, so the search is planned again.
+    """
+    max_age = settings.SEARCH_RESULT_SET_TTL if max_age is None else max_age
+    now = now or timezone.now()
+    result_set = SearchResultSet.objects.filter(
+        query=query.strip().lower(),
+        created_at__gte=now - timedelta(seconds=max_age),
+    ).order_by('-created_at').first()
+    if result_set is None:
+        return None
+
+    state = get_tagged(result_set_cache_key(result_set.id))
+    if state is None or (state['refresh_at'] is not None and state['refresh_at'] <= now):
+        return None
+    return result_set
+
+
+def save_result_set(query: str, results: List[Dict]) -> Optional[SearchResultSet]:
+    """Store the listings found for a query as a result set.
+
+    Returns None when some results are not saved listings yet (write-behind
+    previews); those are shown from memory until the writer has committed them.
+    The set is tagged with its listings, see latest_result_set.
+    Result sets that have outlived their TTL are removed on the way.
+    """
+    if any(not result.get('id') for result in results):
+        return None
+
+    # Price and availability are snapshotted, so filters and facet counts agree for the set's lifetime
+    snapshots = {}
+    for result in results:
+        snapshots.setdefault(result['id'], (result.get('price'), result.get('is_available', True)))
+
+    now = timezone.now()
+    with transaction.atomic():
+        SearchResultSet.objects.filter(
+            created_at__lt=now - timedelta(seconds=settings.SEARCH_RESULT_SET_TTL)
+        ).delete()
+        result_set = SearchResultSet.objects.create(query=query.strip().lower(), result_count=len(snapshots))
+        SearchResultItem.objects.bulk_create(
+            [
+                SearchResultItem(
+                    result_set=result_set, listing_id=listing_id, price=price or None, is_available=is_available,
+                )
+                for listing_id, (price, is_available) in snapshots.items()
+            ],
+            batch_size=500,
+        )
+
+    refresh_at = min(
+        (refresh_due_at(next_refresh_at, last_updated) for next_refresh_at, last_updated in
+         ProductListing.objects.filter(id__in=snapshots).values_list('next_refresh_at', 'last_updated')),
+        default=None,
+    )
+    set_tagged(
+        result_set_cache_key(result_set.id),
+        {'refresh_at': refresh_at},
+        [listing_tag(listing_id) for listing_id in snapshots],
+        settings.SEARCH_RESULT_SET_TTL,
+    )
+    return result_set
+
+
+def get_page(result_set: SearchResultSet, after: Optional[str] = None, before: Optional[str] = None,
+             size: Optional[int] = None, filters: Optional[Q] = None) -> ResultPage:
+    """Page of a result set, cheapest first, following or preceding a cursor.
+
+    Unpriced listings sort last. One query fetches the page's listings and stores;
+    filters (see apps.products.facets) narrow the items within the same query.
+    """
+    size = size or settings.SEARCH_PAGE_SIZE
+    items = SearchResultItem.objects.filter(result_set=result_set).select_related('listing__store')
+    if filters:
+        items = items.filter(filters)
+
+    after, before = decode_cursor(after), decode_cursor(before)
+    if before:
+        price, listing_id = before
+        if price is None:
+            items = items.filter(Q(price__isnull=False) | Q(price__isnull=True, listing_id__lt=listing_id))
+        else:
+            items = items.filter(Q(price__lt=price) | Q(price=price, listing_id__lt=listing_id))
+        rows = list(items.order_by(F('price').desc(nulls_first=True), '-listing_id')[:size + 1])
+        more_before = len(rows) > size
+        rows = rows[:size][::-1]
+        return make_page(rows, has_next=True, has_previous=more_before)
+
+    if after:
+        price, listing_id = after
+        if price is None:
+            items = items.filter(price__isnull=True, listing_id__gt=listing_id)
+        else:
+            items = items.filter(
+                Q(price__gt=price) | Q(price=price, listing_id__gt=listing_id) | Q(price__isnull=True)
+            )
+    rows = list(items.order_by(F('price').asc(nulls_last=True), 'listing_id')[:size + 1])
+    return make_page(rows[:size], has_next=len(rows) > size, has_previous=after is not None)
+
+
+def item_result(item: SearchResultItem) -> Dict:
+    """Result dict for an item, with the price and availability it was ranked and filtered by."""
+    return {
+        **listing_result(item.listing),
+        'price': float(item.price) if item.price else None,
+        'is_available': item.is_available,
+    }
+
+
+def unsaved_page(results: List[Dict]) -> ResultPage:
+    """First page of results that have no result set yet, in the order a saved set is paged."""
+    ordered = sorted(results, key=lambda result: (result.get('price') is None, result.get('price') or 0))
+    return ResultPage(ordered[:settings.SEARCH_PAGE_SIZE])
+
+
+def make_page(rows: List[SearchResultItem], has_next: bool, has_previous: bool) -> ResultPage:
+    """Build a ResultPage from the result items of one page."""
+    if not rows:
+        return ResultPage([])
+    return ResultPage(
+        [item_result(row) for row in rows],
+        next_cursor=encode_cursor(rows[-1].price, rows[-1].listing_id) if has_next else None,
+        previous_cursor=encode_cursor(rows[0].price, rows[0].listing_id) if has_previous else None,
+    )
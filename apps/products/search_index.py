@@ -0,0 +1,141 @@
+import re
+from typing import List, Iterable, Optional
+
+from django.db import connection, OperationalError, ProgrammingError
+from django.db.models import Q
+
+from .models import ProductListing
+
+
+# Created (and first filled) by migration 0003_listing_fts
+FTS_TABLE = 'products_listing_fts'
+
+# Column weights for ranking, in table column order
+FTS_COLUMNS = ['title', 'name', 'normalized_name', 'brand', 'model']
+FTS_WEIGHTS = [5.0, 2.0, 2.0, 3.0, 3.0]
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+_fts5_available = None
+
+
+def fts5_available() -> bool:
+    """Whether the default database is SQLite built with FTS5."""
+    global _fts5_available
+    if _fts5_available is None:
+        _fts5_available = False
+        if connection.vendor == 'sqlite':
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute('CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts5_probe USING fts5(x)')
+                    cursor.execute('DROP TABLE temp.fts5_probe')
+                _fts5_available = True
+            except OperationalError:
+                pass
+    return _fts5_available
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens used for both FTS queries and the fallback ranking."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def index_listings(listing_ids: Iterable[int]):
+    """Add or refresh listings in the full-text index."""
+    listing_ids = list(listing_ids)
+    if not listing_ids or not fts5_available():
+        return
+
+    rows = ProductListing.objects.filter(id__in=listing_ids).values_list(
+        'id', 'title', 'product__name', 'product__normalized_name', 'product__brand', 'product__model'
+    )
+    placeholders = ', '.join(['%s'] * len(listing_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", listing_ids)
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) VALUES (%s, %s, %s, %s, %s, %s)",
+            list(rows),
+        )
+
+
+def remove_listings(listing_ids: Iterable[int]):
+    """Drop listings from the full-text index."""
+    listing_ids = list(listing_ids)
+    if not listing_ids or not fts5_available():
+        return
+
+    placeholders = ', '.join(['%s'] * len(listing_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", listing_ids)
+
+
+def rebuild_index() -> int:
+    """Re-index every listing. Returns the number of listings indexed."""
+    if not fts5_available():
+        return 0
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+
+    listing_ids = list(ProductListing.objects.values_list('id', flat=True))
+    for start in range(0, len(listing_ids), 500):
+        index_listings(listing_ids[start:start + 500])
+    return len(listing_ids)
+
+
+def search_listings(query: str, limit: int = 100) -> List[ProductListing]:
+    """Listings matching every term of a query, best match first."""
+    terms = tokenize(query)
+    if not terms:
+        return []
+
+    if fts5_available():
+        listing_ids = _search_fts(terms, limit)
+        if listing_ids is not None:
+            listings = ProductListing.objects.select_related('store', 'product').in_bulk(listing_ids)
+            return [listings[listing_id] for listing_id in listing_ids if listing_id in listings]
+
+    return _search_fallback(terms, limit)
+
+
+def _search_fts(terms: List[str], limit: int) -> Optional[List[int]]:
+    """Ranked listing ids from the FTS5 table, or None if the table is missing."""
+    # Quoted prefix terms, implicitly ANDed; quoting keeps FTS syntax out of user input
+    match = ' '.join('"{}"*'.format(term.replace('"', '')) for term in terms)
+    weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+                f"ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s",
+                [match, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+    except (OperationalError, ProgrammingError):
+        return None
+
+
+def _search_fallback(terms: List[str], limit: int) -> List[ProductListing]:
+    """Pure-Python ranking over listings that contain every term, for databases without FTS5."""
+    condition = Q()
+    for term in terms:
+        condition &= (
+            Q(title__icontains=term) |
+            Q(product__normalized_name__icontains=term) |
+            Q(product__brand__icontains=term) |
+            Q(product__model__icontains=term)
+        )
+    candidates = ProductListing.objects.filter(condition).select_related('store', 'product')[:limit * 5]
+
+    def score(listing: ProductListing) -> float:
+        fields = [listing.title, listing.product.name, listing.product.normalized_name,
+                  listing.product.brand, listing.product.model]
+        total = 0.0
+        for text, weight in zip(fields, FTS_WEIGHTS):
+            tokens = tokenize(text)
+            if tokens:
+                matches = sum(1 for token in tokens for term in terms if token.startswith(term))
+                total += weight * matches / len(tokens)
+        return total
+
+    return sorted(candidates, key=score, reverse=True)[:limit]
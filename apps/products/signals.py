@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Store, Product, ProductListing
+from .persistence import clear_store_registry
+from .search_index import index_listings, remove_listings
+from .matching import index_product_names
+from .offers import refresh_best_offers
+from .cache_tags import invalidate_tags, listing_tag, product_tag
+
+
+@receiver([post_save, post_delete], sender=Store)
+def store_changed(sender, **kwargs):
+    """Drop cached stores when one is edited, e.g. in the admin."""
+    clear_store_registry()
+
+
+@receiver(post_save, sender=ProductListing)
+def listing_saved(sender, instance, **kwargs):
+    """Keep the full-text index, the product's best offer and cached pages in step with single-row saves.
+
+    Bulk writes do all three themselves.
+    """
+    index_listings([instance.id])
+    refresh_best_offers([instance.product_id])
+    invalidate_listing(instance)
+
+
+@receiver(post_delete, sender=ProductListing)
+def listing_deleted(sender, instance, **kwargs):
+    remove_listings([instance.id])
+    refresh_best_offers([instance.product_id])
+    invalidate_listing(instance)
+
+
+def invalidate_listing(listing: ProductListing):
+    """Drop cached searches and detail pages showing a listing once the write commits."""
+    tags = [listing_tag(listing.id), product_tag(listing.product_id)]
+    transaction.on_commit(lambda: invalidate_tags(tags))
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, created, **kwargs):
+    """Re-index a product's listings, whose index rows include the product's names, and its match keys."""
+    if not created:
+        index_listings(instance.listings.values_list('id', flat=True))
+        transaction.on_commit(lambda: invalidate_tags([product_tag(instance.id)]))
+    index_product_names([(instance, instance.normalized_name)])
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """Tune each new SQLite connection for concurrent readers and a single writer."""
+    if connection.vendor != 'sqlite' or not settings.SQLITE_WAL_MODE:
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode=WAL')
+        # Safe with WAL: a crash can lose the last commits but never corrupts the file
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute(f'PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT * 1000}')
+        cursor.execute('PRAGMA temp_store=MEMORY')
+        cursor.execute('PRAGMA cache_size=-20000')  # 20 MB page cache
+        cursor.execute('PRAGMA mmap_size=134217728')  # 128 MB
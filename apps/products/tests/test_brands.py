@@ -0,0 +1,37 @@
+from django.test import SimpleTestCase
+
+from apps.products.brands import (
+    DEFAULT_BRAND_ALIASES, DEFAULT_BRANDS, DEFAULT_MODEL_LINES, BrandExtractor,
+)
+
+
+class BrandExtractorTests(SimpleTestCase):
+    def setUp(self):
+        self.extractor = BrandExtractor(DEFAULT_BRANDS, DEFAULT_BRAND_ALIASES, DEFAULT_MODEL_LINES)
+
+    def test_brand_and_model_in_one_scan(self):
+        self.assertEqual(self.extractor.extract([
+            'Apple iPhone 15 Pro Max 256GB',
+            'Samsung Galaxy S24 Ultra',
+            'Dell XPS 13',
+            'iPhone pro case',
+            'Samsung 55 inch TV',
+        ]), [
+            ('Apple', 'iPhone 15 Pro Max'),
+            ('Samsung', 'Galaxy S24 Ultra'),
+            ('Dell', 'Dell XPS 13'),
+            ('Apple', ''),
+            ('Samsung', ''),
+        ])
+
+    def test_model_lines_match_whole_words(self):
+        self.assertEqual(self.extractor.scan('Wendell XPS'), ('Dell', ''))
+
+    def test_model_line_added_to_the_dictionary(self):
+        extractor = BrandExtractor(DEFAULT_BRANDS, DEFAULT_BRAND_ALIASES,
+                                   {**DEFAULT_MODEL_LINES, 'ThinkPad': r'[ \t]+[A-Z]\d+'})
+        self.assertEqual(extractor.scan('Lenovo ThinkPad T14 Gen 4'), ('Lenovo', 'ThinkPad T14'))
+
+    def test_model_lines_must_be_in_the_dictionary(self):
+        with self.assertRaises(ValueError):
+            BrandExtractor(['Apple'], model_lines={'Pixel': r'[ \t]+\d+'})
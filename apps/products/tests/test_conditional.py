@@ -0,0 +1,72 @@
+import gzip
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.products.models import Store, Product, ProductListing
+
+
+def stream_events(query):
+    yield {'event': 'store', 'store': 'Takealot', 'results': []}
+    yield {'event': 'summary', 'query': query, 'stores': {}, 'total': 0}
+
+
+class ConditionalPageTests(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        store = Store.objects.create(name='Takealot', base_url='https://www.takealot.com')
+        product = Product.objects.create(name='Sony WH-1000XM5', normalized_name='sony wh1000xm5')
+        self.listing = ProductListing.objects.create(
+            product=product, store=store, title='Sony WH-1000XM5', url='https://www.takealot.com/sony',
+            current_price='6999.00',
+        )
+        self.url = reverse('product_detail', args=[self.listing.id])
+
+    def test_revalidation_answers_304(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertIn('max-age', response['Cache-Control'])
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_gzipped_page_keeps_a_strong_etag(self):
+        plain = self.client.get(self.url)
+        compressed = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(compressed.content), plain.content)
+        self.assertTrue(compressed['ETag'].startswith('"'))
+        self.assertNotEqual(compressed['ETag'], plain['ETag'])
+        self.assertIn('Accept-Encoding', compressed['Vary'])
+
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=compressed['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_changed_listing_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.listing.current_price = '5999.00'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.listing.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class StreamCompressionTests(TestCase):
+    @mock.patch('apps.products.views.stream_search_events', stream_events)
+    def test_stream_is_not_compressed(self):
+        response = self.client.get(
+            reverse('api_search_stream'), {'q': 'sony', 'format': 'sse'}, HTTP_ACCEPT_ENCODING='gzip',
+        )
+
+        self.assertTrue(response.streaming)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        chunks = list(response.streaming_content)
+        # One chunk per event, each sent as soon as it is produced
+        self.assertEqual(len(chunks), 2)
+        self.assertTrue(chunks[0].startswith(b'event: store'))
@@ -0,0 +1,37 @@
+from django.core.cache import caches
+from django.test import TestCase
+
+from apps.products.facets import FacetFilters, facet_counts, facet_rows, filtered_count
+from apps.products.models import Store, Product, ProductListing
+from apps.products.persistence import listing_result
+from apps.products.result_sets import get_page, save_result_set
+
+
+class AvailabilityFacetTests(TestCase):
+    """Facet counts and filtered pages agree while listings change under a result set."""
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        store = Store.objects.create(name='Takealot', base_url='https://www.takealot.com')
+        self.listings = []
+        for index in range(3):
+            product = Product.objects.create(name=f'Sony TV {index}', normalized_name=f'sony tv {index}')
+            self.listings.append(ProductListing.objects.create(
+                product=product, store=store, title=f'Sony TV {index}',
+                url=f'https://www.takealot.com/sony-{index}', current_price=1000 + index,
+            ))
+        self.result_set = save_result_set('sony tv', [listing_result(listing) for listing in self.listings])
+
+    def test_counts_match_the_filtered_page_after_a_listing_sells_out(self):
+        facet_rows(self.result_set)
+        ProductListing.objects.filter(pk=self.listings[0].pk).update(is_available=False)
+
+        filters = FacetFilters(available=True)
+        rows = facet_rows(self.result_set)
+        page = get_page(self.result_set, filters=filters.q())
+        counts = {option['value']: option['count'] for option in facet_counts(rows, filters)['available']}
+
+        self.assertEqual(filtered_count(rows, filters), len(page))
+        self.assertEqual(counts['1'], len(page))
+        self.assertTrue(all(result['is_available'] for result in page))
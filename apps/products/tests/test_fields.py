@@ -0,0 +1,71 @@
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import Avg, Max, Min, Sum
+from django.test import TestCase
+
+from apps.products.fields import CentsField
+from apps.products.models import Store, Product, ProductListing
+
+
+class CentsFieldTests(TestCase):
+    def setUp(self):
+        self.store = Store.objects.create(name='Takealot', base_url='https://www.takealot.com')
+
+    def create_listing(self, price, **fields) -> ProductListing:
+        product = Product.objects.create(name='Sony TV', normalized_name='sony tv')
+        return ProductListing.objects.create(
+            product=product, store=self.store, title='Sony TV', url=f'https://www.takealot.com/{product.id}',
+            current_price=price, **fields,
+        )
+
+    def stored_cents(self, listing: ProductListing):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT current_price_cents FROM products_productlisting WHERE id = %s', [listing.id])
+            return cursor.fetchone()[0]
+
+    def test_decimal_round_trips_through_integer_cents(self):
+        listing = self.create_listing(Decimal('1299.99'))
+
+        self.assertEqual(self.stored_cents(listing), 129999)
+        listing.refresh_from_db()
+        self.assertEqual(listing.current_price, Decimal('1299.99'))
+        self.assertEqual(str(listing.current_price), '1299.99')
+
+    def test_floats_and_strings_are_rounded_to_the_cent(self):
+        self.assertEqual(self.stored_cents(self.create_listing(0.1 + 0.2)), 30)
+        self.assertEqual(self.stored_cents(self.create_listing('19.995')), 2000)
+        self.assertEqual(self.stored_cents(self.create_listing(7)), 700)
+
+    def test_null_round_trips(self):
+        listing = self.create_listing(Decimal('10.00'), original_price=None)
+
+        listing.refresh_from_db()
+        self.assertIsNone(listing.original_price)
+
+    def test_invalid_amount_is_rejected(self):
+        with self.assertRaises(ValidationError):
+            CentsField().to_python('R12')
+
+    def test_filters_take_rand_amounts(self):
+        cheap = self.create_listing(Decimal('999.99'))
+        self.create_listing(Decimal('1000.00'))
+
+        self.assertEqual(list(ProductListing.objects.filter(current_price__lte=Decimal('999.99'))), [cheap])
+        self.assertEqual(list(ProductListing.objects.filter(current_price__lt=1000)), [cheap])
+
+    def test_aggregates_come_back_as_rand(self):
+        for price in ['10.00', '10.01', '10.01']:
+            self.create_listing(Decimal(price))
+
+        totals = ProductListing.objects.aggregate(
+            low=Min('current_price'), high=Max('current_price'), total=Sum('current_price'), mean=Avg('current_price'),
+        )
+
+        self.assertEqual(totals, {
+            'low': Decimal('10.00'), 'high': Decimal('10.01'), 'total': Decimal('30.02'),
+            # 1000.67 cents, rounded to the cent
+            'mean': Decimal('10.01'),
+        })
+        self.assertTrue(all(isinstance(value, Decimal) for value in totals.values()))
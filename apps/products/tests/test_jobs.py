@@ -0,0 +1,129 @@
+import time
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from apps.products.jobs import (
+    LeaseHeartbeat, claim_next_job, complete_job, enqueue_scrape_job, expire_abandoned_jobs, fail_job,
+    renew_lease,
+)
+from apps.products.models import ScrapeJob
+
+
+@override_settings(SCRAPE_QUEUE_MAX_CONCURRENCY=2, SCRAPE_QUEUE_LEASE_SECONDS=600, SCRAPE_QUEUE_MAX_ATTEMPTS=3,
+                   SCRAPE_QUEUE_RETRY_DELAY=30)
+class ScrapeJobQueueTests(TestCase):
+    def expire_lease(self, job: ScrapeJob):
+        ScrapeJob.objects.filter(pk=job.pk).update(leased_until=timezone.now() - timedelta(seconds=1))
+
+    def test_outstanding_job_is_reused(self):
+        job = enqueue_scrape_job(' iPhone 15 ')
+
+        self.assertEqual(enqueue_scrape_job('iphone 15'), job)
+        self.assertEqual(ScrapeJob.objects.count(), 1)
+
+    def test_second_outstanding_job_is_rejected(self):
+        enqueue_scrape_job('iphone 15')
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ScrapeJob.objects.create(query='iphone 15')
+
+    def test_finished_query_can_be_queued_again(self):
+        enqueue_scrape_job('iphone 15')
+        job = claim_next_job('worker-1')
+        complete_job(job, [])
+
+        self.assertNotEqual(enqueue_scrape_job('iphone 15'), job)
+
+    def test_claim_leases_the_job(self):
+        enqueue_scrape_job('iphone 15')
+
+        job = claim_next_job('worker-1')
+
+        self.assertEqual(job.status, ScrapeJob.STATUS_RUNNING)
+        self.assertEqual(job.worker_id, 'worker-1')
+        self.assertEqual(job.attempts, 1)
+        self.assertGreater(job.leased_until, timezone.now() + timedelta(seconds=590))
+        self.assertIsNone(claim_next_job('worker-2'))
+
+    def test_claims_stop_at_the_concurrency_limit(self):
+        for query in ['a', 'b', 'c']:
+            enqueue_scrape_job(query)
+
+        claimed = [claim_next_job(f'worker-{index}') for index in range(3)]
+
+        self.assertIsNotNone(claimed[0])
+        self.assertIsNotNone(claimed[1])
+        self.assertIsNone(claimed[2])
+
+    def test_expired_lease_is_claimed_again(self):
+        enqueue_scrape_job('iphone 15')
+        first = claim_next_job('worker-1')
+        self.expire_lease(first)
+
+        second = claim_next_job('worker-2')
+
+        self.assertEqual(second.pk, first.pk)
+        self.assertEqual(second.attempts, 2)
+        # The first worker's results are refused rather than overwriting the second run
+        self.assertFalse(complete_job(first, [{'title': 'late'}]))
+        self.assertTrue(complete_job(second, []))
+
+    def test_renewed_lease_is_not_claimed_again(self):
+        enqueue_scrape_job('iphone 15')
+        job = claim_next_job('worker-1')
+        self.expire_lease(job)
+
+        self.assertTrue(renew_lease(job))
+        self.assertIsNone(claim_next_job('worker-2'))
+
+    def test_lost_lease_is_not_renewed(self):
+        enqueue_scrape_job('iphone 15')
+        first = claim_next_job('worker-1')
+        self.expire_lease(first)
+        claim_next_job('worker-2')
+
+        self.assertFalse(renew_lease(first))
+
+    def test_failure_backs_off_then_fails(self):
+        enqueue_scrape_job('iphone 15')
+        delays = []
+        for attempt in range(3):
+            job = claim_next_job('worker-1')
+            self.assertEqual(job.attempts, attempt + 1)
+            before = timezone.now()
+            self.assertTrue(fail_job(job, 'timeout'))
+            job.refresh_from_db()
+            if job.status == ScrapeJob.STATUS_PENDING:
+                delays.append(round((job.run_after - before).total_seconds()))
+                ScrapeJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+
+        self.assertEqual(delays, [30, 60])
+        self.assertEqual(job.status, ScrapeJob.STATUS_FAILED)
+        self.assertEqual(job.error, 'timeout')
+
+    def test_abandoned_final_attempt_is_failed(self):
+        job = enqueue_scrape_job('iphone 15')
+        ScrapeJob.objects.filter(pk=job.pk).update(
+            status=ScrapeJob.STATUS_RUNNING, attempts=3, leased_until=timezone.now() - timedelta(seconds=1),
+        )
+
+        self.assertEqual(expire_abandoned_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ScrapeJob.STATUS_FAILED)
+        self.assertIsNone(job.leased_until)
+        self.assertIsNone(claim_next_job('worker-1'))
+
+
+class LeaseHeartbeatTests(TransactionTestCase):
+    def test_heartbeat_keeps_a_long_job_leased(self):
+        enqueue_scrape_job('iphone 15')
+        job = claim_next_job('worker-1', lease_seconds=1)
+
+        with LeaseHeartbeat(job, lease_seconds=1):
+            time.sleep(1.5)
+            self.assertIsNone(claim_next_job('worker-2'))
+
+        self.assertTrue(complete_job(job, []))
@@ -0,0 +1,49 @@
+from django.test import SimpleTestCase, TestCase
+
+from apps.products.matching import ProductMatcher, SkuClaims, compatible, features, index_product_names
+from apps.products.models import Store, Product, ProductListing
+
+
+class CompatibleTests(SimpleTestCase):
+    def assertCompatible(self, a, b, expected=True):
+        self.assertEqual(compatible(features(a), features(b)), expected, f"{a!r} vs {b!r}")
+
+    def test_variants_and_capacities_must_agree(self):
+        self.assertCompatible('apple iphone 15 pro 256gb', 'iphone 15 pro 256gb')
+        self.assertCompatible('apple iphone 15 pro 256gb', 'apple iphone 15 pro max 256gb', False)
+        self.assertCompatible('apple iphone 15 pro 256gb', 'apple iphone 15 pro 512gb', False)
+
+    def test_different_colours_never_match(self):
+        self.assertCompatible(
+            'apple iphone 16 pro 256gb natural titanium', 'apple iphone 16 pro 256gb blue titanium', False,
+        )
+        self.assertCompatible('samsung galaxy s24 black', 'samsung galaxy s24 white', False)
+
+    def test_missing_or_extra_colour_words_still_match(self):
+        self.assertCompatible('apple iphone 16 pro 256gb', 'apple iphone 16 pro 256gb blue titanium')
+        self.assertCompatible('samsung galaxy s24 onyx black', 'samsung galaxy s24 black')
+
+
+class ProductMatcherTests(TestCase):
+    def setUp(self):
+        self.product = Product.objects.create(
+            name='Apple iPhone 16 Pro 256GB', normalized_name='apple iphone 16 pro 256gb',
+        )
+        index_product_names([(self.product, self.product.normalized_name)])
+
+    def test_matches_similar_name(self):
+        matcher = ProductMatcher(['apple iphone 16 pro 256gb smartphone'])
+        self.assertEqual(matcher.match('apple iphone 16 pro 256gb smartphone'), self.product)
+
+    def test_same_store_sku_conflict_vetoes_match(self):
+        store = Store.objects.create(name='Takealot', base_url='https://www.takealot.com')
+        ProductListing.objects.create(
+            product=self.product, store=store, title='Apple iPhone 16 Pro 256GB', url='https://example.com/a1',
+            current_price='24999.00', store_product_id='A1',
+        )
+        name = 'apple iphone 16 pro 256gb smartphone'
+        matcher = ProductMatcher([name])
+        claims = SkuClaims(matcher.candidates(), [store.id])
+
+        self.assertEqual(matcher.match(name, lambda product: not claims.conflicts(product, store.id, 'A1')), self.product)
+        self.assertIsNone(matcher.match(name, lambda product: not claims.conflicts(product, store.id, 'B1')))
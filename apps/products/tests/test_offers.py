@@ -0,0 +1,96 @@
+from decimal import Decimal
+from typing import Optional
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.products.models import Store, Product, ProductListing
+from apps.products.offers import offer_price, rebuild_best_offers, update_best_offers
+
+
+class BestOfferTests(TestCase):
+    def setUp(self):
+        self.product = Product.objects.create(name='Sony TV', normalized_name='sony tv')
+        self.listings = {
+            name: ProductListing.objects.create(
+                product=self.product, store=Store.objects.create(name=name, base_url=f'https://{name}.co.za'),
+                title='Sony TV', url=f'https://{name}.co.za/sony-tv', current_price=price,
+            )
+            for name, price in [('takealot', 1000), ('game', 1100), ('makro', 1200)]
+        }
+        self.product.refresh_from_db()
+
+    def write(self, store: str, price: Optional[int] = None, is_available: bool = True):
+        """Change a listing the way a batch write does, without model signals, and fold it in."""
+        listing = self.listings[store]
+        old_offer = offer_price(listing)
+        listing.current_price = Decimal(price) if price is not None else listing.current_price
+        listing.is_available = is_available
+        ProductListing.objects.filter(pk=listing.pk).update(
+            current_price=listing.current_price, is_available=is_available,
+        )
+        return update_best_offers([(self.product, listing, old_offer)])
+
+    def assertBestOffer(self, price, store: Optional[str], count: int):
+        for product in (self.product, Product.objects.get(pk=self.product.pk)):
+            self.assertEqual(product.best_price, Decimal(price) if price is not None else None)
+            self.assertEqual(product.best_store_id, self.listings[store].store_id if store else None)
+            self.assertEqual(product.offer_count, count)
+
+    def test_saved_listings_set_the_best_offer(self):
+        self.assertBestOffer(1000, 'takealot', 3)
+
+    def test_cheaper_offer_is_applied_without_a_recompute(self):
+        # The listing write and the product's bulk update; no query over its listings
+        with self.assertNumQueries(2):
+            self.write('makro', 900)
+
+        self.assertBestOffer(900, 'makro', 3)
+
+    def test_dearer_best_offer_falls_back_to_the_next_store(self):
+        self.write('takealot', 1500)
+
+        self.assertBestOffer(1100, 'game', 3)
+
+    def test_out_of_stock_best_offer_falls_back_to_the_next_store(self):
+        self.write('takealot', is_available=False)
+
+        self.assertBestOffer(1100, 'game', 2)
+
+    def test_out_of_stock_other_offer_only_changes_the_count(self):
+        changed_at = self.product.price_changed_at
+
+        self.write('makro', is_available=False)
+
+        self.assertBestOffer(1000, 'takealot', 2)
+        self.assertEqual(self.product.price_changed_at, changed_at)
+
+    def test_back_in_stock_offer_is_counted_again(self):
+        self.write('takealot', is_available=False)
+        self.write('takealot', is_available=True)
+
+        self.assertBestOffer(1000, 'takealot', 3)
+
+    def test_product_without_offers_has_no_best_price(self):
+        for store in self.listings:
+            self.write(store, is_available=False)
+
+        self.assertBestOffer(None, None, 0)
+
+    def test_unchanged_price_saves_nothing(self):
+        # Only the listing write
+        with self.assertNumQueries(1):
+            self.assertEqual(self.write('game', 1100), [])
+
+    def test_rebuild_matches_the_listings(self):
+        other = Product.objects.create(name='Sony soundbar', normalized_name='sony soundbar')
+        ProductListing.objects.filter(pk=self.listings['takealot'].pk).update(current_price=1500)
+        ProductListing.objects.filter(pk=self.listings['game'].pk).update(is_available=False)
+        Product.objects.update(best_price=1, best_store=None, offer_count=9, price_changed_at=timezone.now())
+
+        self.assertEqual(rebuild_best_offers(), 2)
+
+        self.product.refresh_from_db()
+        self.assertBestOffer(1200, 'makro', 2)
+        other.refresh_from_db()
+        self.assertEqual((other.best_price, other.best_store_id, other.offer_count), (None, None, 0))
@@ -0,0 +1,102 @@
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from apps.products.cache_tags import cache_search_results, cached_search_results
+from apps.products.checks import check_tag_cache
+from apps.products.models import ProductListing, PriceHistory
+from apps.products.persistence import clear_store_registry, persist_scraped_results
+
+
+def scraped(title, sku, price, store='Takealot'):
+    return {
+        'title': title,
+        'url': f'https://www.takealot.com/{sku.lower()}',
+        'store': store,
+        'price': price,
+        'product_id': sku,
+    }
+
+
+WHITE = 'Apple iPhone 16 Pro 256GB White'
+BLACK = 'Apple iPhone 16 Pro 256GB Black'
+
+
+class SameStoreSkuTests(TestCase):
+    def setUp(self):
+        clear_store_registry()
+        for cache in caches.all():
+            cache.clear()
+
+    def assertSeparateListings(self):
+        listings = {listing.store_product_id: listing for listing in ProductListing.objects.all()}
+        self.assertEqual(set(listings), {'A1', 'B1'})
+        self.assertNotEqual(listings['A1'].product_id, listings['B1'].product_id)
+        self.assertEqual(listings['A1'].current_price, 24999)
+        self.assertEqual(listings['B1'].current_price, 25499)
+
+    def test_two_skus_in_one_batch_stay_apart(self):
+        for _ in range(2):
+            persist_scraped_results([scraped(WHITE, 'A1', 24999), scraped(BLACK, 'B1', 25499)])
+
+        self.assertSeparateListings()
+        self.assertEqual(PriceHistory.objects.count(), 0)
+
+    def test_new_sku_never_joins_another_skus_listing(self):
+        persist_scraped_results([scraped(WHITE, 'A1', 24999)])
+        # Same title, so only the store product id tells them apart
+        persist_scraped_results([scraped(WHITE, 'B1', 25499)])
+        persist_scraped_results([scraped(WHITE, 'A1', 24999), scraped(WHITE, 'B1', 25499)])
+
+        self.assertSeparateListings()
+        self.assertEqual(PriceHistory.objects.count(), 0)
+
+    def test_unknown_sku_fills_in_existing_listing(self):
+        persist_scraped_results([{**scraped(WHITE, 'A1', 24999), 'product_id': ''}])
+        persist_scraped_results([scraped(WHITE, 'A1', 24999)])
+
+        listing = ProductListing.objects.get()
+        self.assertEqual(listing.store_product_id, 'A1')
+
+    def test_other_stores_share_the_product(self):
+        persist_scraped_results([scraped(WHITE, 'A1', 24999), scraped(WHITE, 'G7', 24499, store='Game')])
+
+        self.assertEqual(ProductListing.objects.values('product').distinct().count(), 1)
+
+
+class InvalidationTests(TestCase):
+    def setUp(self):
+        clear_store_registry()
+        for cache in caches.all():
+            cache.clear()
+
+    def test_ended_sale_invalidates_cached_searches(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            results = persist_scraped_results([{**scraped(WHITE, 'A1', 24999), 'original_price': 27999}])
+        cache_search_results('iphone', results)
+
+        # Same price, but no longer shown as reduced
+        with self.captureOnCommitCallbacks(execute=True):
+            persist_scraped_results([scraped(WHITE, 'A1', 24999)])
+
+        self.assertIsNone(cached_search_results('iphone'))
+
+
+class TagCacheCheckTests(SimpleTestCase):
+    @override_settings(SCRAPE_QUEUE_ENABLED=True)
+    def test_workers_need_a_shared_tag_cache(self):
+        local = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+        shared = {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'cache_tags'}
+
+        with self.settings(CACHES={'default': local, 'cache_tags': local}):
+            self.assertEqual([error.id for error in check_tag_cache(None)], ['products.E001'])
+        with self.settings(CACHES={'default': local, 'cache_tags': shared}):
+            self.assertEqual(check_tag_cache(None), [])
+
+
+class IncompleteResultTests(TestCase):
+    def test_result_without_url_is_logged_and_skipped(self):
+        with self.assertLogs('apps.products.persistence', 'WARNING'):
+            results = persist_scraped_results([{**scraped(WHITE, 'A1', 24999), 'url': ''}])
+
+        self.assertEqual(results, [])
+        self.assertFalse(ProductListing.objects.exists())
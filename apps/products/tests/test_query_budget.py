@@ -0,0 +1,82 @@
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from apps.products.models import Store, Product, ProductListing, PriceHistory
+from apps.products.query_budget import QueryBudgetExceeded, query_budget
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class ViewQueryBudgetTests(TestCase):
+    """The detail and compare views stay within their budgets however many listings they show."""
+
+    @classmethod
+    def setUpTestData(cls):
+        stores = [Store.objects.create(name=name, base_url=f'https://www.{name.lower()}.co.za')
+                  for name in ['Takealot', 'Game', 'Makro']]
+        cls.listings = []
+        for index in range(4):
+            product = Product.objects.create(
+                name=f'Samsung 55" TV {index}', normalized_name='samsung 55inch tv', brand='Samsung',
+            )
+            for store in stores:
+                listing = ProductListing.objects.create(
+                    product=product, store=store, title=f'Samsung 55" TV {index}',
+                    url=f'https://example.com/{store.id}/{index}', current_price=9999 + index,
+                )
+                PriceHistory.objects.create(listing=listing, price=10999 + index)
+                cls.listings.append(listing)
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_product_detail_cold_cache(self):
+        with self.assertNumQueries(3):
+            response = self.get(reverse('product_detail', args=[self.listings[0].id]))
+        self.assertEqual(len(response.context['similar_products']), len(self.listings) - 1)
+
+    def test_product_detail_warm_cache(self):
+        url = reverse('product_detail', args=[self.listings[0].id])
+        self.get(url)
+        with self.assertNumQueries(0):
+            self.get(url)
+
+    def test_compare_cold_cache(self):
+        url = reverse('compare_products') + '?' + '&'.join(f'products={listing.id}' for listing in self.listings)
+        with self.assertNumQueries(1):
+            response = self.get(url)
+        self.assertEqual(len(response.context['products']), len(self.listings))
+
+    def test_compare_warm_cache(self):
+        url = reverse('compare_products') + '?' + '&'.join(f'products={listing.id}' for listing in self.listings)
+        self.get(url)
+        with self.assertNumQueries(1):
+            self.get(url)
+
+
+class QueryBudgetTests(TestCase):
+    def view(self, queries):
+        @query_budget(1)
+        def view(request):
+            for _ in range(queries):
+                Store.objects.exists()
+            return HttpResponse()
+        return view
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_strict_budget_raises(self):
+        self.view(1)(RequestFactory().get('/'))
+        with self.assertRaises(QueryBudgetExceeded):
+            self.view(2)(RequestFactory().get('/'))
+
+    @override_settings(QUERY_BUDGET_STRICT=False)
+    def test_lenient_budget_logs(self):
+        with self.assertLogs('apps.products.query_budget', 'WARNING'):
+            self.view(2)(RequestFactory().get('/'))
@@ -0,0 +1,75 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.products.models import Store, Product, ProductListing, PriceHistory
+from apps.products.realtime import PriceBroadcaster
+
+
+class PriceRelayTests(TestCase):
+    def setUp(self):
+        self.broadcaster = PriceBroadcaster()
+        self.store = Store.objects.create(name='Takealot', base_url='https://www.takealot.com')
+
+    def create_listing(self, index: int) -> ProductListing:
+        product = Product.objects.create(name=f'Sony TV {index}', normalized_name=f'sony tv {index}')
+        return ProductListing.objects.create(
+            product=product, store=self.store, title=f'Sony TV {index}',
+            url=f'https://www.takealot.com/sony-{index}', current_price=1000 + index,
+        )
+
+    @mock.patch('apps.products.realtime.CHANGES_PAGE_SIZE', 2)
+    def test_rows_sharing_a_timestamp_are_not_lost_between_pages(self):
+        listings = [self.create_listing(index) for index in range(5)]
+        # One batch write: a shared timestamp, then the replaced prices
+        ProductListing.objects.update(last_updated=timezone.now())
+        for listing in listings:
+            PriceHistory.objects.create(listing=listing, price=2000)
+
+        changes = self.broadcaster.collect_changes()
+
+        self.assertEqual([update['listing_id'] for update in changes], [listing.id for listing in listings])
+
+    def test_unchanged_rescrape_is_not_published(self):
+        listing = self.create_listing(0)
+        self.assertEqual(len(self.broadcaster.collect_changes()), 1)
+
+        # Confirmed by a scrape at the same price: only last_updated moves
+        ProductListing.objects.filter(pk=listing.pk).update(last_updated=timezone.now() + timedelta(seconds=1))
+        self.assertEqual(self.broadcaster.collect_changes(), [])
+
+        ProductListing.objects.filter(pk=listing.pk).update(
+            current_price=900, last_updated=timezone.now() + timedelta(seconds=2),
+        )
+        changes = self.broadcaster.collect_changes()
+        self.assertEqual([update['price'] for update in changes], [900.0])
+
+    def test_least_recently_written_listings_are_forgotten(self):
+        self.broadcaster.max_tracked = 2
+        listings = [self.create_listing(index) for index in range(3)]
+        self.broadcaster.collect_changes()
+
+        self.assertEqual(list(self.broadcaster.sent), [listing.id for listing in listings[1:]])
+
+        ProductListing.objects.filter(pk=listings[1].pk).update(last_updated=timezone.now() + timedelta(seconds=1))
+        self.create_listing(3)
+        self.broadcaster.collect_changes()
+
+        self.assertEqual(len(self.broadcaster.sent), 2)
+        self.assertIn(listings[1].id, self.broadcaster.sent)
+
+    @mock.patch('apps.products.realtime.asyncio.sleep', mock.AsyncMock())
+    async def test_relay_failure_is_logged(self):
+        self.broadcaster.subscribers = {'listing:1': set()}
+
+        def fail():
+            self.broadcaster.subscribers = {}
+            raise RuntimeError('database is locked')
+
+        with mock.patch.object(self.broadcaster, 'collect_changes', fail), \
+                self.assertLogs('apps.products.realtime', 'ERROR') as logs:
+            await self.broadcaster.relay()
+
+        self.assertIn('database is locked', logs.output[0])
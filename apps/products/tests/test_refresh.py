@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.products.models import Store, Product, ProductListing, PriceHistory
+from apps.products.refresh import due_listings, group_intervals, refresh_interval, schedule_refresh
+
+DAY = 24 * 3600
+
+
+@override_settings(REFRESH_HISTORY_DAYS=30, REFRESH_MIN_CHANGES=3, REFRESH_MIN_OBSERVATION=7 * DAY,
+                   REFRESH_INTERVAL_FACTOR=0.5, REFRESH_MIN_INTERVAL=300, REFRESH_MAX_INTERVAL=7 * DAY,
+                   SEARCH_FRESHNESS_TTL=1800)
+class RefreshScheduleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = timezone.now()
+        self.store = Store.objects.create(name='Takealot', base_url='https://www.takealot.com')
+
+    def create_listing(self, name: str, age_days: float = 10, changes: int = 0,
+                       category: str = 'phones') -> ProductListing:
+        product = Product.objects.create(name=name, normalized_name=name.lower(), category=category)
+        listing = ProductListing.objects.create(
+            product=product, store=self.store, title=name, url=f'https://www.takealot.com/{product.id}',
+            current_price=1000,
+        )
+        ProductListing.objects.filter(pk=listing.pk).update(created_at=self.now - timedelta(days=age_days))
+        PriceHistory.objects.bulk_create([PriceHistory(listing=listing, price=900) for _ in range(changes)])
+        listing.refresh_from_db()
+        return listing
+
+    def test_volatile_listing_is_refreshed_sooner_than_a_stable_one(self):
+        volatile = self.create_listing('Volatile', changes=9)
+        stable = self.create_listing('Stable')
+
+        schedule_refresh([volatile, stable], now=self.now)
+
+        # Ten days watched: one change a day, against none at all
+        self.assertEqual(volatile.next_refresh_at, self.now + timedelta(seconds=10 * DAY / 10 * 0.5))
+        self.assertEqual(stable.next_refresh_at, self.now + timedelta(seconds=5 * DAY))
+
+    def test_change_in_the_batch_is_counted(self):
+        listing = self.create_listing('Volatile', changes=9)
+
+        schedule_refresh([listing], now=self.now)
+        without = listing.next_refresh_at
+        schedule_refresh([listing], changed_ids=[listing.id], now=self.now)
+
+        self.assertLess(listing.next_refresh_at, without)
+
+    def test_intervals_stay_within_the_limits(self):
+        volatile = self.create_listing('Volatile', changes=5000)
+        stable = self.create_listing('Stable', age_days=29)
+
+        schedule_refresh([volatile, stable], now=self.now)
+
+        self.assertEqual(volatile.next_refresh_at, self.now + timedelta(seconds=300))
+        self.assertEqual(stable.next_refresh_at, self.now + timedelta(seconds=7 * DAY))
+
+    def test_new_listing_uses_its_category_then_its_store(self):
+        self.create_listing('Phone', changes=10)
+        self.create_listing('Stable phone')
+        phone = self.create_listing('New phone', age_days=0)
+        tv = self.create_listing('New TV', age_days=0, category='tvs')
+        intervals = group_intervals(self.now)
+
+        # phones: 10 changes over 20 watched days; the store also counts the new listings' time
+        self.assertEqual(refresh_interval(phone, 0, intervals, self.now), 2 * DAY * 0.5)
+        self.assertAlmostEqual(refresh_interval(tv, 0, intervals, self.now), 2 * DAY * 0.5, delta=1)
+
+    def test_listing_without_any_history_uses_the_freshness_ttl(self):
+        listing = self.create_listing('New', age_days=0)
+
+        self.assertEqual(refresh_interval(listing, 0, group_intervals(self.now), self.now), 1800)
+
+    def test_due_listings_are_most_overdue_first(self):
+        listings = [self.create_listing(f'Listing {index}') for index in range(4)]
+        offsets = [-60, -3600, 60, None]
+        for listing, offset in zip(listings, offsets):
+            next_refresh_at = self.now + timedelta(seconds=offset) if offset is not None else None
+            ProductListing.objects.filter(pk=listing.pk).update(next_refresh_at=next_refresh_at)
+
+        self.assertEqual(list(due_listings(now=self.now)), [listings[1], listings[0]])
+        self.assertEqual(list(due_listings(limit=1, now=self.now)), [listings[1]])
@@ -0,0 +1,71 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.products.models import Store, Product, ProductListing
+from apps.products.persistence import listing_result
+from apps.products.result_sets import get_page, latest_result_set, save_result_set, unsaved_page
+
+
+class ResultPageTests(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        store = Store.objects.create(name='Takealot', base_url='https://www.takealot.com')
+        self.listings = []
+        for index, price in enumerate([3000, 1000, 2000]):
+            product = Product.objects.create(name=f'Sony TV {index}', normalized_name=f'sony tv {index}')
+            self.listings.append(ProductListing.objects.create(
+                product=product, store=store, title=f'Sony TV {index}',
+                url=f'https://www.takealot.com/sony-{index}', current_price=price,
+            ))
+
+    def test_page_is_ordered_by_price(self):
+        result_set = save_result_set('sony tv', [listing_result(listing) for listing in self.listings])
+
+        prices = [result['price'] for result in get_page(result_set)]
+        self.assertEqual(prices, [1000.0, 2000.0, 3000.0])
+
+    def test_repriced_listing_drops_the_result_set(self):
+        save_result_set('sony tv', [listing_result(listing) for listing in self.listings])
+        self.assertIsNotNone(latest_result_set('sony tv'))
+
+        self.listings[1].current_price = 5000
+        with self.captureOnCommitCallbacks(execute=True):
+            self.listings[1].save()
+
+        self.assertIsNone(latest_result_set('sony tv'))
+
+    def test_listing_due_for_refresh_drops_the_result_set(self):
+        save_result_set('sony tv', [listing_result(listing) for listing in self.listings])
+
+        later = timezone.now() + timedelta(seconds=settings.SEARCH_FRESHNESS_TTL + 1)
+        self.assertIsNone(latest_result_set('sony tv', now=later))
+
+    def test_unsaved_results_are_ordered_like_a_result_set(self):
+        results = [{**listing_result(listing), 'id': None} for listing in self.listings]
+        results.append({**results[0], 'price': None})
+
+        prices = [result['price'] for result in unsaved_page(results)]
+        self.assertEqual(prices, [1000.0, 2000.0, 3000.0, None])
+
+    @mock.patch('apps.products.views.HybridScraperManager')
+    def test_search_page_shows_a_new_price(self, manager):
+        # Only Takealot has listings; the other stores are scraped and find nothing
+        manager.return_value.iter_stores_hybrid.return_value = []
+        self.client.get(reverse('search_results'), {'q': 'sony tv'})
+        first = latest_result_set('sony tv')
+
+        self.listings[1].current_price = 5000
+        with self.captureOnCommitCallbacks(execute=True):
+            self.listings[1].save()
+        response = self.client.get(reverse('search_results'), {'q': 'sony tv'})
+
+        self.assertNotEqual(latest_result_set('sony tv'), first)
+        self.assertContains(response, 'R5000.00')
+        self.assertNotContains(response, 'R1000.00')
@@ -0,0 +1,101 @@
+import json
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.products.models import ProductListing, ScrapeJob
+from apps.products.persistence import clear_store_registry, persist_scraped_results
+from apps.products.result_sets import latest_result_set
+
+
+def scraped_results(query):
+    return [{
+        'title': 'Sony WH-1000XM5',
+        'url': 'https://www.takealot.com/sony-wh-1000xm5',
+        'store': 'Takealot',
+        'price': 6999,
+        'product_id': 'PLID1',
+    }]
+
+
+@override_settings(SCRAPE_QUEUE_ENABLED=False, PERSISTENCE_MODE='sync', SERIALIZE_SCRAPE_WRITES=False)
+class SharedSearchTests(TestCase):
+    """The sync and async API searches take the same path through the cache, the queue and the scrapers."""
+
+    def setUp(self):
+        clear_store_registry()
+        for cache in caches.all():
+            cache.clear()
+        patcher = mock.patch('apps.products.views.HybridScraperManager')
+        self.manager = patcher.start().return_value
+        self.manager.search_all_stores_hybrid.side_effect = scraped_results
+        self.addCleanup(patcher.stop)
+
+    def search(self, name, **data):
+        return self.client.post(reverse(name), json.dumps({'query': 'sony', **data}), content_type='application/json')
+
+    async def asearch(self, name, **data):
+        return await self.async_client.post(
+            reverse(name), json.dumps({'query': 'sony', **data}), content_type='application/json'
+        )
+
+    def test_sync_search_uses_the_fallback_scrape(self):
+        response = self.search('api_search')
+
+        self.assertEqual(response.json()['total'], 1)
+        self.manager.search_all_stores_hybrid.assert_called_once_with('sony')
+        self.manager.close_all_scrapers.assert_called_once()
+        self.assertEqual(ProductListing.objects.count(), 1)
+
+    async def test_async_search_uses_the_fallback_scrape(self):
+        response = await self.asearch('api_search_async')
+
+        self.assertEqual(response.json()['total'], 1)
+        self.manager.search_all_stores_hybrid.assert_called_once_with('sony')
+        self.manager.close_all_scrapers.assert_called_once()
+        self.assertEqual(await ProductListing.objects.acount(), 1)
+
+    def test_sync_search_queues_a_job(self):
+        response = self.search('api_search', **{'async': True})
+
+        self.assertEqual(response.status_code, 202, response.content)
+        self.assertIn('status_url', response.json())
+        self.manager.search_all_stores_hybrid.assert_not_called()
+
+    @override_settings(SCRAPE_QUEUE_ENABLED=True)
+    async def test_async_search_honours_the_queue(self):
+        response = await self.asearch('api_search_async')
+
+        self.assertEqual(response.status_code, 202, response.content)
+        self.assertEqual(await ScrapeJob.objects.acount(), 1)
+        self.manager.search_all_stores_hybrid.assert_not_called()
+
+
+class InlineWriter:
+    """Writes a write-behind submission straight away, as the writer thread does after its commit."""
+
+    def submit(self, scraped, on_persisted=None):
+        results = persist_scraped_results(scraped)
+        on_persisted(results)
+
+
+@override_settings(SCRAPE_QUEUE_ENABLED=False, PERSISTENCE_MODE='write_behind')
+class WriteBehindSearchTests(TestCase):
+    def setUp(self):
+        clear_store_registry()
+        for cache in caches.all():
+            cache.clear()
+
+    @mock.patch('apps.products.views.get_writer', InlineWriter)
+    @mock.patch('apps.products.views.HybridScraperManager')
+    def test_saved_results_get_a_result_set(self, manager):
+        manager.return_value.search_all_stores_hybrid.side_effect = scraped_results
+
+        response = self.client.get(reverse('search_results'), {'q': 'sony'})
+
+        self.assertEqual(response.status_code, 200)
+        result_set = latest_result_set('sony')
+        self.assertIsNotNone(result_set)
+        self.assertEqual(result_set.result_count, 1)
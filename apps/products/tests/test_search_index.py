@@ -0,0 +1,66 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.products.models import Store, Product, ProductListing
+from apps.products.planner import plan_search
+from apps.products.search_index import fts5_available, search_listings
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.takealot = Store.objects.create(name='Takealot', base_url='https://www.takealot.com')
+        self.game = Store.objects.create(name='Game', base_url='https://www.game.co.za')
+
+    def create_listing(self, title: str, store: Store, brand: str = '', **fields) -> ProductListing:
+        product = Product.objects.create(name=title, normalized_name=title.lower(), brand=brand)
+        return ProductListing.objects.create(
+            product=product, store=store, title=title, url=f'https://example.com/{store.id}/{product.id}',
+            current_price=999, **fields,
+        )
+
+    def assertRanking(self):
+        case = self.create_listing('Clear case for Samsung Galaxy S24 and many other phones', self.takealot)
+        phone = self.create_listing('Samsung Galaxy S24', self.takealot, brand='Samsung')
+        self.create_listing('Apple iPhone 15', self.takealot, brand='Apple')
+
+        self.assertEqual(search_listings('galaxy s24'), [phone, case])
+        # Terms match as prefixes
+        self.assertEqual(search_listings('galax s2'), [phone, case])
+        self.assertEqual(search_listings('sony'), [])
+
+    def test_fts_ranks_by_bm25(self):
+        self.assertTrue(fts5_available())
+        self.assertRanking()
+
+    @mock.patch('apps.products.search_index.fts5_available', return_value=False)
+    def test_python_fallback_ranks_the_same(self, fts5_available):
+        self.assertRanking()
+
+    def test_user_input_is_not_fts_syntax(self):
+        self.create_listing('Samsung Galaxy S24', self.takealot)
+
+        self.assertEqual(search_listings('galaxy "OR NEAR('), [])
+
+    def test_plan_splits_fresh_and_stale_stores(self):
+        self.create_listing('Samsung Galaxy S24', self.takealot)
+        self.create_listing('Samsung Galaxy S24', self.game,
+                            next_refresh_at=timezone.now() - timedelta(minutes=1))
+
+        plan = plan_search('galaxy s24', stores=['takealot', 'game', 'makro'])
+
+        self.assertEqual(list(plan.fresh), ['takealot'])
+        self.assertEqual(plan.stale, ['game', 'makro'])
+        self.assertFalse(plan.complete)
+        self.assertFalse(plan.scrape_all)
+        self.assertEqual([result['store'] for result in plan.results], ['Takealot'])
+
+    def test_plan_is_complete_when_every_store_is_fresh(self):
+        self.create_listing('Samsung Galaxy S24', self.takealot)
+
+        plan = plan_search('galaxy s24', stores=['takealot'])
+
+        self.assertTrue(plan.complete)
+        self.assertEqual(plan.merge([{'store': 'Game'}])[-1], {'store': 'Game'})
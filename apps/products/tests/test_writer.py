@@ -0,0 +1,82 @@
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.products.writer import BackgroundWriter
+
+
+def persisted(batches):
+    """What persist_batches returns: each submission's results, unchanged."""
+    return [list(results) for results in batches]
+
+
+@mock.patch('apps.products.writer.connection', mock.Mock())
+class BackgroundWriterTests(SimpleTestCase):
+    @mock.patch('apps.products.writer.persist_batches', side_effect=persisted)
+    def test_full_queue_writes_inline(self, persist_batches):
+        writer = BackgroundWriter(max_pending=1, submit_timeout=0)
+        # No writer thread, so the first submission stays queued
+        writer.start = mock.Mock()
+        queued = writer.submit([{'title': 'first'}])
+
+        with self.assertLogs('apps.products.writer', 'WARNING'):
+            inline = writer.submit([{'title': 'second'}])
+
+        self.assertEqual(inline.result(timeout=0), [{'title': 'second'}])
+        self.assertFalse(queued.done())
+        persist_batches.assert_called_once_with([[{'title': 'second'}]])
+
+    @mock.patch('apps.products.writer.persist_batches', side_effect=[RuntimeError('database is locked'), [['saved']]])
+    def test_failed_write_is_retried(self, persist_batches):
+        writer = BackgroundWriter(retry_delay=0)
+        callback = mock.Mock()
+
+        with self.assertLogs('apps.products.writer', 'WARNING') as logs:
+            future = writer.submit(['scraped'], on_persisted=callback)
+            self.assertEqual(future.result(timeout=5), ['saved'])
+
+        self.assertEqual(persist_batches.call_count, 2)
+        callback.assert_called_once_with(['saved'])
+        self.assertIn('database is locked', logs.output[0])
+
+    @mock.patch('apps.products.writer.persist_batches', side_effect=RuntimeError('disk I/O error'))
+    def test_last_failure_reaches_the_submitter(self, persist_batches):
+        writer = BackgroundWriter(max_retries=2, retry_delay=0)
+
+        with self.assertLogs('apps.products.writer', 'WARNING') as logs:
+            future = writer.submit(['scraped'])
+            with self.assertRaisesMessage(RuntimeError, 'disk I/O error'):
+                future.result(timeout=5)
+
+        self.assertEqual(persist_batches.call_count, 2)
+        self.assertIn('gave up', logs.output[-1])
+
+    def test_writes_are_serialized_in_submission_order(self):
+        writer = BackgroundWriter(batch_size=3)
+        written = []
+        active = []
+        overlaps = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def persist_batches(batches):
+            active.append(batches)
+            overlaps.append(len(active))
+            started.set()
+            release.wait(5)
+            written.extend(results[0] for results in batches)
+            active.pop()
+            return persisted(batches)
+
+        with mock.patch('apps.products.writer.persist_batches', persist_batches):
+            first = writer.submit([0])
+            self.assertTrue(started.wait(5))
+            # Queued behind the write in progress, then drained as batches of up to three
+            futures = [first] + [writer.submit([index]) for index in range(1, 6)]
+            release.set()
+            for future in futures:
+                future.result(timeout=5)
+
+        self.assertEqual(written, list(range(6)))
+        self.assertEqual(set(overlaps), {1})
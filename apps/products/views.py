@@ -1,18 +1,33 @@
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.conf import settings
+from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.cache import cache_page
-from django.core.paginator import Paginator
-from django.db.models import Q, Min
-from django.utils import timezone
-from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from asgiref.sync import sync_to_async
 import json
-from typing import List, Dict
+import time
+from typing import List, Dict, Iterator, NamedTuple, Optional, Callable
 
-from .models import Product, ProductListing, Store, SearchQuery, PriceHistory
+from .models import ProductListing, SearchQuery, ScrapeJob, SearchResultSet
+from .jobs import enqueue_scrape_job, get_recent_results, job_status
+from .cache_tags import cache_search_results, cached_search_results
+from .conditional import conditional_page, latest_update, make_etag, uncacheable_page
+from .detail import get_detail_payload
+from .facets import FacetFilters, facet_counts, facet_rows, filtered_count
+from .planner import SearchPlan, plan_search
+from .query_budget import query_budget
+from .result_sets import get_page, latest_result_set, save_result_set, unsaved_page
+from .persistence import preview_results
+from .writer import get_writer, save_results
 from apps.scrapers.hybrid_scraper_manager import HybridScraperManager
 
 
+def render_page(request, template_name: str, context: Optional[Dict] = None):
+    """Render one of the result pages with the engine chosen by PAGE_TEMPLATE_ENGINE."""
+    return render(request, template_name, context, using=settings.PAGE_TEMPLATE_ENGINE)
+
+
 def home(request):
     """Home page with search functionality."""
     return render(request, 'products/home.html')
@@ -23,7 +38,7 @@ def search_results(request):
     query = request.GET.get('q', '').strip()
     
     if not query:
-        return render(request, 'products/search_results.html', {
+        return render_page(request, 'products/search_results.html', {
             'query': '',
             'results': [],
             'message': 'Please enter a search term.'
@@ -35,167 +50,233 @@ def search_results(request):
         user_ip=request.META.get('REMOTE_ADDR')
     )
     
-    # Check cache first
-    cache_key = f"search_results_{query.lower()}"
-    cached_results = cache.get(cache_key)
-    
-    if cached_results:
-        results = cached_results
-    else:
-        # Search all stores using hybrid approach
-        scraper_manager = HybridScraperManager()
-        scraped_results = scraper_manager.search_all_stores_hybrid(query)
+    # Pages are read from the query's stored result set while it is fresh
+    result_set = latest_result_set(query)
+    results = []
+    job = None
+    if result_set is None:
+        outcome = run_search(query, queue=settings.SCRAPE_QUEUE_ENABLED)
+        results, job = outcome.results, outcome.job
         
-        # Process and save results
-        results = process_and_save_results(scraped_results, query)
-        
-        # Cache results for 30 minutes
-        cache.set(cache_key, results, 1800)
+        # A queued job's partial results are not stored, so the finished job is picked up
+        if job is None:
+            result_set = save_result_set(query, results)
     
-    # Update search query with results count
-    SearchQuery.objects.filter(query=query).update(results_count=len(results))
+    context = result_page(request, query, result_set, results)
     
-    # Paginate results
-    paginator = Paginator(results, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Update search query with results count
+    SearchQuery.objects.filter(query=query).update(results_count=result_set.result_count if result_set else len(results))
     
-    return render(request, 'products/search_results.html', {
+    return search_response(request, result_set, {
         'query': query,
-        'results': page_obj,
-        'total_results': len(results)
+        'job': job,
+        **context,
     })
 
 
-def process_and_save_results(scraped_results: List[Dict], query: str) -> List[Dict]:
-    """Process scraped results and save to database."""
-    processed_results = []
+def search_response(request, result_set: Optional[SearchResultSet], context: Dict):
+    """Render a search page; pages of a stored result set can be revalidated with a 304."""
+    if result_set is None:
+        return uncacheable_page(render_page(request, 'products/search_results.html', context))
     
-    for result in scraped_results:
-        try:
-            # Normalize product name
-            normalized_name = normalize_product_name(result['title'])
-            
-            # Get or create product
-            product, created = Product.objects.get_or_create(
-                normalized_name=normalized_name,
-                defaults={
-                    'name': result['title'],
-                    'brand': extract_brand(result['title']),
-                    'model': extract_model(result['title']),
-                }
-            )
-            
-            # Get or create store
-            store, created = Store.objects.get_or_create(
-                name=result['store'],
-                defaults={'base_url': get_store_url(result['store'])}
-            )
-            
-            # Get or create product listing
-            listing, created = ProductListing.objects.get_or_create(
-                product=product,
-                store=store,
-                defaults={
-                    'title': result['title'],
-                    'url': result['url'],
-                    'image_url': result.get('image_url', ''),
-                    'current_price': result.get('price', 0) or 0,
-                    'is_available': result.get('price') is not None,
-                }
-            )
-            
-            # Update listing if price changed
-            if result.get('price') and listing.current_price != result['price']:
-                # Save price history
-                PriceHistory.objects.create(
-                    listing=listing,
-                    price=listing.current_price,
-                    is_available=listing.is_available
-                )
-                
-                # Update current price
-                listing.current_price = result['price']
-                listing.is_available = True
-                listing.last_updated = timezone.now()
-                listing.save()
-            
-            # Add to processed results
-            processed_results.append({
-                'id': listing.id,
-                'title': listing.title,
-                'url': listing.url,
-                'price': float(listing.current_price) if listing.current_price else None,
-                'image_url': listing.image_url,
-                'store': store.name,
-                'store_url': store.base_url,
-                'is_available': listing.is_available,
-                'last_updated': listing.last_updated,
-            })
-            
-        except Exception as e:
-            print(f"Error processing result: {e}")
-            continue
-    
-    return processed_results
-
-
-def normalize_product_name(name: str) -> str:
-    """Normalize product name for comparison."""
-    import re
-    
-    # Remove extra spaces and convert to lowercase
-    normalized = re.sub(r'\s+', ' ', name.strip().lower())
-    
-    # Remove common words that don't affect comparison
-    common_words = ['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by']
-    words = normalized.split()
-    filtered_words = [word for word in words if word not in common_words]
-    
-    return ' '.join(filtered_words)
-
-
-def extract_brand(name: str) -> str:
-    """Extract brand from product name."""
-    # Common brand patterns
-    brands = ['Apple', 'Samsung', 'Sony', 'LG', 'Dell', 'HP', 'Lenovo', 'Asus', 'Acer', 'MSI', 'NVIDIA', 'AMD', 'Intel']
-    
-    for brand in brands:
-        if brand.lower() in name.lower():
-            return brand
-    
-    return ''
-
-
-def extract_model(name: str) -> str:
-    """Extract model from product name."""
-    import re
-    
-    # Look for model patterns like "iPhone 15 Pro", "Galaxy S24", etc.
-    model_patterns = [
-        r'iPhone\s+\d+[A-Za-z\s]*',
-        r'Galaxy\s+[A-Za-z0-9\s]+',
-        r'MacBook\s+[A-Za-z0-9\s]+',
-        r'Dell\s+[A-Za-z0-9\s]+',
-        r'HP\s+[A-Za-z0-9\s]+',
-    ]
+    page = context['results']
+    etag = make_etag(
+        result_set.id, context['query'], page.results, page.next_cursor, page.previous_cursor,
+        context['total_results'], context['facets'],
+    )
+    return conditional_page(
+        request, etag, latest_update(page.results),
+        lambda: render_page(request, 'products/search_results.html', context),
+    )
+
+
+def result_page(request, query: str, result_set: Optional[SearchResultSet], results: List[Dict]) -> Dict:
+    """Template context for the requested page.
+    
+    Saved result sets are paged from the database and can be filtered by facet;
+    unsaved results (write-behind previews, a queued job's partial results) are
+    shown from memory.
+    """
+    if result_set is None:
+        return {
+            'results': unsaved_page(results),
+            'total_results': len(results),
+        }
     
-    for pattern in model_patterns:
-        match = re.search(pattern, name, re.IGNORECASE)
-        if match:
-            return match.group().strip()
+    filters = FacetFilters.from_request(request)
+    rows = facet_rows(result_set)
+    page = get_page(
+        result_set,
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+        filters=filters.q() if filters.active else None,
+    )
+    return {
+        'results': page,
+        'total_results': filtered_count(rows, filters),
+        'facets': facet_counts(rows, filters),
+        'filters': filters,
+        'page_query': filters.querystring(query),
+    }
+
+
+class SearchOutcome(NamedTuple):
+    """Results for a query; a queued job, or a plan whose stale stores still need scraping."""
+    results: List[Dict]
+    job: Optional[ScrapeJob] = None
+    plan: Optional[SearchPlan] = None
+
+
+def prepare_search(query: str, queue: bool) -> SearchOutcome:
+    """Answer a query from the cache, the database or a finished job where possible.
+    
+    With queue set, stale stores are left to a worker: a job is queued and the
+    stored results are returned meanwhile. Otherwise the outcome carries the
+    plan and the caller scrapes its stale stores, then calls finish_search.
+    """
+    # Cache first; entries drop out as soon as one of their listings changes
+    cached_results = cached_search_results(query)
+    if cached_results:
+        return SearchOutcome(cached_results)
     
-    return ''
+    # Serve stores with fresh listings from the database and scrape only the rest
+    plan = plan_search(query)
+    if plan.complete:
+        cache_search_results(query, plan.results)
+        return SearchOutcome(plan.results)
+    
+    if queue:
+        # Scraping runs in worker processes; pick up finished results or queue a job
+        results = get_recent_results(query)
+        if results is None:
+            return SearchOutcome(plan.results, job=enqueue_scrape_job(query))
+        cache_search_results(query, results)
+        return SearchOutcome(results)
+    
+    return SearchOutcome([], plan=plan)
 
 
-def get_store_url(store_name: str) -> str:
-    """Get base URL for store."""
-    store_urls = {
-        'Takealot': 'https://www.takealot.com',
-        'Game': 'https://www.game.co.za',
-        'Makro': 'https://www.makro.co.za',
-    }
-    return store_urls.get(store_name, '')
+def finish_search(query: str, plan: SearchPlan, scraped_results: List[Dict]) -> SearchOutcome:
+    """Save a plan's scraped results and merge them with its stored ones.
+    
+    Write-behind results get their result set once the writer has saved them,
+    so only the first page view is shown from memory.
+    """
+    def on_persisted(persisted: List[Dict]):
+        results = plan.merge(persisted)
+        cache_search_results(query, results)
+        save_result_set(query, results)
+    
+    results = plan.merge(process_and_save_results(scraped_results, query, on_persisted=on_persisted))
+    
+    # add() keeps saved results the writer may already have cached
+    cache_search_results(query, results, add=True)
+    return SearchOutcome(results)
+
+
+def run_search(query: str, queue: bool) -> SearchOutcome:
+    """Results for a query, scraping the stale stores in threads if needed."""
+    outcome = prepare_search(query, queue)
+    if outcome.plan is None:
+        return outcome
+    return finish_search(query, outcome.plan, scrape_stale_stores(outcome.plan))
+
+
+async def arun_search(query: str, queue: bool) -> SearchOutcome:
+    """Async counterpart of run_search: the same steps, with the scrape awaited on the event loop.
+    
+    The database steps run through sync_to_async: the batch write needs a
+    transaction, which the async ORM can't open.
+    """
+    outcome = await sync_to_async(prepare_search)(query, queue)
+    if outcome.plan is None:
+        return outcome
+    scraped_results = await ascrape_stale_stores(outcome.plan)
+    return await sync_to_async(finish_search)(query, outcome.plan, scraped_results)
+
+
+def scrape_stale_stores(plan: SearchPlan) -> List[Dict]:
+    """Scrape the stores a search plan could not serve from the database."""
+    scraper_manager = HybridScraperManager()
+    try:
+        if plan.scrape_all:
+            # Nothing stored yet; the all-store search has the advanced/basic/sample fallbacks
+            return scraper_manager.search_all_stores_hybrid(plan.query)
+        
+        scraped_results = []
+        for store_name, results in scraper_manager.iter_stores_hybrid(plan.query, stores=plan.stale):
+            scraped_results.extend(results)
+        return scraped_results
+    finally:
+        scraper_manager.close_all_scrapers()
+
+
+async def ascrape_stale_stores(plan: SearchPlan) -> List[Dict]:
+    """Async counterpart of scrape_stale_stores, giving each stale store STORE_SEARCH_TIMEOUT."""
+    scraper_manager = await sync_to_async(HybridScraperManager, thread_sensitive=False)()
+    try:
+        if plan.scrape_all:
+            return await sync_to_async(scraper_manager.search_all_stores_hybrid, thread_sensitive=False)(plan.query)
+        
+        by_store = await scraper_manager.asearch_stores_hybrid(
+            plan.query, stores=plan.stale, timeout=settings.STORE_SEARCH_TIMEOUT
+        )
+        return [result for results in by_store.values() for result in results]
+    finally:
+        await sync_to_async(scraper_manager.close_all_scrapers, thread_sensitive=False)()
+
+
+def process_and_save_results(scraped_results: List[Dict], query: str,
+                             on_persisted: Optional[Callable[[List[Dict]], None]] = None) -> List[Dict]:
+    """Process scraped results and save to database.
+    
+    In write-behind mode the results are handed to the background writer and
+    returned straight from the scrape output, without listing ids; on_persisted
+    is called with the saved results once the writer has committed them.
+    """
+    if settings.PERSISTENCE_MODE == 'write_behind':
+        get_writer().submit(scraped_results, on_persisted)
+        return preview_results(scraped_results)
+    
+    return save_results(scraped_results)
+
+
+async def search_results_async(request):
+    """Display search results, scraping stores concurrently without holding a thread."""
+    query = request.GET.get('q', '').strip()
+    
+    if not query:
+        return render_page(request, 'products/search_results.html', {
+            'query': '',
+            'results': [],
+            'message': 'Please enter a search term.'
+        })
+    
+    await SearchQuery.objects.acreate(
+        query=query,
+        user_ip=request.META.get('REMOTE_ADDR')
+    )
+    
+    result_set = await sync_to_async(latest_result_set)(query)
+    results = []
+    job = None
+    if result_set is None:
+        outcome = await arun_search(query, queue=settings.SCRAPE_QUEUE_ENABLED)
+        results, job = outcome.results, outcome.job
+        if job is None:
+            result_set = await sync_to_async(save_result_set)(query, results)
+    
+    context = await sync_to_async(result_page)(request, query, result_set, results)
+    
+    await SearchQuery.objects.filter(query=query).aupdate(
+        results_count=result_set.result_count if result_set else len(results)
+    )
+    
+    return search_response(request, result_set, {
+        'query': query,
+        'job': job,
+        **context,
+    })
 
 
 @csrf_exempt
@@ -211,54 +292,194 @@ def api_search(request):
         if not query:
             return JsonResponse({'error': 'Query parameter required'}, status=400)
         
-        # Search all stores using hybrid approach
-        scraper_manager = HybridScraperManager()
-        results = scraper_manager.search_all_stores_hybrid(query)
+        # Hand a scrape to a worker process when asked and let the client poll the job
+        outcome = run_search(query, queue=data.get('async', settings.SCRAPE_QUEUE_ENABLED))
+        if outcome.job is not None:
+            return job_response(request, outcome.job)
+        
+        return JsonResponse({
+            'query': query,
+            'results': outcome.results,
+            'total': len(outcome.results)
+        })
+        
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@csrf_exempt
+async def api_search_async(request):
+    """Async API endpoint for search."""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST method required'}, status=405)
+    
+    try:
+        data = json.loads(request.body)
+        query = data.get('query', '').strip()
+        
+        if not query:
+            return JsonResponse({'error': 'Query parameter required'}, status=400)
         
-        # Process results
-        processed_results = process_and_save_results(results, query)
+        outcome = await arun_search(query, queue=data.get('async', settings.SCRAPE_QUEUE_ENABLED))
+        if outcome.job is not None:
+            return job_response(request, outcome.job)
         
         return JsonResponse({
             'query': query,
-            'results': processed_results,
-            'total': len(processed_results)
+            'results': outcome.results,
+            'total': len(outcome.results)
         })
         
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
 
-def product_detail(request, product_id):
-    """Product detail page with price history."""
-    listing = get_object_or_404(ProductListing, id=product_id)
+def job_response(request, job: ScrapeJob) -> JsonResponse:
+    """202 response pointing the client at a queued job's status URL."""
+    response = job_status(job)
+    response['status_url'] = request.build_absolute_uri(reverse('api_job_status', args=[job.id]))
+    return JsonResponse(response, status=202)
+
+
+@csrf_exempt
+def api_search_stream(request):
+    """Streaming API endpoint that emits each store's results as soon as it completes."""
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({'error': 'Invalid JSON body'}, status=400)
+    else:
+        data = request.GET
     
-    # Get price history
-    price_history = PriceHistory.objects.filter(listing=listing).order_by('-recorded_at')[:30]
+    query = (data.get('query') or data.get('q') or '').strip()
+    if not query:
+        return JsonResponse({'error': 'Query parameter required'}, status=400)
     
-    # Get similar products
-    similar_products = ProductListing.objects.filter(
-        product__normalized_name=listing.product.normalized_name
-    ).exclude(id=product_id).order_by('current_price')
+    # Server-Sent Events for browsers, newline-delimited JSON for everything else
+    use_sse = data.get('format') == 'sse' or 'text/event-stream' in request.META.get('HTTP_ACCEPT', '')
+    if use_sse:
+        chunks = (format_sse(event) for event in stream_search_events(query))
+        content_type = 'text/event-stream'
+    else:
+        chunks = (format_ndjson(event) for event in stream_search_events(query))
+        content_type = 'application/x-ndjson'
     
-    return render(request, 'products/product_detail.html', {
-        'listing': listing,
-        'price_history': price_history,
-        'similar_products': similar_products,
-    })
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Stop nginx from buffering the stream
+    return response
+
+
+def stream_search_events(query: str) -> Iterator[Dict]:
+    """Yield a 'store' event per completed store followed by a final 'summary' event."""
+    started = time.monotonic()
+    all_results = []
+    store_counts = {}
+    
+    # Stores with fresh listings are answered straight from the database
+    plan = plan_search(query)
+    for store_name, results in plan.fresh.items():
+        all_results.extend(results)
+        store_counts[store_name] = len(results)
+        yield store_event(store_name, results, started)
+    
+    if plan.stale:
+        scraper_manager = HybridScraperManager()
+        try:
+            for store_name, scraped_results in scraper_manager.iter_stores_hybrid(query, stores=plan.stale):
+                results = process_and_save_results(scraped_results, query)
+                all_results.extend(results)
+                store_counts[store_name] = len(results)
+                yield store_event(store_name, results, started)
+        finally:
+            scraper_manager.close_all_scrapers()
+    
+    cache_search_results(query, all_results)
+    
+    yield {
+        'event': 'summary',
+        'query': query,
+        'stores': store_counts,
+        'total': len(all_results),
+        'elapsed': round(time.monotonic() - started, 3),
+    }
+
+
+def store_event(store_name: str, results: List[Dict], started: float) -> Dict:
+    """Build the stream event for one store's results."""
+    return {
+        'event': 'store',
+        'store': store_name,
+        'results': results,
+        'total': len(results),
+        'elapsed': round(time.monotonic() - started, 3),
+    }
+
 
+def format_ndjson(event: Dict) -> str:
+    """Serialize an event as one line of newline-delimited JSON."""
+    return json.dumps(event, cls=DjangoJSONEncoder) + '\n'
 
+
+def format_sse(event: Dict) -> str:
+    """Serialize an event as a Server-Sent Events message."""
+    payload = {key: value for key, value in event.items() if key != 'event'}
+    return f"event: {event['event']}\ndata: {json.dumps(payload, cls=DjangoJSONEncoder)}\n\n"
+
+
+def api_job_status(request, job_id):
+    """API endpoint for polling a queued scrape job."""
+    job = get_object_or_404(ScrapeJob, id=job_id)
+    return JsonResponse(job_status(job))
+
+
+@query_budget(3)
+def product_detail(request, product_id):
+    """Product detail page with price history."""
+    # Served from the cache until a write touches the listing or its siblings
+    payload = get_detail_payload(product_id)
+    listings = [payload['listing']] + payload['similar_products']
+    return conditional_page(
+        request, make_etag(payload), latest_update(listings),
+        lambda: render_page(request, 'products/product_detail.html', payload),
+    )
+
+
+@query_budget(1)
 def compare_products(request):
     """Compare multiple products."""
-    product_ids = request.GET.getlist('products')
+    product_ids = [product_id for product_id in request.GET.getlist('products') if product_id.isdigit()]
     
     if not product_ids:
-        return render(request, 'products/compare.html', {
+        return render_page(request, 'products/compare.html', {
             'products': [],
             'message': 'No products selected for comparison.'
         })
     
-    products = ProductListing.objects.filter(id__in=product_ids).order_by('current_price')
+    listings = ProductListing.objects.filter(id__in=product_ids).select_related('product', 'store').order_by('current_price')
     
-    return render(request, 'products/compare.html', {
-        'products': products,
-    })
+    columns = comparison_columns(listings)
+    return conditional_page(
+        request, make_etag(columns), latest_update(columns),
+        lambda: render_page(request, 'products/compare.html', {'products': columns}),
+    )
+
+
+def comparison_columns(listings) -> List[Dict]:
+    """One plain dict per compared listing, so the template's rows never touch the ORM."""
+    return [
+        {
+            'id': listing.id,
+            'title': listing.title,
+            'url': listing.url,
+            'image_url': listing.image_url,
+            'store': listing.store.name,
+            'price': listing.current_price,
+            'is_available': listing.is_available,
+            'brand': listing.product.brand,
+            'model': listing.product.model,
+            'last_updated': listing.last_updated,
+        }
+        for listing in listings
+    ]
@@ -0,0 +1,135 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Dict, Callable, Optional
+
+from django.conf import settings
+from django.db import connection
+
+from .persistence import persist_batches, persist_scraped_results
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundWriter:
+    """Persists scraped results on a single background thread.
+
+    Funnelling every scrape write through one thread keeps writers from
+    contending for SQLite's write lock, and lets write-behind requests return
+    without waiting on the DB at all.
+
+    Submissions wait in a bounded queue. The writer thread drains whatever has
+    accumulated into one transaction, retrying with backoff on failure. When
+    the queue is full the submitting request writes its own batch inline,
+    which slows producers down to the speed of the database.
+    """
+
+    def __init__(self, max_pending: int = 50, batch_size: int = 20,
+                 max_retries: int = 3, retry_delay: float = 0.5, submit_timeout: float = 5.0):
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.submit_timeout = submit_timeout
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        """Start the writer thread if it isn't running yet."""
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='background-writer', daemon=True)
+                self.thread.start()
+
+    def submit(self, scraped_results: List[Dict],
+               on_persisted: Optional[Callable[[List[Dict]], None]] = None) -> Future:
+        """Queue results for saving. The future resolves to the persisted listing dicts."""
+        item = (scraped_results, on_persisted, Future())
+        self.start()
+
+        try:
+            self.queue.put(item, timeout=self.submit_timeout)
+        except queue.Full:
+            logger.warning("Background writer is behind, writing inline")
+            self.write([item])
+        return item[2]
+
+    def run(self):
+        """Writer thread: drain the queue in batches forever."""
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            self.write(batch)
+            for _ in batch:
+                self.queue.task_done()
+
+    def write(self, batch: List):
+        """Persist a batch of submissions in one transaction, with retries."""
+        for attempt in range(self.max_retries):
+            try:
+                persisted = persist_batches([results for results, _, _ in batch])
+                break
+            except Exception as e:
+                logger.warning("Background write failed (attempt %d/%d): %s", attempt + 1, self.max_retries, e)
+                # Start the next attempt on a fresh connection
+                connection.close()
+                if attempt == self.max_retries - 1:
+                    logger.error("Background write gave up after %d attempts", self.max_retries, exc_info=e)
+                    for _, _, future in batch:
+                        future.set_exception(e)
+                    return
+                time.sleep(self.retry_delay * (2 ** attempt))
+
+        for (_, on_persisted, future), results in zip(batch, persisted):
+            if on_persisted:
+                try:
+                    on_persisted(results)
+                except Exception:
+                    logger.exception("Error in write callback")
+            future.set_result(results)
+
+    def flush(self):
+        """Write everything still queued from the calling thread."""
+        pending = []
+        while True:
+            try:
+                pending.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        if pending:
+            self.write(pending)
+            for _ in pending:
+                self.queue.task_done()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> BackgroundWriter:
+    """Process-wide background writer."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = BackgroundWriter(
+                max_pending=settings.WRITE_BEHIND_MAX_PENDING,
+                max_retries=settings.WRITE_BEHIND_MAX_RETRIES,
+                submit_timeout=settings.WRITE_BEHIND_SUBMIT_TIMEOUT,
+            )
+            atexit.register(_writer.flush)
+        return _writer
+
+
+def save_results(scraped_results: List[Dict]) -> List[Dict]:
+    """Persist results and wait for them, going through the writer queue when writes are serialized."""
+    if settings.SERIALIZE_SCRAPE_WRITES:
+        return get_writer().submit(scraped_results).result()
+    return persist_scraped_results(scraped_results)
@@ -2,6 +2,7 @@ import requests
 import time
 import re
 import json
+from decimal import Decimal
 from typing import List, Dict, Optional
 from bs4 import BeautifulSoup
 from fake_useragent import UserAgent
@@ -14,6 +15,8 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
 import random
+from .identifiers import GTIN_ATTRIBUTES, attach_gtins, gtins_from_json_ld, normalize_gtin
+from .prices import parse_price, first_price
 
 
 class AdvancedScraper:
@@ -223,7 +226,7 @@ class AdvancedScraper:
                 except Exception as e:
                     continue
             
-            return products
+            return attach_gtins(products, self.structured_gtins())
             
         except Exception as e:
             print(f"Error extracting products: {e}")
@@ -255,8 +258,10 @@ class AdvancedScraper:
                 'title': title,
                 'url': url,
                 'price': price,
+                'original_price': self.extract_original_price(container),
                 'image_url': image_url,
                 'product_id': product_id,
+                'gtin': self.extract_gtin(container),
                 'store': self.store_name
             }
             
@@ -317,7 +322,7 @@ class AdvancedScraper:
         
         return None
     
-    def extract_price_advanced(self, container) -> Optional[float]:
+    def extract_price_advanced(self, container) -> Optional[Decimal]:
         """Advanced price extraction with multiple strategies."""
         price_selectors = [
             "[data-testid*='price']",
@@ -337,11 +342,10 @@ class AdvancedScraper:
                     # Use XPath for text-based selectors
                     xpath = "//span[contains(text(), 'R')] | //div[contains(text(), 'R')]"
                     elements = container.find_elements(By.XPATH, xpath)
-                    for element in elements:
-                        price_text = element.text.strip()
-                        price = self.parse_price(price_text)
-                        if price:
-                            return price
+                    # One tokenizer pass over every candidate text
+                    price = first_price(element.text for element in elements)
+                    if price:
+                        return price.amount
                 else:
                     element = container.find_element(By.CSS_SELECTOR, selector)
                     price_text = element.text.strip()
@@ -362,34 +366,18 @@ class AdvancedScraper:
         
         return None
     
-    def parse_price(self, text: str) -> Optional[float]:
-        """Parse price from text with multiple patterns."""
-        if not text:
+    def parse_price(self, text: str) -> Optional[Decimal]:
+        """Parse the current price from text as an exact Decimal."""
+        parsed = parse_price(' '.join(text.split()) if text else '')
+        return parsed.amount if parsed else None
+    
+    def extract_original_price(self, container) -> Optional[Decimal]:
+        """The pre-discount price when the card shows a was/now pair."""
+        try:
+            parsed = parse_price(' '.join(container.text.split()))
+        except:
             return None
-        
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text.strip())
-        
-        # Price patterns
-        patterns = [
-            r'R\s*([\d,]+\.?\d*)',
-            r'R\s*([\d,]+)',
-            r'([\d,]+\.?\d*)\s*R',
-            r'([\d,]+)\s*R',
-            r'([\d,]+\.?\d*)',
-            r'([\d,]+)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text)
-            if match:
-                try:
-                    price_str = match.group(1).replace(',', '')
-                    return float(price_str)
-                except ValueError:
-                    continue
-        
-        return None
+        return parsed.original_amount if parsed else None
     
     def extract_image_url(self, container) -> Optional[str]:
         """Extract product image URL with multiple strategies."""
@@ -435,6 +423,34 @@ class AdvancedScraper:
         
         return None
     
+    def extract_gtin(self, container) -> Optional[str]:
+        """Extract a GTIN/EAN barcode from data attributes or schema.org microdata."""
+        for attribute in GTIN_ATTRIBUTES:
+            try:
+                gtin = normalize_gtin(container.get_attribute(attribute))
+                if gtin:
+                    return gtin
+            except:
+                continue
+        
+        try:
+            for element in container.find_elements(By.CSS_SELECTOR, "[itemprop^='gtin']"):
+                gtin = normalize_gtin(element.get_attribute('content') or element.text)
+                if gtin:
+                    return gtin
+        except:
+            pass
+        
+        return None
+    
+    def structured_gtins(self) -> Dict[str, str]:
+        """GTINs by product URL and SKU from the current page's JSON-LD."""
+        try:
+            return gtins_from_json_ld(BeautifulSoup(self.driver.page_source, 'html.parser'))
+        except Exception as e:
+            print(f"Error reading structured data: {e}")
+            return {}
+    
     def close(self):
         """Close the browser driver."""
         if self.driver:
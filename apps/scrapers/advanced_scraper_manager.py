@@ -71,6 +71,13 @@ class AdvancedScraperManager:
         """Get list of available store names."""
         return list(self.scrapers.keys())
     
+    def close_scraper(self, store_name: str):
+        """Close one store's scraper."""
+        try:
+            self.scrapers[store_name].close()
+        except:
+            pass
+    
     def close_all_scrapers(self):
         """Close all scraper instances to free resources."""
         for scraper in self.scrapers.values():
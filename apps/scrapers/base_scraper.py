@@ -1,11 +1,13 @@
 import requests
 import time
-import re
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from decimal import Decimal
+from typing import List, Dict, Optional, Tuple
 from bs4 import BeautifulSoup
 from fake_useragent import UserAgent
 from django.conf import settings
+from .identifiers import gtin_from_element
+from .prices import parse_price
 
 
 class BaseScraper(ABC):
@@ -29,31 +31,21 @@ class BaseScraper(ABC):
             'Upgrade-Insecure-Requests': '1',
         })
     
-    def normalize_product_name(self, name: str) -> str:
-        """Normalize product name for comparison."""
-        # Remove extra spaces and convert to lowercase
-        normalized = re.sub(r'\s+', ' ', name.strip().lower())
-        
-        # Remove common words that don't affect comparison
-        common_words = ['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by']
-        words = normalized.split()
-        filtered_words = [word for word in words if word not in common_words]
-        
-        return ' '.join(filtered_words)
+    def extract_price(self, price_text: str) -> Optional[Decimal]:
+        """Extract the current price from text as an exact Decimal."""
+        parsed = parse_price(price_text)
+        return parsed.amount if parsed else None
     
-    def extract_price(self, price_text: str) -> Optional[float]:
-        """Extract numeric price from text."""
-        if not price_text:
-            return None
-        
-        # Remove currency symbols and extract numbers
-        price_match = re.search(r'[\d,]+\.?\d*', price_text.replace(',', ''))
-        if price_match:
-            try:
-                return float(price_match.group())
-            except ValueError:
-                return None
-        return None
+    def extract_prices(self, price_text: str) -> Tuple[Optional[Decimal], Optional[Decimal]]:
+        """Extract (current, original) prices from text such as "Was R1 499 Now R1 299"."""
+        parsed = parse_price(' '.join(price_text.split()) if price_text else '')
+        if not parsed:
+            return None, None
+        return parsed.amount, parsed.original_amount
+    
+    def extract_gtin(self, product_element) -> Optional[str]:
+        """Extract a GTIN/EAN barcode from a product element, if the store exposes one."""
+        return gtin_from_element(product_element)
     
     def get_page(self, url: str, retries: int = 3) -> Optional[BeautifulSoup]:
         """Get page content with retries."""
@@ -1,4 +1,8 @@
-from typing import List, Dict
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Iterator, Optional, Set, Tuple
+from asgiref.sync import sync_to_async
 from django.core.cache import cache
 from .scraper_manager import ScraperManager
 from .advanced_scraper_manager import AdvancedScraperManager
@@ -7,9 +11,15 @@ from .advanced_scraper_manager import AdvancedScraperManager
 class HybridScraperManager:
     """Hybrid manager that combines basic and advanced scraping techniques."""
     
+    STORES = ['takealot', 'game', 'makro']
+    
     def __init__(self):
         self.basic_manager = ScraperManager()
         self.advanced_manager = AdvancedScraperManager()
+        # Stores whose search thread is still driving its browser, and the ones its thread must close
+        self.lock = threading.Lock()
+        self.running: Set[str] = set()
+        self.abandoned: Set[str] = set()
     
     def search_all_stores_hybrid(self, query: str, use_advanced: bool = True) -> List[Dict]:
         """Hybrid search using both basic and advanced techniques."""
@@ -198,7 +208,7 @@ class HybridScraperManager:
     
     def search_specific_store_hybrid(self, store_name: str, query: str) -> List[Dict]:
         """Hybrid search for a specific store."""
-        if store_name not in ['takealot', 'game', 'makro']:
+        if store_name not in self.STORES:
             return []
         
         try:
@@ -221,13 +231,66 @@ class HybridScraperManager:
         all_sample = self.get_enhanced_sample_data(query)
         return [product for product in all_sample if product['store'].lower() == store_name]
     
+    def iter_stores_hybrid(self, query: str, stores: Optional[List[str]] = None) -> Iterator[Tuple[str, List[Dict]]]:
+        """Search stores concurrently, yielding each store's results as soon as it finishes."""
+        stores = stores or self.get_available_stores()
+        
+        # Each store has its own scraper and browser, so stores can run side by side
+        with ThreadPoolExecutor(max_workers=len(stores)) as executor:
+            futures = {
+                executor.submit(self.search_specific_store_hybrid, store_name, query): store_name
+                for store_name in stores
+            }
+            for future in as_completed(futures):
+                store_name = futures[future]
+                try:
+                    results = future.result()
+                except Exception as e:
+                    print(f"❌ Error searching {store_name}: {e}")
+                    results = []
+                yield store_name, results
+    
+    async def asearch_stores_hybrid(self, query: str, stores: Optional[List[str]] = None,
+                                    timeout: Optional[float] = None) -> Dict[str, List[Dict]]:
+        """Search stores concurrently from async code, giving each store its own timeout."""
+        stores = stores or self.get_available_stores()
+        
+        def search_in_thread(store_name: str) -> List[Dict]:
+            try:
+                return self.search_specific_store_hybrid(store_name, query)
+            finally:
+                with self.lock:
+                    self.running.discard(store_name)
+                    abandoned = store_name in self.abandoned
+                    self.abandoned.discard(store_name)
+                if abandoned:
+                    self.advanced_manager.close_scraper(store_name)
+        
+        async def search_store(store_name: str) -> List[Dict]:
+            # Scrapers block on the network, so each store runs in its own thread
+            search = sync_to_async(search_in_thread, thread_sensitive=False)
+            with self.lock:
+                self.running.add(store_name)
+            try:
+                return await asyncio.wait_for(search(store_name), timeout)
+            except asyncio.TimeoutError:
+                # The thread cannot be interrupted; it keeps its browser until it finishes
+                print(f"⏱️ {store_name} timed out after {timeout}s")
+            except Exception as e:
+                print(f"❌ Error searching {store_name}: {e}")
+            return []
+        
+        results = await asyncio.gather(*(search_store(store_name) for store_name in stores))
+        return dict(zip(stores, results))
+    
     def get_available_stores(self) -> List[str]:
         """Get list of available store names."""
-        return ['takealot', 'game', 'makro']
+        return list(self.STORES)
     
     def close_all_scrapers(self):
-        """Close all scraper instances."""
-        try:
-            self.advanced_manager.close_all_scrapers()
-        except:
-            pass
+        """Close all scraper instances, leaving a browser still in use to be closed by its search thread."""
+        with self.lock:
+            self.abandoned |= self.running
+            idle = [store_name for store_name in self.advanced_manager.scrapers if store_name not in self.running]
+        for store_name in idle:
+            self.advanced_manager.close_scraper(store_name)
@@ -0,0 +1,107 @@
+import json
+import re
+from typing import List, Dict, Optional
+
+from bs4 import BeautifulSoup
+
+
+GTIN_ATTRIBUTES = ['data-gtin', 'data-ean', 'data-barcode', 'data-upc']
+GTIN_ITEMPROPS = re.compile(r'^gtin(8|12|13|14)?$')
+JSON_LD_GTIN_KEYS = ['gtin13', 'gtin', 'gtin14', 'gtin12', 'gtin8', 'ean', 'isbn']
+
+
+def normalize_gtin(value) -> Optional[str]:
+    """Return a GTIN as 14 zero-padded digits if its length and check digit are valid.
+
+    EAN-13, UPC-A and GTIN-14 codes for the same item compare equal once padded.
+    """
+    if value is None:
+        return None
+    digits = re.sub(r'\D', '', str(value))
+    if len(digits) not in (8, 12, 13, 14):
+        return None
+
+    digits = digits.zfill(14)
+    total = sum(int(digit) * (3 if index % 2 == 0 else 1) for index, digit in enumerate(digits[:13]))
+    if (10 - total % 10) % 10 != int(digits[13]):
+        return None
+    return digits
+
+
+def gtin_from_element(element) -> Optional[str]:
+    """Find a GTIN in a product element's data attributes or schema.org microdata."""
+    if element is None:
+        return None
+
+    for tag in [element] + element.find_all(True):
+        for attribute in GTIN_ATTRIBUTES:
+            gtin = normalize_gtin(tag.get(attribute))
+            if gtin:
+                return gtin
+        if GTIN_ITEMPROPS.match(tag.get('itemprop') or ''):
+            gtin = normalize_gtin(tag.get('content') or tag.get_text(strip=True))
+            if gtin:
+                return gtin
+    return None
+
+
+def gtins_from_json_ld(soup: BeautifulSoup) -> Dict[str, str]:
+    """Map product URLs and SKUs to GTINs from a page's JSON-LD Product data."""
+    gtins = {}
+    for script in soup.find_all('script', type='application/ld+json'):
+        try:
+            data = json.loads(script.string or '')
+        except ValueError:
+            continue
+
+        for item in iter_json_ld_products(data):
+            gtin = next(
+                (normalize_gtin(item.get(key)) for key in JSON_LD_GTIN_KEYS if normalize_gtin(item.get(key))),
+                None,
+            )
+            if not gtin:
+                continue
+            offers = item.get('offers')
+            offers = offers if isinstance(offers, list) else [offers or {}]
+            for reference in [item.get('url'), item.get('sku')] + [offer.get('url') for offer in offers if isinstance(offer, dict)]:
+                if isinstance(reference, str) and reference:
+                    gtins[reference] = gtin
+    return gtins
+
+
+def iter_json_ld_products(data):
+    """Yield every schema.org Product in a JSON-LD document, including ItemList and @graph entries."""
+    if isinstance(data, list):
+        for item in data:
+            yield from iter_json_ld_products(item)
+    elif isinstance(data, dict):
+        kind = data.get('@type')
+        if kind == 'Product' or (isinstance(kind, list) and 'Product' in kind):
+            yield data
+        for key in ('@graph', 'itemListElement', 'item'):
+            if key in data:
+                yield from iter_json_ld_products(data[key])
+
+
+def attach_gtins(products: List[Dict], gtins: Dict[str, str]) -> List[Dict]:
+    """Fill in missing GTINs from structured data, matched by product URL or store product id."""
+    if not gtins:
+        return products
+
+    for product in products:
+        if product.get('gtin'):
+            continue
+        for reference in (product.get('url'), product.get('product_id')):
+            if reference and reference in gtins:
+                product['gtin'] = gtins[reference]
+                break
+        else:
+            # Structured data often uses relative or differently-parameterised URLs; SKUs
+            # such as "123" are only matched exactly, or they would match any URL ending in them
+            url = (product.get('url') or '').split('?')[0]
+            for reference, gtin in gtins.items():
+                path = reference.split('?')[0]
+                if url and '/' in path and url.endswith(path):
+                    product['gtin'] = gtin
+                    break
+    return products
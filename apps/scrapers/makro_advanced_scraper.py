@@ -1,7 +1,10 @@
 import time
 import re
+from decimal import Decimal
 from typing import List, Dict, Optional
 from .advanced_scraper import AdvancedScraper
+from .identifiers import attach_gtins
+from .prices import first_price
 
 
 class MakroAdvancedScraper(AdvancedScraper):
@@ -180,7 +183,7 @@ class MakroAdvancedScraper(AdvancedScraper):
                 except Exception as e:
                     continue
             
-            return products
+            return attach_gtins(products, self.structured_gtins())
             
         except Exception as e:
             print(f"Error extracting Makro products: {e}")
@@ -212,8 +215,10 @@ class MakroAdvancedScraper(AdvancedScraper):
                 'title': title,
                 'url': url,
                 'price': price,
+                'original_price': self.extract_original_price(container),
                 'image_url': image_url,
                 'product_id': product_id,
+                'gtin': self.extract_gtin(container),
                 'store': self.store_name
             }
             
@@ -275,7 +280,7 @@ class MakroAdvancedScraper(AdvancedScraper):
         except Exception as e:
             return None
     
-    def extract_makro_price(self, container) -> Optional[float]:
+    def extract_makro_price(self, container) -> Optional[Decimal]:
         """Extract price with Makro-specific selectors."""
         price_selectors = [
             "[data-testid*='price']",
@@ -294,11 +299,10 @@ class MakroAdvancedScraper(AdvancedScraper):
             try:
                 if selector.endswith("R')"):
                     elements = container.find_elements(By.XPATH, "//span[contains(text(), 'R')] | //div[contains(text(), 'R')]")
-                    for element in elements:
-                        price_text = element.text.strip()
-                        price = self.parse_price(price_text)
-                        if price:
-                            return price
+                    # One tokenizer pass over every candidate text
+                    price = first_price(element.text for element in elements)
+                    if price:
+                        return price.amount
                 else:
                     element = container.find_element(By.CSS_SELECTOR, selector)
                     price_text = element.text.strip()
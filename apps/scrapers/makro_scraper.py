@@ -2,6 +2,7 @@ import re
 from typing import List, Dict, Optional
 from bs4 import BeautifulSoup
 from .base_scraper import BaseScraper
+from .identifiers import attach_gtins, gtins_from_json_ld
 
 
 class MakroScraper(BaseScraper):
@@ -46,6 +47,9 @@ class MakroScraper(BaseScraper):
                 if product_data:
                     products.append(product_data)
         
+        # Barcodes from the page's structured data
+        attach_gtins(products, gtins_from_json_ld(soup))
+        
         # Cache results for 30 minutes
         self.set_cache(cache_key, products, 1800)
         return products
@@ -77,17 +81,9 @@ class MakroScraper(BaseScraper):
                 # Try alternative price selectors
                 price_element = product_element.find('div', class_=re.compile(r'price|amount|cost'))
             
-            if not price_element:
-                # Try looking for text that looks like a price
-                price_text = product_element.get_text()
-                price_match = re.search(r'R\s*[\d,]+\.?\d*', price_text)
-                if price_match:
-                    price_element = type('obj', (object,), {'get_text': lambda: price_match.group()})
-            
-            price = None
-            if price_element:
-                price_text = price_element.get_text(strip=True)
-                price = self.extract_price(price_text)
+            # Without a price element, the tokenizer picks the rand amounts out of the whole card
+            price_text = (price_element or product_element).get_text(' ', strip=True)
+            price, original_price = self.extract_prices(price_text)
             
             # Extract image
             img_element = product_element.find('img')
@@ -114,8 +110,10 @@ class MakroScraper(BaseScraper):
                 'title': title,
                 'url': url,
                 'price': price,
+                'original_price': original_price,
                 'image_url': image_url,
                 'product_id': product_id,
+                'gtin': self.extract_gtin(product_element),
                 'store': self.store_name
             }
             
@@ -135,14 +133,14 @@ class MakroScraper(BaseScraper):
                 url = self.base_url + url
             
             # Try to find price in parent elements
-            price = None
+            price = original_price = None
             parent = link_element.parent
             for _ in range(3):  # Check up to 3 parent levels
                 if parent:
                     price_element = parent.find('span', class_=re.compile(r'price|amount|cost|value'))
                     if price_element:
-                        price_text = price_element.get_text(strip=True)
-                        price = self.extract_price(price_text)
+                        price_text = price_element.get_text(' ', strip=True)
+                        price, original_price = self.extract_prices(price_text)
                         break
                     parent = parent.parent
                 else:
@@ -166,8 +164,10 @@ class MakroScraper(BaseScraper):
                 'title': title,
                 'url': url,
                 'price': price,
+                'original_price': original_price,
                 'image_url': image_url,
                 'product_id': url.split('/')[-1].split('?')[0] if any(x in url for x in ['/product/', '/item/', '/p/']) else None,
+                'gtin': self.extract_gtin(link_element),
                 'store': self.store_name
             }
             
@@ -0,0 +1,57 @@
+import re
+import unicodedata
+from functools import lru_cache
+from typing import List, Iterable
+
+
+# Words that don't help tell products apart
+STOP_WORDS = frozenset(['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'])
+
+UNIT_ALIASES = {
+    'gb': 'gb', 'tb': 'tb', 'mb': 'mb',
+    'kg': 'kg', 'g': 'g', 'ml': 'ml', 'l': 'l', 'mah': 'mah',
+    'w': 'w', 'v': 'v', 'hz': 'hz', 'mhz': 'mhz', 'ghz': 'ghz',
+    'inch': 'inch', 'inches': 'inch', '"': 'inch', "''": 'inch', 'cm': 'cm', 'mm': 'mm',
+}
+
+# "256 GB", "256GB" and "256-gb" become "256gb"; '55"' and "14-inch" become "55inch" and "14inch"
+UNIT_PATTERN = re.compile(
+    r'(?<![\w.])(\d+(?:[.,]\d+)?)[\s-]*(' + '|'.join(
+        re.escape(unit) for unit in sorted(UNIT_ALIASES, key=len, reverse=True)
+    ) + r')(?!\w)'
+)
+PUNCTUATION_TOKEN = re.compile(r'^[^\w]+$')
+
+
+def fold_unicode(text: str) -> str:
+    """Strip accents and compatibility forms ("Café", "ｉＰｈｏｎｅ" -> "Cafe", "iPhone")."""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def canonicalize_units(text: str) -> str:
+    """Join quantities to their units in one canonical spelling."""
+    return UNIT_PATTERN.sub(
+        lambda match: match.group(1).replace(',', '.') + UNIT_ALIASES[match.group(2)],
+        text,
+    )
+
+
+@lru_cache(maxsize=20000)
+def normalize_product_name(name: str) -> str:
+    """Normalize product name for comparison."""
+    normalized = canonicalize_units(fold_unicode(name).lower())
+
+    # Remove common words and stray punctuation that don't affect comparison
+    words = [
+        word for word in normalized.split()
+        if word not in STOP_WORDS and not PUNCTUATION_TOKEN.match(word)
+    ]
+    return ' '.join(words)
+
+
+def normalize_product_names(names: Iterable[str]) -> List[str]:
+    """Normalize a batch of names, computing each distinct name once."""
+    names = list(names)
+    normalized = {name: normalize_product_name(name) for name in set(names)}
+    return [normalized[name] for name in names]
@@ -0,0 +1,113 @@
+import re
+from decimal import Decimal
+from functools import lru_cache
+from typing import List, Iterable, NamedTuple, Optional
+
+
+# An amount is digits with optional thousands groups and optional one- or two-digit
+# cents: "1 299,00", "1,299.00", "1.299,00", "1299", "12,50". Dot thousands need comma
+# cents, since "1.299" could be either. An amount must not stop short of more digits,
+# so a number that fits none of these shapes is skipped rather than cut short.
+AMOUNT = (
+    r'(?:\d{1,3}(?:[ \u00a0\u202f]\d{3})+(?:[.,]\d{1,2})?'
+    r'|\d{1,3}(?:,\d{3})+(?:\.\d{1,2})?'
+    r'|\d{1,3}(?:\.\d{3})+,\d{1,2}'
+    r'|\d+(?:[.,]\d{1,2})?)'
+    r'(?!\d|[.,]\d)'
+)
+
+# One pass over the text yields labels ("was", "save"...) and rand amounts in order
+PRICE_TOKEN = re.compile(
+    r'(?P<label>\b(?:was|now|only|from|save|off|rrp|list\s+price)\b)'
+    r'|(?<![A-Za-z])(?:R|ZAR)\s?(?P<amount>' + AMOUNT + r')',
+    re.IGNORECASE,
+)
+BARE_AMOUNT = re.compile(r'\s*(?P<amount>' + AMOUNT + r')\s*')
+# Monthly instalments quoted next to the price: "R1 041 x 24 months", "R499 p/m"
+INSTALMENT = re.compile(r'\s*(?:x\s*\d+\s*(?:months?|mths?)\b|p/?m\b|per\s+month\b|/\s*mo(?:nth)?\b)', re.IGNORECASE)
+
+CURRENT_LABELS = {'now', 'only', 'from'}
+ORIGINAL_LABELS = {'was', 'rrp', 'list price'}
+DISCOUNT_LABELS = {'save'}
+
+
+class ParsedPrice(NamedTuple):
+    """A price in integer cents, with the pre-discount price when the text shows one."""
+    cents: int
+    original_cents: Optional[int] = None
+
+    @property
+    def amount(self) -> Decimal:
+        return Decimal(self.cents).scaleb(-2)
+
+    @property
+    def original_amount(self) -> Optional[Decimal]:
+        return Decimal(self.original_cents).scaleb(-2) if self.original_cents is not None else None
+
+
+def amount_to_cents(amount: str) -> int:
+    """Convert a matched amount to cents, working out which separator is the decimal point."""
+    amount = re.sub(r'[ \u00a0\u202f]', '', amount)
+    # A separator followed by one or two final digits marks the cents
+    match = re.match(r'^(.*?)(?:[.,](\d{1,2}))?$', amount)
+    whole = re.sub(r'\D', '', match.group(1))
+    cents = (match.group(2) or '').ljust(2, '0')
+    return int(whole or '0') * 100 + int(cents)
+
+
+@lru_cache(maxsize=10000)
+def parse_price(text: str) -> Optional[ParsedPrice]:
+    """Parse rand prices from text such as "R 1 299,00" or "Was R1,499.00 Now R1,299.00".
+
+    Only amounts marked with R/ZAR count, so product codes and quantities in
+    the same text are never mistaken for prices; text that is nothing but a
+    number is accepted as-is. Amounts after "save" or before "off" are
+    discounts and monthly instalments are not prices; both are skipped. Text
+    with more than two unlabelled amounts is ambiguous and gives None.
+    """
+    if not text:
+        return None
+
+    current, original, unlabelled = [], [], []
+    label = None
+    tokens = list(PRICE_TOKEN.finditer(text))
+    for index, token in enumerate(tokens):
+        if token.group('label'):
+            label = ' '.join(token.group('label').lower().split())
+            continue
+
+        following = tokens[index + 1].group('label') if index + 1 < len(tokens) else None
+        cents = amount_to_cents(token.group('amount'))
+        if label in DISCOUNT_LABELS or (following or '').lower() == 'off':
+            pass
+        elif INSTALMENT.match(text, token.end()):
+            pass
+        elif label in CURRENT_LABELS:
+            current.append(cents)
+        elif label in ORIGINAL_LABELS:
+            original.append(cents)
+        else:
+            unlabelled.append(cents)
+        label = None
+
+    if not (current or original or unlabelled):
+        match = BARE_AMOUNT.fullmatch(text)
+        return ParsedPrice(amount_to_cents(match.group('amount'))) if match else None
+
+    if not current and len(set(unlabelled)) > 2:
+        return None
+
+    # Unlabelled pairs are shown as the current price next to the higher old price
+    price = current[0] if current else (min(unlabelled) if unlabelled else original[0])
+    was = original[0] if original else max(unlabelled + current, default=None)
+    return ParsedPrice(price, was if was is not None and was > price else None)
+
+
+def parse_prices(texts: Iterable[str]) -> List[Optional[ParsedPrice]]:
+    """Parse a batch of price texts; repeated texts are parsed once."""
+    return [parse_price(' '.join(text.split()) if text else '') for text in texts]
+
+
+def first_price(texts: Iterable[str]) -> Optional[ParsedPrice]:
+    """The first text in a batch that holds a price."""
+    return next((price for price in parse_prices(texts) if price), None)
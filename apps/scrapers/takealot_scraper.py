@@ -2,6 +2,7 @@ import re
 from typing import List, Dict, Optional
 from bs4 import BeautifulSoup
 from .base_scraper import BaseScraper
+from .identifiers import attach_gtins, gtins_from_json_ld
 
 
 class TakealotScraper(BaseScraper):
@@ -46,6 +47,9 @@ class TakealotScraper(BaseScraper):
                 if product_data:
                     products.append(product_data)
         
+        # Barcodes from the page's structured data
+        attach_gtins(products, gtins_from_json_ld(soup))
+        
         # Cache results for 30 minutes
         self.set_cache(cache_key, products, 1800)
         return products
@@ -77,10 +81,10 @@ class TakealotScraper(BaseScraper):
                 # Try alternative price selectors
                 price_element = product_element.find('div', class_=re.compile(r'price'))
             
-            price = None
+            price = original_price = None
             if price_element:
-                price_text = price_element.get_text(strip=True)
-                price = self.extract_price(price_text)
+                price_text = price_element.get_text(' ', strip=True)
+                price, original_price = self.extract_prices(price_text)
             
             # Extract image
             img_element = product_element.find('img')
@@ -99,8 +103,10 @@ class TakealotScraper(BaseScraper):
                 'title': title,
                 'url': url,
                 'price': price,
+                'original_price': original_price,
                 'image_url': image_url,
                 'product_id': product_id,
+                'gtin': self.extract_gtin(product_element),
                 'store': self.store_name
             }
             
@@ -120,14 +126,14 @@ class TakealotScraper(BaseScraper):
                 url = self.base_url + url
             
             # Try to find price in parent elements
-            price = None
+            price = original_price = None
             parent = link_element.parent
             for _ in range(3):  # Check up to 3 parent levels
                 if parent:
                     price_element = parent.find('span', class_=re.compile(r'price|amount'))
                     if price_element:
-                        price_text = price_element.get_text(strip=True)
-                        price = self.extract_price(price_text)
+                        price_text = price_element.get_text(' ', strip=True)
+                        price, original_price = self.extract_prices(price_text)
                         break
                     parent = parent.parent
                 else:
@@ -145,8 +151,10 @@ class TakealotScraper(BaseScraper):
                 'title': title,
                 'url': url,
                 'price': price,
+                'original_price': original_price,
                 'image_url': image_url,
                 'product_id': url.split('/product/')[-1].split('?')[0] if '/product/' in url else None,
+                'gtin': self.extract_gtin(link_element),
                 'store': self.store_name
             }
             
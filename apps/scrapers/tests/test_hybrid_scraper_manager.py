@@ -0,0 +1,50 @@
+import asyncio
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.scrapers.hybrid_scraper_manager import HybridScraperManager
+
+
+@mock.patch('apps.scrapers.hybrid_scraper_manager.ScraperManager', mock.Mock())
+@mock.patch('apps.scrapers.hybrid_scraper_manager.AdvancedScraperManager')
+class TimedOutStoreTests(SimpleTestCase):
+    def test_timed_out_store_keeps_its_browser_until_its_thread_finishes(self, advanced_manager):
+        advanced = advanced_manager.return_value
+        advanced.scrapers = {'takealot': mock.Mock(), 'game': mock.Mock()}
+        release = threading.Event()
+        finished = threading.Event()
+
+        def search(store_name, query, max_pages):
+            if store_name == 'game':
+                release.wait(5)
+                finished.set()
+            return [{'title': query, 'store': store_name}]
+
+        advanced.search_specific_store_deep.side_effect = search
+        manager = HybridScraperManager()
+
+        # Unlike asyncio.run, a served event loop does not wait for abandoned threads
+        loop = asyncio.new_event_loop()
+        try:
+            results = loop.run_until_complete(
+                manager.asearch_stores_hybrid('tv', stores=['takealot', 'game'], timeout=0.1)
+            )
+            manager.close_all_scrapers()
+        finally:
+            loop.close()
+
+        self.assertEqual(results['game'], [])
+        advanced.close_scraper.assert_called_once_with('takealot')
+
+        release.set()
+        self.assertTrue(finished.wait(5))
+        for _ in range(50):
+            if advanced.close_scraper.call_count == 2:
+                break
+            time.sleep(0.05)
+        advanced.close_scraper.assert_called_with('game')
+        self.assertEqual(manager.running, set())
+        self.assertEqual(manager.abandoned, set())
@@ -0,0 +1,32 @@
+from django.test import SimpleTestCase
+
+from apps.scrapers.identifiers import attach_gtins, normalize_gtin
+
+
+IPHONE = '0195949038488'
+
+
+class AttachGtinsTests(SimpleTestCase):
+    def test_exact_url_or_sku(self):
+        products = attach_gtins(
+            [{'url': 'https://www.takealot.com/iphone/PLID1'}, {'url': 'https://www.takealot.com/x', 'product_id': 'A1'}],
+            {'https://www.takealot.com/iphone/PLID1': normalize_gtin(IPHONE), 'A1': normalize_gtin(IPHONE)},
+        )
+
+        self.assertEqual([product.get('gtin') for product in products], [normalize_gtin(IPHONE)] * 2)
+
+    def test_relative_url_matches_by_suffix(self):
+        products = attach_gtins(
+            [{'url': 'https://www.takealot.com/iphone/PLID1?ref=search'}],
+            {'/iphone/PLID1': normalize_gtin(IPHONE)},
+        )
+
+        self.assertEqual(products[0]['gtin'], normalize_gtin(IPHONE))
+
+    def test_sku_never_matches_a_url_suffix(self):
+        products = attach_gtins(
+            [{'url': 'https://www.takealot.com/kettle/123', 'product_id': '999'}],
+            {'123': normalize_gtin(IPHONE)},
+        )
+
+        self.assertNotIn('gtin', products[0])
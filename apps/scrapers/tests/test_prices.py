@@ -0,0 +1,33 @@
+from django.test import SimpleTestCase
+
+from apps.scrapers.prices import ParsedPrice, parse_price
+
+
+class ParsePriceTests(SimpleTestCase):
+    def assertParses(self, text, cents, original_cents=None):
+        self.assertEqual(parse_price(text), ParsedPrice(cents, original_cents), text)
+
+    def test_separator_styles(self):
+        self.assertParses('R 1 299,00', 129900)
+        self.assertParses('R1,299.00', 129900)
+        self.assertParses('R 1.299,00', 129900)
+        self.assertParses('R1 299', 129900)
+        self.assertParses('R12,50', 1250)
+        self.assertParses('1299', 129900)
+
+    def test_labels(self):
+        self.assertParses('Was R1,499.00 Now R1,299.00', 129900, 149900)
+        self.assertParses('R1 299 R1 499', 129900, 149900)
+        self.assertParses('R1 299 Save R200', 129900)
+        self.assertParses('R200 off R1 299', 129900)
+
+    def test_instalments_are_not_prices(self):
+        self.assertParses('R24 999 or R1 041 x 24 months', 2499900)
+        self.assertParses('R24 999 or R1 041 p/m', 2499900)
+        self.assertIsNone(parse_price('R1 041 x 24 months'))
+
+    def test_ambiguous_text_gives_none(self):
+        self.assertIsNone(parse_price('R1.299'))
+        self.assertIsNone(parse_price('R1 299 R1 499 R999'))
+        self.assertIsNone(parse_price('Model 1.299'))
+        self.assertIsNone(parse_price('2 pack, 256GB'))
@@ -0,0 +1,25 @@
+"""
+ASGI config for price_comparison project.
+
+Serves the Django views over HTTP and live price updates over WebSockets
+(ws://<host>/ws/prices/product/<id>/, /ws/prices/listing/<id>/ and
+/ws/prices/search/?q=<query>).
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'price_comparison.settings')
+
+django_application = get_asgi_application()
+
+# Imported after Django is set up because it loads models
+from apps.products.realtime import websocket_application  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        await websocket_application(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
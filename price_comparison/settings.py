@@ -2,9 +2,11 @@
 Django settings for price_comparison project.
 """
 
+from importlib.util import find_spec
 from pathlib import Path
 import os
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -60,13 +62,40 @@ TEMPLATES = [
     },
 ]
 
+# Engine for the search results, compare and product detail pages: 'django' or 'jinja2'.
+# Jinja2 is optional; its backend is only registered when the package is installed.
+PAGE_TEMPLATE_ENGINE = config('PAGE_TEMPLATE_ENGINE', default='django')
+if find_spec('jinja2'):
+    TEMPLATES.append({
+        'BACKEND': 'django.template.backends.jinja2.Jinja2',
+        'DIRS': [BASE_DIR / 'jinja2'],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            'environment': 'apps.products.jinja2_env.environment',
+        },
+    })
+elif PAGE_TEMPLATE_ENGINE == 'jinja2':
+    raise ImproperlyConfigured('PAGE_TEMPLATE_ENGINE=jinja2 needs Jinja2: pip install Jinja2')
+
 WSGI_APPLICATION = 'price_comparison.wsgi.application'
+ASGI_APPLICATION = 'price_comparison.asgi.application'
 
 # Database
+# WAL journaling lets reads carry on while a write commits; scrape writes are
+# serialized through one writer queue so they don't fight over the write lock
+SQLITE_WAL_MODE = config('SQLITE_WAL_MODE', default=True, cast=bool)
+SQLITE_BUSY_TIMEOUT = 20  # seconds to wait for the write lock
+SERIALIZE_SCRAPE_WRITES = config('SERIALIZE_SCRAPE_WRITES', default=True, cast=bool)
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'timeout': SQLITE_BUSY_TIMEOUT,
+            # Take the write lock when a transaction starts instead of failing to upgrade later
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
@@ -114,13 +143,65 @@ CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'unique-snowflake',
-    }
+    },
+    # {% cache %} fragments (result cards); kept apart so they don't evict search results
+    'template_fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'template-fragments',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    # Tag versions for cache invalidation; must be shared (Redis, memcached, database) when
+    # scrape workers write listings from their own processes (see apps/products/checks.py)
+    'cache_tags': {
+        'BACKEND': config('CACHE_TAGS_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_TAGS_LOCATION', default='cache-tags'),
+    },
 }
 
 # Scraping settings
 SCRAPING_DELAY = 2  # seconds between requests
 MAX_RETRIES = 3
 REQUEST_TIMEOUT = 30
+STORE_SEARCH_TIMEOUT = 45  # seconds each store gets in the async search views
+SEARCH_FRESHNESS_TTL = config('SEARCH_FRESHNESS_TTL', default=1800, cast=int)  # seconds; refresh interval for listings without a volatility schedule
+SEARCH_PLAN_MAX_LISTINGS = 300  # stored matches considered when planning a search
+SEARCH_PAGE_SIZE = 20
+SEARCH_RESULT_SET_TTL = 1800  # seconds a search's stored result set is served before searching again
+SEARCH_CACHE_SECONDS = config('SEARCH_CACHE_SECONDS', default=1800, cast=int)  # cached searches also drop out when a listing in them changes
+PAGE_CACHE_MAX_AGE = config('PAGE_CACHE_MAX_AGE', default=60, cast=int)  # seconds browsers/CDNs reuse a page before revalidating its ETag
+PRODUCT_DETAIL_CACHE_SECONDS = 3600  # detail pages also drop out when a listing or product on them changes
+PRODUCT_MATCH_THRESHOLD = 0.6  # trigram similarity needed to treat two titles as one product
+EXTRA_PRODUCT_BRANDS = []  # added to the built-in brand dictionary
+PRODUCT_BRANDS_FILE = config('PRODUCT_BRANDS_FILE', default='')  # optional file with one brand per line
+
+# Adaptive refresh: listings are re-scraped about as often as their prices change
+REFRESH_HISTORY_DAYS = 30  # price history window used to estimate change rates
+REFRESH_MIN_CHANGES = 3  # changes needed before a listing or group rate is trusted
+REFRESH_MIN_OBSERVATION = 7 * 24 * 3600  # seconds a listing is watched before its own rate is used
+REFRESH_INTERVAL_FACTOR = 0.5  # refresh twice per expected change
+REFRESH_MIN_INTERVAL = 5 * 60
+REFRESH_MAX_INTERVAL = 7 * 24 * 3600
+REFRESH_RATES_CACHE_SECONDS = 3600
+
+# Scrape job queue (run workers with: python manage.py run_scrape_worker)
+SCRAPE_QUEUE_ENABLED = config('SCRAPE_QUEUE_ENABLED', default=False, cast=bool)
+SCRAPE_QUEUE_MAX_CONCURRENCY = config('SCRAPE_QUEUE_MAX_CONCURRENCY', default=2, cast=int)
+SCRAPE_QUEUE_LEASE_SECONDS = 600  # visibility timeout before a job is retried
+SCRAPE_QUEUE_MAX_ATTEMPTS = 3
+SCRAPE_QUEUE_RETRY_DELAY = 30  # seconds, doubled on each retry
+
+# Persistence of scraped results: 'sync' writes before responding,
+# 'write_behind' responds from the scrape output and saves on a background thread
+PERSISTENCE_MODE = config('PERSISTENCE_MODE', default='sync')
+WRITE_BEHIND_MAX_PENDING = 50  # queued batches before requests start writing inline
+WRITE_BEHIND_MAX_RETRIES = 3
+WRITE_BEHIND_SUBMIT_TIMEOUT = 5  # seconds a request waits for queue space
+
+# Views decorated with @query_budget fail when they exceed their query count
+QUERY_BUDGET_STRICT = config('QUERY_BUDGET_STRICT', default=DEBUG, cast=bool)
+
+# Live price push over WebSockets (ASGI only)
+PRICE_PUSH_INTERVAL = 2  # seconds between checks for changed listings
 
 # Store configurations
 STORES = {